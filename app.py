@@ -14,6 +14,10 @@ from selenium.common.exceptions import NoSuchElementException
 # import getpass
 import pyshorteners
 
+import sei_extracao
+import sei_espera
+import sei_sessao
+
 # Função para realizar login
 def realizar_login(url, login1, password1, orgao1):
     """
@@ -32,47 +36,53 @@ def realizar_login(url, login1, password1, orgao1):
         # Inicializa o navegador
         driver = webdriver.Chrome()
         driver.implicitly_wait(0.5)
-        driver.get(url)
-
-        # Localiza os elementos de login
-        login = driver.find_element(By.XPATH, '//*[@id="txtUsuario"]')
-        password = driver.find_element(By.XPATH, '//*[@id="pwdSenha"]')
-        orgao = driver.find_element(By.XPATH, '//*[@id="selOrgao"]')
-        submit_button = driver.find_element(By.XPATH, '//*[@id="Acessar"]')
-
-        # Preenche as credenciais
-        login.send_keys(login1)
-        password.send_keys(password1)
-        orgao.send_keys(orgao1)
 
-        # Realiza o login
-        submit_button.click()
-        time.sleep(3)  # Aguarda carregamento da página após o login
-
-        print("Login realizado com sucesso!")
+        # Reaproveita a sessão do último login, se ainda for aceita; senão, usa o formulário
+        if sei_sessao.restaurar_sessao(driver, url, login1, password1, orgao1):
+            print("Sessão anterior reaproveitada.")
+        else:
+            driver.get(url)
+
+            # Localiza os elementos de login
+            login = driver.find_element(By.XPATH, '//*[@id="txtUsuario"]')
+            password = driver.find_element(By.XPATH, '//*[@id="pwdSenha"]')
+            orgao = driver.find_element(By.XPATH, '//*[@id="selOrgao"]')
+            submit_button = driver.find_element(By.XPATH, '//*[@id="Acessar"]')
+
+            # Preenche as credenciais
+            login.send_keys(login1)
+            password.send_keys(password1)
+            orgao.send_keys(orgao1)
+
+            # Realiza o login
+            submit_button.click()
+            # Aguarda a página após o login; só guarda a sessão se o login deu certo
+            if not sei_espera.login_concluido(driver, formulario=login):
+                print("Falha no login: verifique usuário, senha e órgão.")
+                driver.quit()
+                return None
+            sei_sessao.guardar_sessao(driver, url, login1, password1, orgao1)
+
+            print("Login realizado com sucesso!")
         
-        time.sleep(1)
         # Acessa a área de busca
         searching = driver.find_element(By.XPATH, '//*[@id="infraMenu"]/li[14]/a/span')
-        searching.click()
-        time.sleep(3)
+        sei_espera.clicar_e_aguardar(driver, searching, (By.ID, 'txtDescricaoPesquisa'))
 
         # Restringe busca ao órgão específico
         sel_orgao = driver.find_element(By.XPATH, '//*[@id="divSinRestringirOrgao"]/div')
         sel_orgao.click()
-        time.sleep(1)
 
         # Especifica os termos de pesquisa
         espec_pesq = driver.find_element(By.XPATH, '//*[@id="txtDescricaoPesquisa"]')
         espec_pesq.send_keys('"Projeto Lei" ou "PL" ou "RIC" ou "Projeto de Lei" ou "Requisição de Informação" ou "PLP" ou "PLN"')
-        time.sleep(3)
         data_inicio = driver.find_element('xpath', '//*[@id="txtDataInicio"]')
         data_inicio.send_keys("01/08/2024")
 
         # Realiza a pesquisa
         b_pesq = driver.find_element(By.XPATH, '//*[@id="sbmPesquisar"]')
         b_pesq.click()
-        time.sleep(3)
+        sei_espera.elemento_presente(driver, (By.XPATH, sei_extracao.XPATH_TABELA_RESULTADOS))
 
         print("Busca realizada com sucesso.\nRestringindo em PL e dentro do MGI.\n\nOs Externo entram como MGI.")
         return driver
@@ -127,33 +137,9 @@ def extrair_dados(driver):
     Returns:
         pd.DataFrame: DataFrame contendo os dados extraídos.
     """
-    def remove_items(lista, item): 
-        """Remove todos os itens iguais a `item` de uma lista."""
-        return [i for i in lista if i != item]
-
-    # Extraindo os elementos da pesquisa
-    tree_elements = driver.find_elements("xpath", '//*[@class="pesquisaTituloEsquerda"]/a')
-    list_tree = [element.text for element in tree_elements]
-    trees = remove_items(list_tree, '')  # Remover elementos vazios
-
-    abts = driver.find_elements("xpath", '//*[@class="pesquisaSnippet"]')
-    list_abts = [element.text for element in abts]
-
-    unidades = driver.find_elements("xpath", '//*[@class="pesquisaMetatag"]')
-    list_uni = [element.text.split(':') for element in unidades]
-    info = [sublist_uni[1] for sublist_uni in list_uni if len(sublist_uni) > 1]  # Removendo listas vazias
-
-    rows = driver.find_elements("xpath", '//*[@id="conteudo"]/table/tbody/tr')
-    links = []
-    for i in range(1, len(rows), 3):
-        try:
-            a = driver.find_element("xpath", f'//*[@id="conteudo"]/table/tbody/tr[{i}]/td[1]/a[1]')
-            time.sleep(0.5)
-            link = a.get_attribute('href')
-            time.sleep(0.5)
-            links.append(link)
-        except Exception as e:
-            print(f"Erro ao processar a linha {i}: {e}")
+    # Extraindo todos os resultados da página numa única chamada ao navegador
+    registros = sei_extracao.extrair_registros_pagina(driver)
+    links = [registro["Link Completo"] for registro in registros]
 
     # Inicializando o encurtador de links
     shortener = pyshorteners.Shortener(api_key='your_api_key', provider='isgd')
@@ -182,17 +168,9 @@ def extrair_dados(driver):
             erros.append((link, str(e)))
             links_curtos.append(None)
 
-    dados = {
-        "Número do Processo": trees[::2],
-        "Documento": trees[1::2],
-        "Resumo": list_abts,
-        "Unidade": info[::3],
-        "Usuário": info[1::3],
-        "Data de Inclusão": info[2::3],
-        "Links": links_curtos
-    }
-
-    df = pd.DataFrame(dados)
+    df = pd.DataFrame(registros, columns=sei_extracao.COLUNAS)
+    df = df.drop(columns="Link Completo")
+    df["Links"] = links_curtos
     return df
 
 def navegar_paginas(driver):
@@ -200,27 +178,25 @@ def navegar_paginas(driver):
     Loop para navegar por todas as páginas até que não haja mais um botão 'Próxima'.
     Retorna um DataFrame consolidado com os dados de todas as páginas.
     """
-    dados_consolidados = pd.DataFrame()  # DataFrame vazio para acumular os dados
+    paginas = []  # DataFrames de cada página, concatenados uma única vez no final
 
     while True:
         try:
-            # Extrair os dados da página atual e adicionar ao DataFrame consolidado
+            # Extrair os dados da página atual
             df_pagina = extrair_dados(driver)
-            dados_consolidados = pd.concat([dados_consolidados, df_pagina], ignore_index=True)
+            paginas.append(df_pagina)
 
             # Procurar o botão "Próxima"
             next_page = driver.find_element("xpath", '//*[@id="conteudo"]/div[2]/div[3]/a')
 
             # Verificar se o botão "Próxima" tem o atributo 'href'
             proxima_href = next_page.get_attribute('href')
-            time.sleep(3)
             if not proxima_href:
                 print("Não há mais páginas. Encerrando navegação.")
                 break  # Sai do loop se não houver link para a próxima página
 
-            # Clicar no botão "Próxima"
-            next_page.click()
-            time.sleep(10)  # Aguarda o carregamento da próxima página
+            # Clicar no botão "Próxima" e aguardar o carregamento da próxima página
+            sei_espera.clicar_e_aguardar(driver, next_page, (By.XPATH, sei_extracao.XPATH_TABELA_RESULTADOS))
 
         except NoSuchElementException:
             print("Botão 'Próxima' não encontrado. Encerrando navegação.")
@@ -234,7 +210,9 @@ def navegar_paginas(driver):
     # driver.close()
     # driver.quit()
 
-    return dados_consolidados
+    if not paginas:
+        return pd.DataFrame()
+    return pd.concat(paginas, ignore_index=True)
 
 def gerar_excel(dados_consolidados):
     output = BytesIO()
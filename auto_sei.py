@@ -1,35 +1,49 @@
 import os
-import time
 import logging
 import getpass
-import pandas as pd
-import base64
+import argparse
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-# --- 1. CONFIGURAÇÕES GERAIS ---
+import sei_extracao
+import sei_saida
+import sei_http
+import sei_captura
+import sei_espera
+import sei_acervo
+import sei_checkpoint
+import sei_pipeline
+import sei_pacote
+import sei_navegador
+import sei_sessao
+import sei_rede
 
-options = webdriver.ChromeOptions()
-options.add_argument('--headless')
-options.add_argument('--disable-gpu')
-options.add_argument('--no-sandbox')
-options.add_argument('--disable-dev-shm-usage')
-options.add_argument('--disable-popup-blocking')
-options.add_argument('--enable-print-browser')
-options.add_argument('--kiosk-printing')
-driver = webdriver.Chrome(options=options)
+# --- 1. CONFIGURAÇÕES GERAIS ---
 
 # Defina as pastas onde os arquivos serão salvos
 PASTA_DOCUMENTOS_HTML = "documentos_inss_html"
 PASTA_LISTAS_ARQUIVOS = "listas_de_arquivos_inss"
+PASTA_DATASET = "dataset_inss"
+PASTA_ACERVO = sei_acervo.PASTA_ACERVO
 ARQUIVO_LOG = "automacao_sei.log"
 
+# Motor de paginação: "navegador" clica em 'Próxima'; "http" baixa as páginas
+# seguintes com os cookies da sessão, sem renderizá-las; "paralelo" faz o mesmo
+# com até TRABALHADORES_PAGINACAO páginas baixadas ao mesmo tempo
+MOTOR_PAGINACAO = "navegador"
+TRABALHADORES_PAGINACAO = 4
+
+# Formato de captura dos documentos: "pdf", "mhtml" (rápido; vira PDF depois
+# com sei_renderizar.py) ou "html" (só o texto da página)
+FORMATO_CAPTURA = "pdf"
+
+# Perfis de rede (sei_rede): a listagem só precisa do HTML; a captura baixa tudo
+PERFIL_REDE_LISTAGEM = sei_rede.PERFIL_LISTAGEM
+PERFIL_REDE_CAPTURA = sei_rede.PERFIL_CAPTURA
+
 # URL do SEI
 URL_SEI = 'https://colaboragov.sei.gov.br/sip/modulos/MF/login_especial/login_especial.php?sigla_orgao_sistema=MGI&sigla_sistema=SEI'
 
@@ -74,16 +88,18 @@ def realizar_login(driver, url, usuario, senha, orgao):
         wait = WebDriverWait(driver, 10)
         
         logging.info("Preenchendo formulário de login.")
-        wait.until(EC.presence_of_element_located((By.ID, 'txtUsuario'))).send_keys(usuario)
+        campo_usuario = wait.until(EC.presence_of_element_located((By.ID, 'txtUsuario')))
+        campo_usuario.send_keys(usuario)
         wait.until(EC.presence_of_element_located((By.ID, 'pwdSenha'))).send_keys(senha)
         wait.until(EC.presence_of_element_located((By.ID, 'selOrgao'))).send_keys(orgao)
         
         acessar = driver.find_element(By.XPATH, '//*[@id="Acessar"]')
         acessar.click()
-        wait = WebDriverWait(driver, 2)
 
-        # Verifica se o login foi bem-sucedido procurando por um elemento da página principal
-        # wait.until(EC.presence_of_element_located((By.ID, id ="lnkInfraMenuSistema")))
+        # Verifica se o login foi bem-sucedido aguardando a página principal
+        if not sei_espera.login_concluido(driver, formulario=campo_usuario):
+            logging.error("Falha no login: a página principal do SEI não carregou.")
+            return False
         logging.info("Login realizado com sucesso!")
         return True
         
@@ -106,12 +122,10 @@ def executar_busca(driver):
     """
     try:
         logging.info("Iniciando o processo de busca de documentos.")
-        wait = WebDriverWait(driver, 5)
 
         # Acessa a área de busca
         searching = driver.find_element(By.XPATH, '//*[@id="infraMenu"]/li[14]/a/span')
-        searching.click()
-        time.sleep(1)
+        sei_espera.clicar_e_aguardar(driver, searching, (By.ID, 'q'))
 
         # Preenche o formulário de busca
         logging.info("Preenchendo os critérios de busca.")
@@ -119,7 +133,6 @@ def executar_busca(driver):
         # Restringe busca ao órgão específico
         sel_orgao = driver.find_element(By.XPATH, '//*[@id="divSinRestringirOrgao"]/div')
         sel_orgao.click()
-        time.sleep(1)
 
         # Especifica os termos de pesquisa
         espec_pesq = driver.find_element(By.XPATH, '//*[@id="q"]')
@@ -128,7 +141,6 @@ def executar_busca(driver):
         #colocar como tramitação dentro do orgão
         chktram = driver.find_element(By.XPATH, '//*[@id="divSinTramitacao"]/div')
         chktram.click()
-        time.sleep(1)
 
         # wait.until(EC.presence_of_element_located((By.ID, '//*[@id="q"]'))).send_keys(
         #     'MPS e SEGES não "Serviço de Informações ao Cidadão" não "Capacitação" não "Avaliação de Reação" não "Termo de Responsabilidade - Controle de Acesso" não "Solicitação de Cessão" não "TERMO ANUÊNCIA"'
@@ -152,7 +164,7 @@ def executar_busca(driver):
         b_pesq.click()
         
         # Aguarda a tabela de resultados aparecer
-        wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="conteudo"]/table')))
+        sei_espera.elemento_presente(driver, (By.XPATH, sei_extracao.XPATH_TABELA_RESULTADOS))
         logging.info("Busca realizada com sucesso.")
         return True
 
@@ -163,280 +175,87 @@ def executar_busca(driver):
         logging.error(f"Erro inesperado durante a busca: {e}")
         # return False
 
-# def salvar_documentos_da_pagina(driver, caminho_lista_arquivos):
-#     """
-#     Localiza todos os documentos na página de resultados atual, salva cada um como HTML
-#     e registra os nomes em um arquivo de texto.
-#     """
-#     janela_original = driver.current_window_handle
-    
-#     try:
-#         # Encontra todas as tabelas que representam um resultado de busca
-#         tabelas_de_resultado = driver.find_elements(By.XPATH, '//*[@id="conteudo"]/table')
-        
-#         if not tabelas_de_resultado:
-#             logging.info("Nenhum documento encontrado nesta página.")
-#             return
-
-#         logging.info(f"Encontrados {len(tabelas_de_resultado)} documentos na página.")
-
-#         for tabela in tabelas_de_resultado:
-#             nome_doc = "nome_nao_encontrado"
-#             try:
-#                 # Extrai o nome do documento e o link
-#                 elemento_nome = tabela.find_element(By.XPATH, ".//a[contains(@onmouseover, 'return infraTooltipMostrar')]")
-#                 nome_doc = elemento_nome.text.strip().replace('/', '-') # Substitui barras no nome
-                
-#                 # Limpa o nome para criar um nome de arquivo válido
-#                 nome_arquivo_seguro = "".join([c for c in nome_doc if c.isalnum() or c in (' ', '-', '_')]).rstrip()
-                
-#                 elemento_link_doc = tabela.find_element(By.XPATH, "//*[@id="conteudo"]/table/tbody/tr[1]/td[2]")
-#                 link_doc = elemento_link_doc.get_attribute('href')
-
-#                 # Salva o nome do arquivo na lista
-#                 with open(caminho_lista_arquivos, 'a', encoding='utf-8') as f:
-#                     f.write(nome_arquivo_seguro + '\n')
-
-#                 # Abre o documento em nova aba, salva o HTML e fecha
-#                 driver.switch_to.new_window('tab')
-#                 driver.get(link_doc)
-                
-#                 caminho_html = os.path.join(PASTA_DOCUMENTOS_HTML, f"doc_{nome_arquivo_seguro}.html")
-#                 with open(caminho_html, 'w', encoding='utf-8') as f:
-#                     f.write(driver.page_source)
-                
-#                 logging.info(f"Documento salvo: {caminho_html}")
-                
-#             except Exception as e:
-#                 logging.error(f"Erro ao processar o documento '{nome_doc}': {e}")
-#             finally:
-#                 # Garante que a aba seja fechada e o controle retorne à janela original
-#                 if len(driver.window_handles) > 1:
-#                     driver.close()
-#                     driver.switch_to.window(janela_original)
-#                 time.sleep(1) # Pausa para estabilidade
-
-#     except Exception as e:
-#         logging.error(f"Erro geral ao salvar documentos da página: {e}")
-
-# def navegar_e_salvar_tudo(driver):
-#     """
-#     Navega por todas as páginas de resultados e salva os documentos de cada uma.
-#     """
-#     today_date = datetime.now().strftime('%Y-%m-%d')
-#     caminho_lista_arquivos = os.path.join(PASTA_LISTAS_ARQUIVOS, f'lista_docs_{today_date}.txt')
-#     logging.info(f"A lista de arquivos será salva em: {caminho_lista_arquivos}")
-
-#     pagina_atual = 1
-#     while True:
-#         logging.info(f"--- Processando página de resultados número {pagina_atual} ---")
-#         salvar_documentos_da_pagina(driver, caminho_lista_arquivos)
-
-#         try:
-#             # Procura o link "Próxima" e clica nele
-#             botao_proxima = driver.find_element(By.XPATH, "//a[text()='Próxima']")
-#             logging.info("Navegando para a próxima página.")
-#             botao_proxima.click()
-#             WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, '//*[@id="conteudo"]/table')))
-#             pagina_atual += 1
-#         except NoSuchElementException:
-#             logging.info("Não há mais páginas de resultados. Fim da navegação.")
-#             break
-#         except Exception as e:
-#             logging.error(f"Erro ao tentar navegar para a próxima página: {e}")
-#             break
-
-def extrair_dados(driver):
-    """
-    Extrai dados da página atual do SEI.
-    """
-    def remove_items(lista, item): 
-        return [i for i in lista if i != item]
-
-    tree_elements = driver.find_elements(By.XPATH, '//*[@class="pesquisaTituloEsquerda"]/a')
-    list_tree = [element.text for element in tree_elements]
-    trees = remove_items(list_tree, '')
-
-    abts = driver.find_elements(By.XPATH, '//*[@class="pesquisaSnippet"]')
-    list_abts = [element.text for element in abts]
-
-    unidades = driver.find_elements(By.XPATH, '//*[@class="pesquisaMetatag"]')
-    list_uni = [element.text.split(':') for element in unidades]
-    info = [sub[1].strip() for sub in list_uni if len(sub) > 1]
-
-    rows = driver.find_elements(By.XPATH, '//*[@id="conteudo"]/table/tbody/tr')
-    links = []
-    for i in range(1, len(rows), 3):
-        try:
-            a = driver.find_element(By.XPATH, f'//*[@id="conteudo"]/table/tbody/tr[{i}]/td[1]/a[1]')
-            link = a.get_attribute('href')
-            links.append(link)
-        except Exception as e:
-            logging.warning(f"Erro ao extrair link da linha {i}: {e}")
-
-    dados = {
-        "Número do Processo": trees[::2],
-        "Documento": trees[1::2],
-        "Resumo": list_abts,
-        "Unidade": info[::3],
-        "Usuário": info[1::3],
-        "Data de Inclusão": info[2::3],
-        "Link Completo": links
-    }
-
-    return pd.DataFrame(dados)
-
-
-def navegar_paginas(driver, caminho_csv):
+def navegar_paginas(driver, caminho_csv, motor=MOTOR_PAGINACAO, trabalhadores=1, abas=1, retomar=False, capturar=True,
+                    formato=FORMATO_CAPTURA, compressao=None, perfil_listagem=PERFIL_REDE_LISTAGEM,
+                    perfil_captura=PERFIL_REDE_CAPTURA, reautenticador=None):
     """
     Navega por todas as páginas de resultado, extrai os dados e salva os documentos como PDF.
-    """
-    logging.info("Iniciando navegação pelas páginas de resultados.")
-    dados_consolidados = pd.DataFrame()
-    pagina = 1
-
-    while True:
-        logging.info(f"Extraindo dados da página {pagina}")
-        df_pagina = extrair_dados(driver)
-        dados_consolidados = pd.concat([dados_consolidados, df_pagina], ignore_index=True)
-
-        # Salva os PDFs dos documentos desta página
-        for idx, row in df_pagina.iterrows():
-            nome_base = f"pg{pagina:02d}_{idx+1:03d}_{row['Documento']}".replace('/', '-')
-            nome_limpo = "".join(c for c in nome_base if c.isalnum() or c in " _-").rstrip()
-            caminho_pdf = os.path.join(PASTA_DOCUMENTOS_HTML, f"{nome_limpo}.pdf")
-            link = row['Link Completo']
-
-            if pd.isna(link):
-                logging.warning(f"[Página {pagina}] Link vazio para documento {idx}. Pulando.")
-                continue
-
-            logging.info(f"[Página {pagina}] Salvando item {idx+1}: {row['Documento']}")
-            salvar_documento_como_pdf(driver, link, caminho_pdf)
-            time.sleep(2)
-
-        try:
-            proxima = driver.find_element(By.XPATH, "//a[text()='Próxima']")
-            href = proxima.get_attribute('href')
-            if not href:
-                break
-            proxima.click()
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="conteudo"]/table'))
-            )
-            pagina += 1
-        except NoSuchElementException:
-            logging.info("Não há mais páginas.")
-            break
-        except Exception as e:
-            logging.error(f"Erro durante a navegação: {e}")
-            break
-
-        # Tenta ir para a próxima página
-        try:
-            proxima = driver.find_element(By.XPATH, "//a[text()='Próxima']")
-            href = proxima.get_attribute('href')
-            if not href:
-                break
-            proxima.click()
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="conteudo"]/table'))
-            )
-            pagina += 1
-        except NoSuchElementException:
-            logging.info("Não há mais páginas.")
-            break
-        except Exception as e:
-            logging.error(f"Erro durante a navegação: {e}")
-            break
 
-    logging.info(f"Salvando dados extraídos em: {caminho_csv}")
-    dados_consolidados.to_csv(caminho_csv, sep=';', encoding='utf-8', index=False)
-#     logging.info("CSV salvo com sucesso.")
-
-
-# def salvar_documento_como_pdf(driver, url, nome_arquivo_pdf):
-#     """
-#     Abre o link do documento e salva como PDF usando o protocolo DevTools.
-#     """
-#     try:
-#         driver.get(url)
-#         time.sleep(5)  # Aguarda o carregamento
-
-#         # Acessa o protocolo DevTools
-#         result = driver.execute_cdp_cmd("Page.printToPDF", {
-#             "printBackground": True,
-#             "paperWidth": 8.27,  # A4 em polegadas
-#             "paperHeight": 11.69,
-#             "scale": 1
-#         })
-
-#         # Decodifica e salva o PDF
-#         with open(nome_arquivo_pdf, "wb") as f:
-#             f.write(base64.b64decode(result['data']))
-#         logging.info(f"Documento salvo como PDF: {nome_arquivo_pdf}")
-
-#     except Exception as e:
-#         logging.error(f"Erro ao salvar PDF '{nome_arquivo_pdf}': {e}")
-
-def salvar_documento_como_pdf(driver, link, caminho_pdf):
-    """
-    Abre um link em nova aba, carrega o conteúdo e salva como PDF.
-    
+    A listagem, a captura e a gravação rodam em etapas separadas (sei_pipeline),
+    ligadas por filas limitadas: a paginação não espera os PDFs, e cada documento
+    é capturado uma única vez. Cada página é acrescentada ao CSV assim que chega à
+    gravação, então uma falha no meio da navegação preserva as páginas já processadas.
+
     Args:
-        driver: WebDriver do Selenium.
-        link (str): URL do documento a ser acessado.
-        caminho_pdf (str): Caminho completo do arquivo PDF a ser salvo.
+        driver: Instância do WebDriver na primeira página de resultados.
+        caminho_csv (str): Arquivo CSV de saída.
+        motor (str): "navegador", "http" ou "paralelo" (veja MOTOR_PAGINACAO).
+        trabalhadores (int): Navegadores headless dedicados à captura dos PDFs. Com 1,
+            os documentos são impressos em abas do próprio navegador da pesquisa.
+        abas (int): Abas simultâneas do próprio navegador usadas na captura
+            (ignorado com trabalhadores > 1).
+        retomar (bool): Continua a execução registrada no manifesto do CSV: as
+            páginas já confirmadas não são gravadas de novo e os documentos já
+            capturados são pulados.
+        capturar (bool): Se False, só grava os metadados; os documentos podem ser
+            capturados depois com materializar_documentos.
+        formato (str): "pdf", "mhtml" ou "html" (veja FORMATO_CAPTURA).
+        compressao (str, opcional): Se informada ("nenhuma", "gzip", "lzma" ou "auto"),
+            os documentos e o CSV vão para um único pacote .tar da execução (sei_pacote)
+            em vez de ficarem soltos na pasta.
+        perfil_listagem (str): Perfil de rede (sei_rede.PERFIS) da aba que percorre as
+            páginas; ao fim, a aba volta a baixar tudo.
+        perfil_captura (str): Perfil de rede das abas ou navegadores de captura.
+        reautenticador (sei_sessao.Reautenticador, opcional): Refaz o login se a sessão
+            expirar no meio da execução; a página ou o documento afetado é repetido.
+
+    Documentos já presentes no acervo (PASTA_ACERVO) não são capturados de novo:
+    são apenas copiados para a pasta desta execução.
     """
-    try:
-        # Salva a aba original
-        aba_original = driver.current_window_handle
-
-        # Abre nova aba com o link
-        driver.execute_script(f"window.open('{link}', '_blank');")
-        WebDriverWait(driver, 10).until(lambda d: len(d.window_handles) > 1)
-
-        # Alterna para nova aba
-        driver.switch_to.window(driver.window_handles[-1])
-
-        # Aguarda o carregamento da página
-        WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
-        time.sleep(2)  # Espera extra para garantir carregamento completo
-
-        # Usa Chrome DevTools para salvar como PDF (requer configuração headless + DevTools Protocol)
-        salvar_com_devtools_em_pdf(driver, caminho_pdf)
-
-        logging.info(f"Documento salvo como PDF: {caminho_pdf}")
+    logging.info("Iniciando navegação pelas páginas de resultados.")
+    logging.info(f"Salvando dados extraídos em: {caminho_csv}")
 
-    except Exception as e:
-        logging.error(f"Erro ao salvar documento em PDF: {e}")
+    pacote = sei_pacote.pacote_da_saida(caminho_csv, compressao) if compressao else None
+    sei_rede.aplicar_perfil(driver, perfil_listagem)
+    try:
+        with sei_checkpoint.Manifesto.para_saida(caminho_csv, retomar) as manifesto, \
+                sei_saida.abrir_saida(caminho_csv, encoding='utf-8', anexar=retomar,
+                                      posicao=manifesto.posicao_saida()) as saida, \
+                sei_acervo.Acervo(PASTA_ACERVO) as acervo:
+            capturador = sei_pipeline.criar_capturador(driver, trabalhadores, abas, perfil_captura,
+                                                       reautenticador) if capturar else None
+            pipeline = sei_pipeline.Pipeline(PASTA_DOCUMENTOS_HTML, saida, capturador, manifesto, acervo,
+                                             formato=formato, pacote=pacote)
+            pipeline.executar(sei_http.iterar_paginas(driver, motor, trabalhadores=TRABALHADORES_PAGINACAO,
+                                                      reautenticador=reautenticador))
+            logging.info(f"Manifesto da execução: {manifesto.resumo()}")
     finally:
-        # Fecha a aba e volta para a original
-        driver.close()
-        driver.switch_to.window(aba_original)
+        if pacote:
+            pacote.adicionar_arquivo(caminho_csv)
+            pacote.fechar()
+        sei_rede.restaurar_perfil(driver)
+
 
-def salvar_com_devtools_em_pdf(driver, caminho_pdf):
+def materializar_documentos(driver, caminho_csv, trabalhadores=1, abas=1, formato=FORMATO_CAPTURA, compressao=None,
+                            perfil_captura=PERFIL_REDE_CAPTURA, reautenticador=None):
     """
-    Usa o protocolo DevTools para salvar a aba atual como PDF.
-    Requer que o Chrome seja iniciado com as opções corretas.
+    Captura os documentos de uma lista já salva por navegar_paginas(capturar=False).
+
+    Documentos já capturados segundo o manifesto do CSV, ou presentes no acervo,
+    não são impressos de novo. Com `compressao`, vão para o pacote da execução.
+    Com `reautenticador`, uma sessão expirada no meio da captura é renovada.
     """
-    import base64
-
-    # Envia comando para gerar PDF via DevTools
-    result = driver.execute_cdp_cmd("Page.printToPDF", {
-        "printBackground": True,
-        "paperWidth": 8.27,  # A4
-        "paperHeight": 11.69,
-        "marginTop": 0.4,
-        "marginBottom": 0.4,
-        "marginLeft": 0.4,
-        "marginRight": 0.4
-    })
-
-    # Decodifica e salva o PDF
-    pdf_data = base64.b64decode(result['data'])
-    with open(caminho_pdf, 'wb') as f:
-        f.write(pdf_data)
+    pacote = sei_pacote.pacote_da_saida(caminho_csv, compressao) if compressao else None
+    try:
+        with sei_checkpoint.Manifesto.para_saida(caminho_csv, retomar=True) as manifesto, \
+                sei_acervo.Acervo(PASTA_ACERVO) as acervo:
+            capturador = sei_pipeline.criar_capturador(driver, trabalhadores, abas, perfil_captura, reautenticador)
+            pipeline = sei_pipeline.Pipeline(PASTA_DOCUMENTOS_HTML, None, capturador, manifesto, acervo,
+                                             formato=formato, pacote=pacote)
+            pipeline.executar(sei_pipeline.paginas_do_csv(caminho_csv, encoding='utf-8'))
+    finally:
+        if pacote:
+            pacote.fechar()
 
 # --- 3. FUNÇÃO PRINCIPAL (MAIN) ---
 
@@ -444,6 +263,33 @@ def main():
     """
     Função principal que orquestra todo o processo de automação.
     """
+    parser = argparse.ArgumentParser(description="Captura documentos do SEI a partir de uma pesquisa.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Navegadores headless dedicados à captura dos PDFs (padrão: 1, no próprio navegador).")
+    parser.add_argument("--abas", type=int, default=1,
+                        help="Abas simultâneas do mesmo navegador usadas na captura quando --workers é 1 (padrão: 1).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continua a última execução interrompida a partir do seu manifesto.")
+    parser.add_argument("--modo", choices=["completo", "metadados", "materializar"], default="completo",
+                        help="completo: lista e captura; metadados: só a lista; "
+                             "materializar: captura os documentos de uma lista já salva.")
+    parser.add_argument("--lista", help="CSV usado em --modo materializar (padrão: o da última execução).")
+    parser.add_argument("--formato", choices=list(sei_captura.EXTENSOES_FORMATO), default=FORMATO_CAPTURA,
+                        help=f"Formato dos documentos capturados (padrão: {FORMATO_CAPTURA}). "
+                             "mhtml é bem mais rápido; o PDF pode ser gerado depois com sei_renderizar.py.")
+    parser.add_argument("--rede-listagem", choices=list(sei_rede.PERFIS), default=PERFIL_REDE_LISTAGEM,
+                        help=f"O que o navegador baixa ao percorrer as páginas (padrão: {PERFIL_REDE_LISTAGEM}).")
+    parser.add_argument("--rede-captura", choices=list(sei_rede.PERFIS), default=PERFIL_REDE_CAPTURA,
+                        help=f"O que o navegador baixa ao capturar os documentos (padrão: {PERFIL_REDE_CAPTURA}; "
+                             "leve basta para mhtml/html).")
+    parser.add_argument("--pacote", nargs="?", const="auto", choices=["nenhuma", "gzip", "lzma", "auto"],
+                        help="Guarda os documentos e o CSV num único .tar da execução, com a compressão "
+                             "indicada (padrão: auto, que não recomprime PDFs).")
+    parser.add_argument("--dataset", nargs="?", const=PASTA_DATASET, default=None,
+                        help="Grava também os resultados num dataset Parquet particionado pelo mês de "
+                             f"inclusão, com datas e colunas tipadas (padrão: {PASTA_DATASET}).")
+    args = parser.parse_args()
+
     configurar_logging()
     logging.info("==== INICIANDO AUTOMAÇÃO DE CAPTURA DE DOCUMENTOS DO SEI ====")
     
@@ -463,14 +309,35 @@ def main():
     try:
         # Inicializa o WebDriver
         logging.info("Inicializando o navegador Chrome.")
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service)
+        driver = sei_navegador.criar_driver()
         driver.implicitly_wait(5) # Espera implícita
 
         # Etapa 1: Login
-        if not realizar_login(driver, URL_SEI, usuario, senha, orgao):
+        # (reaproveita a sessão da execução anterior, se o SEI ainda a aceitar)
+        if not sei_sessao.entrar(driver, URL_SEI, usuario, senha, orgao, realizar_login):
             logging.error("Processo encerrado devido a falha no login.")
             return
+        # Refaz o login (e a busca, se preciso) quando a sessão expira no meio da execução
+        reautenticador = sei_sessao.Reautenticador(driver, URL_SEI, usuario, senha, orgao, realizar_login,
+                                                   refazer_busca=executar_busca)
+
+        # Modo materializar: captura a partir de uma lista já salva, sem nova busca
+        if args.modo == "materializar":
+            caminho_csv = args.lista
+            if caminho_csv is None:
+                manifesto = sei_checkpoint.abrir_para_retomar(PASTA_LISTAS_ARQUIVOS)
+                if manifesto:
+                    caminho_csv = manifesto.obter("caminho_saida")
+                    manifesto.fechar()
+            if not caminho_csv:
+                logging.error("Nenhuma lista encontrada para materializar. Informe --lista.")
+                return
+            logging.info(f"Materializando os documentos de {caminho_csv}.")
+            materializar_documentos(driver, caminho_csv, trabalhadores=args.workers, abas=args.abas,
+                                    formato=args.formato, compressao=args.pacote,
+                                    perfil_captura=args.rede_captura, reautenticador=reautenticador)
+            logging.info("==== PROCESSO DE AUTOMAÇÃO CONCLUÍDO COM SUCESSO ====")
+            return
 
         # Etapa 2: Busca
         if not executar_busca(driver):
@@ -480,7 +347,21 @@ def main():
         # Etapa 3: Navegação e extração dos dados
         today = datetime.now().strftime('%Y-%m-%d')
         caminho_csv = os.path.join(PASTA_LISTAS_ARQUIVOS, f'documentos_extraidos_{today}.csv')
-        navegar_paginas(driver, caminho_csv)
+        retomar = False
+        if args.resume:
+            manifesto = sei_checkpoint.abrir_para_retomar(PASTA_LISTAS_ARQUIVOS)
+            if manifesto:
+                caminho_csv = manifesto.obter("caminho_saida", caminho_csv)
+                manifesto.fechar()
+                retomar = True
+        navegar_paginas(driver, caminho_csv, trabalhadores=args.workers, abas=args.abas,
+                        retomar=retomar, capturar=args.modo == "completo", formato=args.formato,
+                        compressao=args.pacote,
+                        perfil_listagem=args.rede_listagem, perfil_captura=args.rede_captura,
+                        reautenticador=reautenticador)
+        if args.dataset:
+            total = sei_saida.dataset_do_csv(caminho_csv, args.dataset)
+            logging.info(f"{total} registros gravados no dataset '{args.dataset}'.")
 
         # # Etapa 4: Salvar documentos como PDF
         # logging.info("Salvando documentos como PDF.")
@@ -1,25 +1,55 @@
 import os
-import time
 import logging
 import getpass
-import pandas as pd
-import base64
+import argparse
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+import sei_extracao
+import sei_saida
+import sei_http
+import sei_captura
+import sei_espera
+import sei_acervo
+import sei_checkpoint
+import sei_delta
+import sei_pipeline
+import sei_pacote
+import sei_navegador
+import sei_sessao
+import sei_rede
+
 # --- 1. CONFIGURAÇÕES GERAIS ---
 
 # Defina as pastas onde os arquivos serão salvos
 PASTA_DOCUMENTOS_HTML = "documentos_mps_html"
 PASTA_LISTAS_ARQUIVOS = "listas_de_arquivos_mps"
+PASTA_DATASET = "dataset_mps"
+PASTA_ACERVO = sei_acervo.PASTA_ACERVO
+ARQUIVO_ESTADO_DELTA = os.path.join(PASTA_LISTAS_ARQUIVOS, "estado_delta.sqlite3")
 ARQUIVO_LOG = "automacao_sei.log"
 
+# Data inicial da busca na primeira execução; no modo incremental (--delta) as
+# seguintes começam na data de inclusão mais recente já coletada
+DATA_INICIO_PADRAO = '30/07/2024'
+
+# Motor de paginação: "navegador" clica em 'Próxima'; "http" baixa as páginas
+# seguintes com os cookies da sessão, sem renderizá-las; "paralelo" faz o mesmo
+# com até TRABALHADORES_PAGINACAO páginas baixadas ao mesmo tempo
+MOTOR_PAGINACAO = "navegador"
+TRABALHADORES_PAGINACAO = 4
+
+# Formato de captura dos documentos: "pdf", "mhtml" (rápido; vira PDF depois
+# com sei_renderizar.py) ou "html" (só o texto da página)
+FORMATO_CAPTURA = "pdf"
+
+# Perfis de rede (sei_rede): a listagem só precisa do HTML; a captura baixa tudo
+PERFIL_REDE_LISTAGEM = sei_rede.PERFIL_LISTAGEM
+PERFIL_REDE_CAPTURA = sei_rede.PERFIL_CAPTURA
+
 # URL do SEI
 URL_SEI = 'https://colaboragov.sei.gov.br/sip/modulos/MF/login_especial/login_especial.php?sigla_orgao_sistema=MGI&sigla_sistema=SEI'
 
@@ -64,16 +94,18 @@ def realizar_login(driver, url, usuario, senha, orgao):
         wait = WebDriverWait(driver, 10)
         
         logging.info("Preenchendo formulário de login.")
-        wait.until(EC.presence_of_element_located((By.ID, 'txtUsuario'))).send_keys(usuario)
+        campo_usuario = wait.until(EC.presence_of_element_located((By.ID, 'txtUsuario')))
+        campo_usuario.send_keys(usuario)
         wait.until(EC.presence_of_element_located((By.ID, 'pwdSenha'))).send_keys(senha)
         wait.until(EC.presence_of_element_located((By.ID, 'selOrgao'))).send_keys(orgao)
         
         acessar = driver.find_element(By.XPATH, '//*[@id="Acessar"]')
         acessar.click()
-        wait = WebDriverWait(driver, 10)
 
-        # Verifica se o login foi bem-sucedido procurando por um elemento da página principal
-        # wait.until(EC.presence_of_element_located((By.ID, id ="lnkInfraMenuSistema")))
+        # Verifica se o login foi bem-sucedido aguardando a página principal
+        if not sei_espera.login_concluido(driver, formulario=campo_usuario):
+            logging.error("Falha no login: a página principal do SEI não carregou.")
+            return False
         logging.info("Login realizado com sucesso!")
         return True
         
@@ -84,24 +116,23 @@ def realizar_login(driver, url, usuario, senha, orgao):
         logging.error(f"Erro inesperado durante o login: {e}")
         return False
 
-def executar_busca(driver):
+def executar_busca(driver, data_inicio=DATA_INICIO_PADRAO):
     """
     Navega até a tela de pesquisa e executa a busca com os critérios definidos.
 
     Args:
         driver: Instância do WebDriver.
+        data_inicio (str): Data inicial da pesquisa (dd/mm/aaaa).
     
     Returns:
         bool: True se a busca for executada, False caso contrário.
     """
     try:
         logging.info("Iniciando o processo de busca de documentos.")
-        wait = WebDriverWait(driver, 5)
 
         # Acessa a área de busca
         searching = driver.find_element(By.XPATH, '//*[@id="infraMenu"]/li[14]/a/span')
-        searching.click()
-        time.sleep(1)
+        sei_espera.clicar_e_aguardar(driver, searching, (By.ID, 'q'))
 
         # Preenche o formulário de busca
         logging.info("Preenchendo os critérios de busca.")
@@ -109,23 +140,20 @@ def executar_busca(driver):
         # Restringe busca ao órgão específico
         sel_orgao = driver.find_element(By.XPATH, '//*[@id="divSinRestringirOrgao"]/div')
         sel_orgao.click()
-        time.sleep(1)
 
         # Especifica os termos de pesquisa
         espec_pesq = driver.find_element(By.XPATH, '//*[@id="q"]')
         espec_pesq.send_keys('MPS não "SIC" não "Ficha" não "Nota Fiscal" não "REQUERIMENTO DE DISPENSA" não "Termo de Responsabilidade" não "Capacitação" não "Avaliação de Reação" não "Controle de Acesso" não "de Cessão" não "ANUÊNCIA" não "Neopostismo"')
-        wait 
 
         #colocar como tramitação dentro do orgão
         chktram = driver.find_element(By.XPATH, '//*[@id="divSinTramitacao"]/div')
         chktram.click()
-        time.sleep(1)
         
         
         # colocar as datas
-        data_inicio = driver.find_element(By.XPATH, '//*[@id="txtDataInicio"]')
-        data_inicio.clear()
-        data_inicio.send_keys('30/07/2024')
+        campo_inicio = driver.find_element(By.XPATH, '//*[@id="txtDataInicio"]')
+        campo_inicio.clear()
+        campo_inicio.send_keys(data_inicio)
         data_fim = driver.find_element(By.XPATH, '//*[@id="txtDataFim"]')
         data_fim.clear()
         data_fim.send_keys(datetime.now().strftime('%d/%m/%Y'))
@@ -136,7 +164,7 @@ def executar_busca(driver):
         b_pesq.click()
         
         # Aguarda a tabela de resultados aparecer
-        wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="conteudo"]/table')))
+        sei_espera.elemento_presente(driver, (By.XPATH, sei_extracao.XPATH_TABELA_RESULTADOS))
         logging.info("Busca realizada com sucesso.")
         return True
 
@@ -148,140 +176,105 @@ def executar_busca(driver):
         # return False
 
 
-def extrair_dados(driver):
-    """
-    Extrai dados da página atual do SEI.
-    """
-    def remove_items(lista, item): 
-        return [i for i in lista if i != item]
-
-    tree_elements = driver.find_elements(By.XPATH, '//*[@class="pesquisaTituloEsquerda"]/a')
-    list_tree = [element.text for element in tree_elements]
-    trees = remove_items(list_tree, '')
-
-    abts = driver.find_elements(By.XPATH, '//*[@class="pesquisaSnippet"]')
-    list_abts = [element.text for element in abts]
-
-    unidades = driver.find_elements(By.XPATH, '//*[@class="pesquisaMetatag"]')
-    list_uni = [element.text.split(':') for element in unidades]
-    info = [sub[1].strip() for sub in list_uni if len(sub) > 1]
-
-    rows = driver.find_elements(By.XPATH, '//*[@id="conteudo"]/table/tbody/tr')
-    links = []
-    for i in range(1, len(rows), 3):
-        try:
-            # CAPTURA O LINK (string) ANTES DE MEXER EM ABA
-            link_element = driver.find_element(By.XPATH, f'//*[@id="conteudo"]/table/tbody/tr[{i}]/td[1]/a[1]')
-            link = link_element.get_attribute('href')
-            links.append(link)
-
-            # PREPARA O NOME DO PDF
-            idx = len(links)
-            nome_documento = trees[2*(idx-1)+1] if 2*(idx-1)+1 < len(trees) else f"doc_sem_nome_{idx}"
-            nome_base = f"{idx:03d}_{nome_documento}".replace('/', '-')
-            nome_limpo = "".join(c for c in nome_base if c.isalnum() or c in " _-").rstrip()
-            caminho_pdf = os.path.join(PASTA_DOCUMENTOS_HTML, f"{nome_limpo}.pdf")
-
-            # SALVA O PDF COM LINK DIRETO
-            salvar_documento_como_pdf(driver, link, caminho_pdf)
-            time.sleep(2)
-
-        except Exception as e:
-            logging.warning(f"Erro ao extrair ou baixar documento da linha {i}: {e}")
-            links.append(None)
-
-    dados = {
-        "Número do Processo": trees[::2],
-        "Documento": trees[1::2],
-        "Resumo": list_abts,
-        "Unidade": info[::3],
-        "Usuário": info[1::3],
-        "Data de Inclusão": info[2::3],
-        "Link Completo": links
-    }
-
-    return pd.DataFrame(dados)
-
-
-def navegar_paginas(driver, caminho_csv):
+def navegar_paginas(driver, caminho_csv, motor=MOTOR_PAGINACAO, retomar=False, delta=None,
+                    capturar=True, trabalhadores=1, abas=1, formato=FORMATO_CAPTURA, compressao=None,
+                    perfil_listagem=PERFIL_REDE_LISTAGEM, perfil_captura=PERFIL_REDE_CAPTURA, reautenticador=None):
     """
-    Navega por todas as páginas de resultado e salva os dados em CSV.
+    Navega por todas as páginas de resultado, salva os dados em CSV e captura os documentos.
+
+    A listagem, a captura e a gravação rodam em etapas separadas (sei_pipeline),
+    ligadas por filas limitadas: a paginação não espera os PDFs, e cada documento
+    é capturado uma única vez. Cada página é acrescentada ao CSV assim que chega à
+    gravação e confirmada no manifesto da execução.
+
+    Args:
+        driver: Instância do WebDriver na primeira página de resultados.
+        caminho_csv (str): Arquivo CSV de saída.
+        motor (str): "navegador", "http" ou "paralelo" (veja MOTOR_PAGINACAO).
+        retomar (bool): Pula as páginas já confirmadas no manifesto do CSV e
+            continua o arquivo a partir da última delas.
+        delta (sei_delta.EstadoDelta, opcional): No modo incremental, grava só os
+            resultados ainda não coletados.
+        capturar (bool): Se False, só grava os metadados (veja materializar_documentos).
+        trabalhadores (int): Navegadores headless dedicados à captura.
+        abas (int): Abas do próprio navegador usadas na captura quando trabalhadores == 1.
+        formato (str): "pdf", "mhtml" ou "html" (veja FORMATO_CAPTURA).
+        compressao (str, opcional): Se informada ("nenhuma", "gzip", "lzma" ou "auto"),
+            os documentos e o CSV vão para um único pacote .tar da execução (sei_pacote)
+            em vez de ficarem soltos na pasta.
+        perfil_listagem (str): Perfil de rede (sei_rede.PERFIS) da aba que percorre as
+            páginas; ao fim, a aba volta a baixar tudo.
+        perfil_captura (str): Perfil de rede das abas ou navegadores de captura.
+        reautenticador (sei_sessao.Reautenticador, opcional): Se a sessão expirar no
+            meio da execução, refaz o login e continua da página ou do documento
+            em que parou, em vez de gravar o formulário de login como documento.
     """
     logging.info("Iniciando navegação pelas páginas de resultados.")
-    dados_consolidados = pd.DataFrame()
-    pagina = 1
-
-    while True:
-        logging.info(f"Extraindo dados da página {pagina}")
-        df_pagina = extrair_dados(driver)
-        dados_consolidados = pd.concat([dados_consolidados, df_pagina], ignore_index=True)
-
-        try:
-            proxima = driver.find_element(By.XPATH, "//a[text()='Próxima']")
-            href = proxima.get_attribute('href')
-            if not href:
-                break
-            proxima.click()
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="conteudo"]/table'))
-            )
-            pagina += 1
-        except NoSuchElementException:
-            logging.info("Não há mais páginas.")
-            break
-        except Exception as e:
-            logging.error(f"Erro durante a navegação: {e}")
-            break
-
     logging.info(f"Salvando dados extraídos em: {caminho_csv}")
-    dados_consolidados.to_csv(caminho_csv, sep=';', encoding='utf-8-sig', index=False)
-    logging.info("CSV salvo com sucesso.")
 
-
-def salvar_documento_como_pdf(driver, url, nome_arquivo_pdf):
-    """
-    Abre o link do documento e salva como PDF usando o protocolo DevTools.
-    """
+    pacote = sei_pacote.pacote_da_saida(caminho_csv, compressao) if compressao else None
+    sei_rede.aplicar_perfil(driver, perfil_listagem)
     try:
-        driver.get(url)
-        time.sleep(5)  # Aguarda o carregamento
-
-        # Acessa o protocolo DevTools
-        result = driver.execute_cdp_cmd("Page.printToPDF", {
-            "printBackground": True,
-            "paperWidth": 8.27,  # A4 em polegadas
-            "paperHeight": 11.69,
-            "scale": 1
-        })
-
-        # Decodifica e salva o PDF
-        with open(nome_arquivo_pdf, "wb") as f:
-            f.write(base64.b64decode(result['data']))
-        logging.info(f"Documento salvo como PDF: {nome_arquivo_pdf}")
+        with sei_checkpoint.Manifesto.para_saida(caminho_csv, retomar) as manifesto, \
+                sei_saida.abrir_saida(caminho_csv, encoding='utf-8-sig', anexar=retomar,
+                                      posicao=manifesto.posicao_saida()) as saida, \
+                sei_acervo.Acervo(PASTA_ACERVO) as acervo:
+            capturador = sei_pipeline.criar_capturador(driver, trabalhadores, abas, perfil_captura,
+                                                       reautenticador) if capturar else None
+            pipeline = sei_pipeline.Pipeline(
+                PASTA_DOCUMENTOS_HTML, saida, capturador, manifesto, acervo,
+                ao_gravar=(lambda pagina, registros: delta.registrar(registros)) if delta else None,
+                formato=formato, pacote=pacote,
+            )
+            paginas = sei_http.iterar_paginas(driver, motor, trabalhadores=TRABALHADORES_PAGINACAO,
+                                              reautenticador=reautenticador)
+            if delta:
+                paginas = delta.filtrar_paginas(paginas)
+            pipeline.executar(paginas)
+            if delta and pipeline.completa:
+                delta.concluir()
+    finally:
+        if pacote:
+            pacote.adicionar_arquivo(caminho_csv)
+            pacote.fechar()
+        sei_rede.restaurar_perfil(driver)
 
-    except Exception as e:
-        logging.error(f"Erro ao salvar PDF '{nome_arquivo_pdf}': {e}")
+    logging.info("CSV salvo com sucesso.")
 
 
-def baixar_documentos_em_pdf(driver, caminho_csv):
+def materializar_documentos(driver, caminho_csv, trabalhadores=1, abas=1, formato=FORMATO_CAPTURA, compressao=None,
+                            perfil_captura=PERFIL_REDE_CAPTURA, reautenticador=None):
     """
-    Lê os links do CSV gerado e salva cada documento como PDF.
-    """
-    df = pd.read_csv(caminho_csv, sep=';', encoding='utf-8')
-    total = len(df)
-
-    for idx, row in df.iterrows():
-        nome_base = f"{idx+1:03d}_{row['Documento']}".replace('/', '-')
-        nome_limpo = "".join(c for c in nome_base if c.isalnum() or c in " _-").rstrip()
-        caminho_pdf = os.path.join(PASTA_DOCUMENTOS_HTML, f"{nome_limpo}.pdf")
-        link = row['Link Completo']
+    Captura os documentos de uma lista já salva (modo "materializar").
 
-        if pd.isna(link):
-            logging.warning(f"Link vazio para documento {idx}. Pulando.")
-            continue
+    Lê o CSV gerado por navegar_paginas(capturar=False) e passa seus resultados
+    pela mesma pipeline. Documentos já capturados segundo o manifesto do CSV, ou
+    presentes no acervo, não são impressos de novo.
 
-        salvar_documento_como_pdf(driver, link, caminho_pdf)
-        time.sleep(2)  # Pequena pausa entre documentos
+    Args:
+        driver: WebDriver já autenticado.
+        caminho_csv (str): CSV gerado por navegar_paginas.
+        trabalhadores (int): Navegadores headless dedicados à captura.
+        abas (int): Abas do próprio navegador usadas na captura quando trabalhadores == 1.
+        formato (str): "pdf", "mhtml" ou "html" (veja FORMATO_CAPTURA).
+        compressao (str, opcional): Se informada ("nenhuma", "gzip", "lzma" ou "auto"),
+            os documentos e o CSV vão para um único pacote .tar da execução (sei_pacote)
+            em vez de ficarem soltos na pasta.
+        perfil_captura (str): Perfil de rede da captura (sei_rede.PERFIS).
+        reautenticador (sei_sessao.Reautenticador, opcional): Refaz o login se a sessão
+            expirar no meio da captura; o documento afetado é capturado de novo.
+    """
+    pacote = sei_pacote.pacote_da_saida(caminho_csv, compressao) if compressao else None
+    try:
+        with sei_checkpoint.Manifesto.para_saida(caminho_csv, retomar=True) as manifesto, \
+                sei_acervo.Acervo(PASTA_ACERVO) as acervo:
+            capturador = sei_pipeline.criar_capturador(driver, trabalhadores, abas, perfil_captura, reautenticador)
+            pipeline = sei_pipeline.Pipeline(PASTA_DOCUMENTOS_HTML, None, capturador, manifesto, acervo,
+                                             formato=formato, pacote=pacote)
+            pipeline.executar(sei_pipeline.paginas_do_csv(caminho_csv))
+    finally:
+        if pacote:
+            pacote.fechar()
 
 # --- 3. FUNÇÃO PRINCIPAL (MAIN) ---
 
@@ -289,6 +282,35 @@ def main():
     """
     Função principal que orquestra todo o processo de automação.
     """
+    parser = argparse.ArgumentParser(description="Captura documentos do SEI a partir de uma pesquisa.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Navegadores headless dedicados à captura dos PDFs (padrão: 1, no próprio navegador).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continua a última execução interrompida a partir do seu manifesto.")
+    parser.add_argument("--delta", action="store_true",
+                        help="Modo incremental: busca a partir da última data coletada e grava só os resultados novos.")
+    parser.add_argument("--abas", type=int, default=1,
+                        help="Abas do navegador usadas na captura quando --workers é 1 (padrão: 1).")
+    parser.add_argument("--modo", choices=["completo", "metadados", "materializar"], default="completo",
+                        help="completo: lista e captura; metadados: só a lista; "
+                             "materializar: captura os documentos de uma lista já salva.")
+    parser.add_argument("--lista", help="CSV usado em --modo materializar (padrão: o da última execução).")
+    parser.add_argument("--formato", choices=list(sei_captura.EXTENSOES_FORMATO), default=FORMATO_CAPTURA,
+                        help=f"Formato dos documentos capturados (padrão: {FORMATO_CAPTURA}). "
+                             "mhtml é bem mais rápido; o PDF pode ser gerado depois com sei_renderizar.py.")
+    parser.add_argument("--rede-listagem", choices=list(sei_rede.PERFIS), default=PERFIL_REDE_LISTAGEM,
+                        help=f"O que o navegador baixa ao percorrer as páginas (padrão: {PERFIL_REDE_LISTAGEM}).")
+    parser.add_argument("--rede-captura", choices=list(sei_rede.PERFIS), default=PERFIL_REDE_CAPTURA,
+                        help=f"O que o navegador baixa ao capturar os documentos (padrão: {PERFIL_REDE_CAPTURA}; "
+                             "leve basta para mhtml/html).")
+    parser.add_argument("--pacote", nargs="?", const="auto", choices=["nenhuma", "gzip", "lzma", "auto"],
+                        help="Guarda os documentos e o CSV num único .tar da execução, com a compressão "
+                             "indicada (padrão: auto, que não recomprime PDFs).")
+    parser.add_argument("--dataset", nargs="?", const=PASTA_DATASET, default=None,
+                        help="Grava também os resultados num dataset Parquet particionado pelo mês de "
+                             f"inclusão, com datas e colunas tipadas (padrão: {PASTA_DATASET}).")
+    args = parser.parse_args()
+
     configurar_logging()
     logging.info("==== INICIANDO AUTOMAÇÃO DE CAPTURA DE DOCUMENTOS DO SEI ====")
     
@@ -305,36 +327,75 @@ def main():
     orgao = input("Digite a sigla do Órgão (ex: MGI): ")
 
     driver = None
+    delta = None
     try:
         # Inicializa o WebDriver
         logging.info("Inicializando o navegador Chrome.")
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service)
+        driver = sei_navegador.criar_driver()
         driver.implicitly_wait(5) # Espera implícita
 
         # Etapa 1: Login
-        if not realizar_login(driver, URL_SEI, usuario, senha, orgao):
+        # (reaproveita a sessão da execução anterior, se o SEI ainda a aceitar)
+        if not sei_sessao.entrar(driver, URL_SEI, usuario, senha, orgao, realizar_login):
             logging.error("Processo encerrado devido a falha no login.")
             return
+        # Refaz o login se a sessão expirar no meio da execução
+        reautenticador = sei_sessao.Reautenticador(driver, URL_SEI, usuario, senha, orgao, realizar_login)
+
+        # Modo materializar: captura a partir de uma lista já salva, sem nova busca
+        if args.modo == "materializar":
+            caminho_csv = args.lista
+            if caminho_csv is None:
+                manifesto = sei_checkpoint.abrir_para_retomar(PASTA_LISTAS_ARQUIVOS)
+                if manifesto:
+                    caminho_csv = manifesto.obter("caminho_saida")
+                    manifesto.fechar()
+            if not caminho_csv:
+                logging.error("Nenhuma lista encontrada para materializar. Informe --lista.")
+                return
+            logging.info(f"Materializando os documentos de {caminho_csv}.")
+            materializar_documentos(driver, caminho_csv, trabalhadores=args.workers, abas=args.abas,
+                                    formato=args.formato, compressao=args.pacote,
+                                    perfil_captura=args.rede_captura, reautenticador=reautenticador)
+            logging.info("==== PROCESSO DE AUTOMAÇÃO CONCLUÍDO COM SUCESSO ====")
+            return
 
-        # Etapa 2: Busca
-        if not executar_busca(driver):
+        # Etapa 2: Busca (no modo incremental, a partir da última data coletada)
+        delta = sei_delta.EstadoDelta(ARQUIVO_ESTADO_DELTA) if args.delta else None
+        data_inicio = delta.data_inicio(DATA_INICIO_PADRAO) if delta else DATA_INICIO_PADRAO
+        logging.info(f"Buscando documentos incluídos a partir de {data_inicio}.")
+        if not executar_busca(driver, data_inicio):
             logging.error("Processo encerrado devido a falha na busca.")
             return
+        reautenticador.refazer_busca = lambda d: executar_busca(d, data_inicio)
 
         # Etapa 3: Navegação e extração dos dados
         today = datetime.now().strftime('%Y-%m-%d')
         caminho_csv = os.path.join(PASTA_LISTAS_ARQUIVOS, f'documentos_extraidos_{today}.csv')
-        navegar_paginas(driver, caminho_csv)
-        # Etapa 4: Salvar documentos como PDF
-        logging.info("Salvando documentos como PDF.")
-        baixar_documentos_em_pdf(driver, caminho_csv)
+        retomar = False
+        if args.resume:
+            manifesto = sei_checkpoint.abrir_para_retomar(PASTA_LISTAS_ARQUIVOS)
+            if manifesto:
+                caminho_csv = manifesto.obter("caminho_saida", caminho_csv)
+                manifesto.fechar()
+                retomar = True
+        # Etapa 4: Captura dos documentos, na mesma passada (exceto em --modo metadados)
+        navegar_paginas(driver, caminho_csv, retomar=retomar, delta=delta,
+                        capturar=args.modo == "completo", trabalhadores=args.workers, abas=args.abas,
+                        formato=args.formato, compressao=args.pacote,
+                        perfil_listagem=args.rede_listagem, perfil_captura=args.rede_captura,
+                        reautenticador=reautenticador)
+        if args.dataset:
+            total = sei_saida.dataset_do_csv(caminho_csv, args.dataset)
+            logging.info(f"{total} registros gravados no dataset '{args.dataset}'.")
 
         logging.info("==== PROCESSO DE AUTOMAÇÃO CONCLUÍDO COM SUCESSO ====")
 
     except Exception as e:
         logging.critical(f"Ocorreu um erro fatal na automação: {e}")
     finally:
+        if delta:
+            delta.fechar()
         # Garante que o navegador seja fechado no final
         if driver:
             logging.info("Fechando o navegador.")
@@ -1,7 +1,6 @@
 import os
 import time
 import csv
-import base64
 import logging
 import traceback
 from selenium import webdriver
@@ -11,6 +10,9 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+import sei_extracao
+import sei_captura
+
 # ------------------------------------
 # CONFIGURAÇÕES INICIAIS
 # ------------------------------------
@@ -55,43 +57,9 @@ def criar_pastas(diretorio):
 # ------------------------------------
 def extrair_dados(driver):
     """
-    Extrai dados da página atual do SEI.
+    Extrai dados da página atual do SEI com uma única chamada ao navegador.
     """
-    def remove_items(lista, item): 
-        return [i for i in lista if i != item]
-
-    tree_elements = driver.find_elements(By.XPATH, '//*[@class="pesquisaTituloEsquerda"]/a')
-    list_tree = [element.text for element in tree_elements]
-    trees = remove_items(list_tree, '')
-
-    abts = driver.find_elements(By.XPATH, '//*[@class="pesquisaSnippet"]')
-    list_abts = [element.text for element in abts]
-
-    unidades = driver.find_elements(By.XPATH, '//*[@class="pesquisaMetatag"]')
-    list_uni = [element.text.split(':') for element in unidades]
-    info = [sub[1].strip() for sub in list_uni if len(sub) > 1]
-
-    rows = driver.find_elements(By.XPATH, '//*[@id="conteudo"]/table/tbody/tr')
-    links = []
-    for i in range(1, len(rows), 3):
-        try:
-            a = driver.find_element(By.XPATH, f'//*[@id="conteudo"]/table/tbody/tr[{i}]/td[1]/a[1]')
-            link = a.get_attribute('href')
-            links.append(link)
-        except Exception as e:
-            logging.warning(f"Erro ao extrair link da linha {i}: {e}")
-
-    dados = {
-        "Número do Processo": trees[::2],
-        "Documento": trees[1::2],
-        "Resumo": list_abts,
-        "Unidade": info[::3],
-        "Usuário": info[1::3],
-        "Data de Inclusão": info[2::3],
-        "Link Completo": links
-    }
-
-    return pd.DataFrame(dados)
+    return sei_extracao.extrair_dados(driver)
 
  
 
@@ -112,15 +80,12 @@ def salvar_documento_como_pdf(driver, url, nome_arquivo_pdf, pagina, indice):
         except TimeoutException:
             logging.warning(f"[AVISO] Timeout ao carregar {url} na Página {pagina} - Documento {indice}")
 
-        result = driver.execute_cdp_cmd("Page.printToPDF", {
+        sei_captura.imprimir_pdf(driver, nome_arquivo_pdf, {
             "printBackground": True,
             "paperWidth": 8.27,
             "paperHeight": 11.69,
             "scale": 1
         })
-
-        with open(nome_arquivo_pdf, "wb") as f:
-            f.write(base64.b64decode(result['data']))
         logging.info(f"[OK] Página {pagina} - Documento {indice}: PDF salvo em {nome_arquivo_pdf}")
 
         driver.close()
@@ -0,0 +1,198 @@
+import os
+import sys
+import time
+import argparse
+import logging
+import tempfile
+import statistics
+import pandas as pd
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+import sei_rede
+import sei_extracao
+import sei_parser
+
+# --- 1. PÁGINA DE RESULTADOS ---
+
+def gerar_pagina_sintetica(quantidade=10):
+    """
+    Gera uma página de resultados com a mesma estrutura da pesquisa do SEI.
+
+    Args:
+        quantidade (int): Número de resultados na página.
+
+    Returns:
+        str: HTML da página.
+    """
+    linhas = []
+    for i in range(1, quantidade + 1):
+        link = (f"controlador.php?acao=procedimento_trabalhar&id_procedimento={100000 + i}"
+                f"&id_documento={200000 + i}&infra_hash=abc{i:04d}")
+        linhas.append(f"""
+<tr class="pesquisaTituloRegistro">
+  <td class="pesquisaTituloEsquerda"><a href="{link}" target="_blank">00000.{i:06d}/2024-00</a> <a href="{link}" target="_blank">Despacho {i}</a><a href="#"></a></td>
+  <td class="pesquisaTituloDireita"><a href="#">SEI nº {300000 + i}</a></td>
+</tr>
+<tr><td colspan="2" class="pesquisaSnippet">Trecho do documento {i} com o termo pesquisado.</td></tr>
+<tr>
+  <td class="pesquisaMetatag"><b>Unidade:</b> SEGES-DIR{i % 4}</td>
+  <td class="pesquisaMetatag"><b>Usuário:</b> usuario{i % 7}</td>
+  <td class="pesquisaMetatag"><b>Data de Inclusão:</b> {1 + i % 28:02d}/08/2024</td>
+</tr>""")
+    return f"""<html><head><meta charset="utf-8"></head><body>
+<div id="conteudo"><table border="0" width="100%"><tbody>{''.join(linhas)}
+</tbody></table>
+<div><div></div><div></div><div><a>Próxima</a></div></div></div>
+</body></html>"""
+
+# --- 2. ABORDAGEM ANTERIOR (UMA CHAMADA POR ELEMENTO) ---
+
+def extrair_dados_legado(driver):
+    """
+    Reproduz o extrair_dados anterior, que lia cada elemento com uma chamada ao navegador.
+    """
+    def remove_items(lista, item):
+        return [i for i in lista if i != item]
+
+    tree_elements = driver.find_elements(By.XPATH, '//*[@class="pesquisaTituloEsquerda"]/a')
+    list_tree = [element.text for element in tree_elements]
+    trees = remove_items(list_tree, '')
+
+    abts = driver.find_elements(By.XPATH, '//*[@class="pesquisaSnippet"]')
+    list_abts = [element.text for element in abts]
+
+    unidades = driver.find_elements(By.XPATH, '//*[@class="pesquisaMetatag"]')
+    list_uni = [element.text.split(':') for element in unidades]
+    info = [sub[1].strip() for sub in list_uni if len(sub) > 1]
+
+    rows = driver.find_elements(By.XPATH, '//*[@id="conteudo"]/table/tbody/tr')
+    links = []
+    for i in range(1, len(rows), 3):
+        try:
+            a = driver.find_element(By.XPATH, f'//*[@id="conteudo"]/table/tbody/tr[{i}]/td[1]/a[1]')
+            links.append(a.get_attribute('href'))
+        except Exception as e:
+            logging.warning(f"Erro ao extrair link da linha {i}: {e}")
+
+    dados = {
+        "Número do Processo": trees[::2],
+        "Documento": trees[1::2],
+        "Resumo": list_abts,
+        "Unidade": info[::3],
+        "Usuário": info[1::3],
+        "Data de Inclusão": info[2::3],
+        "Link Completo": links
+    }
+    return pd.DataFrame(dados)
+
+# --- 3. PERFIL DE REDE ---
+
+# Folha de estilo da página sintética. O innerText depende do layout: sem ela, o
+# resumo sai em minúsculas, então um perfil que bloqueie CSS muda a extração
+ESTILO_SINTETICO = ".pesquisaSnippet { text-transform: uppercase; }\n"
+
+
+def comparar_perfil(driver, url, perfil):
+    """
+    Extrai a página sem bloqueios e com o perfil de rede, e compara os resultados.
+
+    Returns:
+        bool: True se a extração for idêntica nos dois casos.
+    """
+    extraidos = {}
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    try:
+        for nome in ("completo", perfil):
+            sei_rede.aplicar_perfil(driver, nome)
+            driver.get(url)
+            extraidos[nome] = sei_extracao.extrair_dados(driver)
+    finally:
+        sei_rede.restaurar_perfil(driver)
+    return extraidos["completo"].equals(extraidos[perfil])
+
+# --- 4. MEDIÇÃO ---
+
+def medir(funcao, entrada, repeticoes):
+    """
+    Executa a função de extração várias vezes e devolve os tempos em segundos.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(entrada)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a extração por elemento com a extração em uma única chamada.")
+    parser.add_argument("pagina", nargs="?", help="Página de resultados salva (HTML). Sem ela, usa uma página sintética.")
+    parser.add_argument("--resultados", type=int, default=10, help="Resultados da página sintética.")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--offline", action="store_true", help="Mede apenas o parsing do HTML, sem abrir o navegador.")
+    parser.add_argument("--perfil", choices=list(sei_rede.PERFIS),
+                        help="Confere se a extração com este perfil de rede é idêntica à sem bloqueios "
+                             f"(o da listagem é {sei_rede.PERFIL_LISTAGEM}).")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    temporarios = []
+    if args.pagina:
+        caminho = os.path.abspath(args.pagina)
+    else:
+        arquivo = tempfile.NamedTemporaryFile("w", suffix=".html", encoding="utf-8", delete=False)
+        with arquivo:
+            caminho_estilo = os.path.splitext(arquivo.name)[0] + ".css"
+            with open(caminho_estilo, "w", encoding="utf-8") as f:
+                f.write(ESTILO_SINTETICO)
+            cabecalho = f'<link rel="stylesheet" href="{os.path.basename(caminho_estilo)}">'
+            arquivo.write(gerar_pagina_sintetica(args.resultados).replace("<head>", "<head>" + cabecalho))
+        caminho = arquivo.name
+        temporarios = [caminho, caminho_estilo]
+
+    if args.offline:
+        with open(caminho, encoding="utf-8") as f:
+            html = f.read()
+        tempos = medir(sei_parser.parse_pagina_resultados, html, args.repeticoes)
+        print(f"{'parser offline':>14}: mediana {statistics.median(tempos) * 1000:8.1f} ms"
+              f" | mínimo {min(tempos) * 1000:8.1f} ms ({args.repeticoes} repetições)")
+        for temporario in temporarios:
+            os.unlink(temporario)
+        return
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    driver = webdriver.Chrome(options=options)
+    try:
+        if args.perfil:
+            identica = comparar_perfil(driver, "file://" + caminho, args.perfil)
+            print(f"Extração com o perfil '{args.perfil}': {'idêntica' if identica else 'DIFERENTE'} da sem bloqueios.")
+        driver.get("file://" + caminho)
+
+        df_legado = extrair_dados_legado(driver)
+        df_novo = sei_extracao.extrair_dados(driver)
+        print(f"Resultados extraídos: legado={len(df_legado)}, única chamada={len(df_novo)}")
+        if len(df_legado) == len(df_novo) and not df_legado.equals(df_novo):
+            print("Aviso: os dois métodos divergem em algum campo.", file=sys.stderr)
+
+        metodos = [
+            ("legado", extrair_dados_legado),
+            ("única chamada", sei_extracao.extrair_dados),
+            ("page_source", sei_parser.extrair_dados_offline),
+        ]
+        for nome, funcao in metodos:
+            tempos = medir(funcao, driver, args.repeticoes)
+            print(f"{nome:>14}: mediana {statistics.median(tempos) * 1000:8.1f} ms"
+                  f" | mínimo {min(tempos) * 1000:8.1f} ms ({args.repeticoes} repetições)")
+    finally:
+        driver.quit()
+        for temporario in temporarios:
+            os.unlink(temporario)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import argparse
+import logging
+import tempfile
+import statistics
+from pathlib import Path
+
+import sei_rede
+import sei_navegador
+from benchmark_extracao import gerar_pagina_sintetica
+
+# --- 1. PÁGINA COM RECURSOS ---
+
+def gerar_pagina_com_recursos(pasta, resultados=10, imagens=8, tamanho=200 * 1024):
+    """
+    Gera a página de resultados sintética com folha de estilo, fonte e imagens ao lado.
+
+    Returns:
+        str: Caminho do HTML.
+    """
+    recursos = {"estilo.css": b"body { font-family: 'Fonte', sans-serif; }\n" * 200,
+                "fonte.woff2": os.urandom(tamanho)}
+    for i in range(imagens):
+        recursos[f"imagem{i}.png"] = os.urandom(tamanho)
+    for nome, conteudo in recursos.items():
+        Path(pasta, nome).write_bytes(conteudo)
+
+    cabecalho = ('<link rel="stylesheet" href="estilo.css">'
+                 '<style>@font-face { font-family: Fonte; src: url(fonte.woff2); }</style>')
+    figuras = "".join(f'<img src="imagem{i}.png">' for i in range(imagens))
+    html = gerar_pagina_sintetica(resultados).replace("<head>", "<head>" + cabecalho).replace("<body>", "<body>" + figuras)
+    caminho = os.path.join(pasta, "resultados.html")
+    Path(caminho).write_text(html, encoding="utf-8")
+    return caminho
+
+# --- 2. MEDIÇÃO ---
+
+def _eventos_de_rede(driver):
+    """Consome o log de performance do Chrome e devolve os eventos Network.*."""
+    for entrada in driver.get_log("performance"):
+        mensagem = json.loads(entrada["message"])["message"]
+        if mensagem["method"].startswith("Network."):
+            yield mensagem["method"], mensagem["params"]
+
+
+def medir_perfil(perfil, urls, repeticoes):
+    """
+    Carrega as páginas com o perfil de rede e mede tempo, bytes e requisições bloqueadas.
+
+    Returns:
+        dict: Medianas por página de tempo (s), bytes recebidos e bloqueios.
+    """
+    options = sei_navegador.opcoes_chrome(headless=True)
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    driver = sei_navegador.webdriver.Chrome(
+        service=sei_navegador.ChromeService(sei_navegador.caminho_chromedriver()), options=options)
+    try:
+        sei_rede.aplicar_perfil(driver, perfil)
+        # Sem cache, para cada carga baixar tudo de novo
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+        tempos, bytes_, bloqueios = [], [], []
+        for _ in range(repeticoes):
+            for url in urls:
+                list(_eventos_de_rede(driver))
+                inicio = time.perf_counter()
+                driver.get(url)
+                tempos.append(time.perf_counter() - inicio)
+                recebidos = bloqueados = 0
+                for metodo, parametros in _eventos_de_rede(driver):
+                    if metodo == "Network.loadingFinished":
+                        recebidos += parametros.get("encodedDataLength", 0)
+                    elif metodo == "Network.loadingFailed" and parametros.get("blockedReason"):
+                        bloqueados += 1
+                bytes_.append(recebidos)
+                bloqueios.append(bloqueados)
+        return {
+            "tempo": statistics.median(tempos),
+            "bytes": statistics.median(bytes_),
+            "bloqueios": statistics.median(bloqueios),
+        }
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os perfis de rede (sei_rede) em tempo e bytes por página.")
+    parser.add_argument("urls", nargs="*", help="Páginas a carregar (URLs ou arquivos). Sem elas, usa uma página sintética com imagens e fontes.")
+    parser.add_argument("--perfis", nargs="+", choices=list(sei_rede.PERFIS), default=list(sei_rede.PERFIS))
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    with tempfile.TemporaryDirectory() as pasta:
+        urls = [u if "://" in u else Path(u).resolve().as_uri() for u in args.urls]
+        if not urls:
+            urls = [Path(gerar_pagina_com_recursos(pasta)).as_uri()]
+
+        medidas = {perfil: medir_perfil(perfil, urls, args.repeticoes) for perfil in args.perfis}
+
+    referencia = medidas.get("completo")
+    for perfil, medida in medidas.items():
+        linha = (f"{perfil:>9}: {medida['tempo'] * 1000:8.1f} ms | {medida['bytes'] / 1024:9.1f} KiB"
+                 f" | {medida['bloqueios']:4.0f} bloqueios por página")
+        if referencia and perfil != "completo":
+            linha += (f" | economia de {(referencia['tempo'] - medida['tempo']) * 1000:.1f} ms"
+                      f" e {(referencia['bytes'] - medida['bytes']) / 1024:.1f} KiB")
+        print(linha)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import os
+import shutil
+import sqlite3
+import hashlib
+from datetime import datetime
+
+# --- 1. ACERVO LOCAL DE DOCUMENTOS ---
+
+# Pasta padrão do acervo, compartilhada entre as execuções
+PASTA_ACERVO = "acervo_documentos"
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """SHA-256 do conteúdo do arquivo, lido em blocos."""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _copiar(origem, destino):
+    """
+    Copia origem para destino, substituindo-o de uma vez (cópia temporária + os.replace).
+
+    Uma cópia, e não um hard link: o arquivo da execução e o objeto do acervo são
+    independentes, então editar ou truncar um não altera o outro.
+    """
+    temporario = destino + ".parcial"
+    try:
+        shutil.copy2(origem, temporario)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+class Acervo:
+    """
+    Acervo local de documentos capturados, indexado pelo id_documento do SEI.
+
+    O conteúdo fica em objetos/<hash[:2]>/<hash><extensão>, endereçado pelo SHA-256,
+    então documentos idênticos ocupam espaço uma única vez. O índice (SQLite)
+    associa cada id_documento e formato (extensão: .pdf, .mhtml, .html) ao hash
+    do conteúdo capturado. Antes de abrir uma aba, os scripts consultam o acervo;
+    documentos já guardados são apenas copiados para a pasta da execução, sem
+    nova captura.
+    """
+
+    def __init__(self, diretorio=PASTA_ACERVO):
+        self.diretorio = diretorio
+        os.makedirs(os.path.join(diretorio, "objetos"), exist_ok=True)
+        self._conexao = sqlite3.connect(os.path.join(diretorio, "indice.sqlite3"), check_same_thread=False)
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS documentos (
+                id_documento TEXT NOT NULL,
+                extensao TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                processo TEXT,
+                documento TEXT,
+                data_inclusao TEXT,
+                capturado_em TEXT NOT NULL,
+                PRIMARY KEY (id_documento, extensao)
+            )
+        """)
+        self._conexao.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self._conexao.close()
+
+    def _caminho_objeto(self, sha256, extensao):
+        return os.path.join(self.diretorio, "objetos", sha256[:2], sha256 + extensao)
+
+    def caminho(self, id_documento, extensao=".pdf"):
+        """Caminho do conteúdo guardado para o documento no formato da extensão, ou None."""
+        if not id_documento:
+            return None
+        linha = self._conexao.execute(
+            "SELECT sha256, extensao FROM documentos WHERE id_documento = ? AND extensao = ?",
+            (id_documento, extensao),
+        ).fetchone()
+        return self._caminho_objeto(*linha) if linha else None
+
+    def sem_formato(self, extensao_origem, extensao_destino):
+        """
+        Documentos guardados num formato e ainda não no outro (por exemplo, MHTML sem PDF).
+
+        Returns:
+            list[tuple[str, str]]: (id_documento, caminho do objeto de origem).
+        """
+        linhas = self._conexao.execute(
+            """
+            SELECT origem.id_documento, origem.sha256, origem.extensao
+            FROM documentos AS origem
+            WHERE origem.extensao = ? AND NOT EXISTS (
+                SELECT 1 FROM documentos AS destino
+                WHERE destino.id_documento = origem.id_documento AND destino.extensao = ?
+            )
+            """,
+            (extensao_origem, extensao_destino),
+        ).fetchall()
+        return [(id_documento, self._caminho_objeto(sha256, extensao)) for id_documento, sha256, extensao in linhas]
+
+    def listar(self, extensoes=None):
+        """
+        Documentos guardados no acervo.
+
+        Args:
+            extensoes (list[str], opcional): Formatos a listar (por exemplo, [".html", ".mhtml"]); padrão, todos.
+
+        Returns:
+            list[tuple[str, str, str, str]]: (id_documento, extensão, sha256, caminho do objeto).
+        """
+        linhas = self._conexao.execute(
+            "SELECT id_documento, extensao, sha256 FROM documentos ORDER BY id_documento, extensao"
+        ).fetchall()
+        return [
+            (id_documento, extensao, sha256, self._caminho_objeto(sha256, extensao))
+            for id_documento, extensao, sha256 in linhas
+            if extensoes is None or extensao in extensoes
+        ]
+
+    def guardar(self, id_documento, caminho_arquivo, registro=None):
+        """
+        Guarda no acervo um documento recém-capturado.
+
+        Args:
+            id_documento (str): Identificador do documento no SEI.
+            caminho_arquivo (str): Arquivo capturado (permanece onde está; o acervo guarda uma cópia).
+            registro (Registro, opcional): Metadados do resultado da pesquisa.
+
+        Returns:
+            str: SHA-256 do conteúdo.
+        """
+        sha256 = hash_arquivo(caminho_arquivo)
+        extensao = os.path.splitext(caminho_arquivo)[1].lower()
+        objeto = self._caminho_objeto(sha256, extensao)
+        if not os.path.exists(objeto):
+            os.makedirs(os.path.dirname(objeto), exist_ok=True)
+            _copiar(caminho_arquivo, objeto)
+
+        self._conexao.execute(
+            "INSERT OR REPLACE INTO documentos VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                id_documento, extensao, sha256, os.path.getsize(objeto),
+                registro.processo if registro else None,
+                registro.documento if registro else None,
+                registro.data_inclusao if registro else None,
+                datetime.now().isoformat(timespec='seconds'),
+            ),
+        )
+        self._conexao.commit()
+        return sha256
+
+    def exportar(self, id_documento, destino):
+        """
+        Copia um documento do acervo para `destino`.
+
+        O formato procurado é o da extensão de `destino`. Os nomes da pasta da
+        execução são posicionais e a pasta pode vir de outra execução, então um
+        arquivo que já esteja em `destino` só é mantido se tiver o mesmo conteúdo.
+
+        Returns:
+            bool: True se o documento estava no acervo nesse formato.
+        """
+        extensao = os.path.splitext(destino)[1].lower()
+        linha = self._conexao.execute(
+            "SELECT sha256 FROM documentos WHERE id_documento = ? AND extensao = ?",
+            (id_documento, extensao),
+        ).fetchone() if id_documento else None
+        if linha is None:
+            return False
+        objeto = self._caminho_objeto(linha[0], extensao)
+        if not os.path.exists(objeto):
+            return False
+        if not os.path.exists(destino) or hash_arquivo(destino) != linha[0]:
+            _copiar(objeto, destino)
+        return True
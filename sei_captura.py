@@ -0,0 +1,274 @@
+import os
+import base64
+import logging
+import multiprocessing
+from multiprocessing.util import Finalize
+
+import sei_espera
+import sei_navegador
+import sei_rede
+
+# --- 1. IMPRESSÃO EM PDF ---
+
+# Parâmetros do Page.printToPDF: A4 em polegadas, margens de 0,4"
+PARAMETROS_PDF = {
+    "printBackground": True,
+    "paperWidth": 8.27,
+    "paperHeight": 11.69,
+    "marginTop": 0.4,
+    "marginBottom": 0.4,
+    "marginLeft": 0.4,
+    "marginRight": 0.4,
+}
+
+# Argumentos do Chrome usados pelos trabalhadores de captura: o perfil comum, sem janela
+ARGUMENTOS_CHROME_HEADLESS = sei_navegador.ARGUMENTOS_CHROME + [sei_navegador.ARGUMENTO_HEADLESS]
+
+
+# Tamanho de cada leitura do stream do PDF (IO.read)
+TAMANHO_BLOCO_PDF = 1024 * 1024
+
+# Formatos de captura e suas extensões. "html" guarda só o HTML da página;
+# "mhtml" guarda a página com imagens e estilos num único arquivo
+# (Page.captureSnapshot), que pode virar PDF depois, fora da sessão
+# (sei_renderizar); "pdf" renderiza na hora, o mais caro dos três.
+EXTENSOES_FORMATO = {
+    "pdf": ".pdf",
+    "mhtml": ".mhtml",
+    "html": ".html",
+}
+
+# Script que devolve o HTML da página já montada (inclusive o que veio por JavaScript)
+SCRIPT_HTML = "return '<!DOCTYPE html>\\n' + document.documentElement.outerHTML;"
+
+
+def imprimir_pdf(driver, caminho_pdf, parametros=None):
+    """
+    Usa o protocolo DevTools para salvar a aba atual como PDF.
+
+    O PDF é pedido como stream (transferMode: ReturnAsStream) e lido em blocos
+    de TAMANHO_BLOCO_PDF direto para o disco, então o pico de memória não depende
+    do tamanho do documento. O arquivo é gravado com a extensão '.parcial' e só
+    recebe o nome final quando está completo.
+
+    Args:
+        driver: WebDriver do Selenium (Chrome).
+        caminho_pdf (str): Caminho completo do arquivo PDF a ser salvo.
+        parametros (dict, opcional): Parâmetros do Page.printToPDF; padrão PARAMETROS_PDF.
+    """
+    parametros = dict(parametros or PARAMETROS_PDF, transferMode="ReturnAsStream")
+    stream = driver.execute_cdp_cmd("Page.printToPDF", parametros)["stream"]
+    caminho_parcial = caminho_pdf + ".parcial"
+    try:
+        with open(caminho_parcial, 'wb') as f:
+            while True:
+                bloco = driver.execute_cdp_cmd("IO.read", {"handle": stream, "size": TAMANHO_BLOCO_PDF})
+                if bloco.get("data"):
+                    f.write(base64.b64decode(bloco["data"]) if bloco.get("base64Encoded") else bloco["data"].encode("latin-1"))
+                if bloco.get("eof"):
+                    break
+        os.replace(caminho_parcial, caminho_pdf)
+    finally:
+        # Uma falha ao fechar o stream não deve esconder o erro da leitura
+        try:
+            driver.execute_cdp_cmd("IO.close", {"handle": stream})
+        except Exception as e:
+            logging.warning(f"Não foi possível fechar o stream do PDF: {e}")
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+
+
+def formato_do_caminho(caminho):
+    """Formato de captura indicado pela extensão do arquivo ('pdf', 'mhtml' ou 'html')."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    for formato, extensao_formato in EXTENSOES_FORMATO.items():
+        if extensao == extensao_formato:
+            return formato
+    raise ValueError(f"Formato de captura desconhecido para '{caminho}'.")
+
+
+def _gravar_texto(caminho, texto):
+    """Grava o arquivo com nome provisório e só o renomeia quando estiver completo."""
+    caminho_parcial = caminho + ".parcial"
+    try:
+        with open(caminho_parcial, 'w', encoding='utf-8', newline='') as f:
+            f.write(texto)
+        os.replace(caminho_parcial, caminho)
+    finally:
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+
+
+def salvar_mhtml(driver, caminho):
+    """Salva a aba atual como MHTML (Page.captureSnapshot), sem renderizar PDF."""
+    _gravar_texto(caminho, driver.execute_cdp_cmd("Page.captureSnapshot", {"format": "mhtml"})["data"])
+
+
+def salvar_html(driver, caminho):
+    """Salva o HTML da aba atual."""
+    _gravar_texto(caminho, driver.execute_script(SCRIPT_HTML))
+
+
+def capturar_aba(driver, caminho):
+    """
+    Salva a aba atual no formato indicado pela extensão do caminho.
+
+    Args:
+        driver: WebDriver do Selenium (Chrome).
+        caminho (str): Arquivo de destino (.pdf, .mhtml ou .html).
+    """
+    formato = formato_do_caminho(caminho)
+    if formato == "pdf":
+        imprimir_pdf(driver, caminho)
+    elif formato == "mhtml":
+        salvar_mhtml(driver, caminho)
+    else:
+        salvar_html(driver, caminho)
+
+# --- 2. POOL DE NAVEGADORES ---
+
+def cookie_cdp(cookie):
+    """Converte um cookie do Selenium para o formato de Network.setCookies."""
+    convertido = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain"),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if cookie.get("sameSite"):
+        convertido["sameSite"] = cookie["sameSite"]
+    if cookie.get("expiry"):
+        convertido["expires"] = cookie["expiry"]
+    return convertido
+
+
+# Erro devolvido por um trabalhador que encontrou o formulário de login no lugar
+# do documento; quem tem o navegador principal pode renovar a sessão e reenviar
+ERRO_SESSAO_EXPIRADA = "Sessão do SEI expirada"
+
+# Navegador de cada processo trabalhador, criado em _iniciar_trabalhador
+_driver_trabalhador = None
+
+# Renovação da sessão cujos cookies o navegador do trabalhador está usando
+_geracao_trabalhador = 0
+
+
+def _iniciar_trabalhador(cookies, argumentos, perfil=None):
+    """Abre o Chrome do processo trabalhador e injeta os cookies da sessão autenticada."""
+    global _driver_trabalhador
+
+    _driver_trabalhador = sei_navegador.criar_driver(argumentos=argumentos)
+    _driver_trabalhador.execute_cdp_cmd("Network.enable", {})
+    _driver_trabalhador.execute_cdp_cmd("Network.setCookies", {"cookies": [cookie_cdp(c) for c in cookies]})
+    if perfil:
+        sei_rede.aplicar_perfil(_driver_trabalhador, perfil)
+
+    # Fecha o navegador quando o processo terminar (pool.close() + pool.join())
+    Finalize(None, _driver_trabalhador.quit, exitpriority=10)
+    logging.info(f"Trabalhador de captura iniciado (pid {os.getpid()}).")
+
+
+def _capturar(tarefa):
+    """Captura um documento no navegador do trabalhador. Devolve (link, caminho, erro)."""
+    global _geracao_trabalhador
+
+    link, caminho, sessao = tarefa
+    try:
+        # Cookies de um login refeito depois que o trabalhador foi iniciado
+        if sessao and sessao[0] > _geracao_trabalhador:
+            _driver_trabalhador.execute_cdp_cmd("Network.setCookies", {"cookies": [cookie_cdp(c) for c in sessao[1]]})
+            _geracao_trabalhador = sessao[0]
+        _driver_trabalhador.get(link)
+        sei_espera.rede_ociosa(_driver_trabalhador, ociosidade=0.3)
+        # Nunca salva o formulário de login como se fosse o documento
+        if sei_espera.pagina_de_login(_driver_trabalhador):
+            logging.warning(f"O SEI pediu login ao abrir '{caminho}'.")
+            return link, caminho, ERRO_SESSAO_EXPIRADA
+        capturar_aba(_driver_trabalhador, caminho)
+        logging.info(f"Documento salvo: {caminho}")
+        return link, caminho, None
+    except Exception as e:
+        logging.error(f"Erro ao salvar documento '{caminho}': {e}")
+        return link, caminho, str(e)
+
+
+class PoolCaptura:
+    """
+    Pool de processos, cada um com seu Chrome headless, para salvar documentos
+    (PDF, MHTML ou HTML, conforme a extensão do caminho).
+
+    Os trabalhadores recebem os cookies da sessão já autenticada, então não fazem
+    login. Os documentos enviados entram numa fila e são impressos assim que um
+    trabalhador fica livre, enquanto o navegador principal segue paginando.
+    """
+
+    def __init__(self, driver, trabalhadores=4, argumentos=None, perfil=None):
+        """
+        Args:
+            driver: WebDriver já autenticado, de onde os cookies são copiados. Com
+                None, os navegadores começam sem sessão (por exemplo, para
+                renderizar arquivos locais em sei_renderizar).
+            trabalhadores (int): Quantidade de navegadores (processos) no pool.
+            argumentos (list[str], opcional): Argumentos do Chrome dos trabalhadores.
+            perfil (str, opcional): Perfil de rede dos trabalhadores (sei_rede.PERFIS).
+        """
+        self.trabalhadores = trabalhadores
+        # Resolve o chromedriver uma vez aqui; os trabalhadores leem o cache
+        sei_navegador.caminho_chromedriver()
+        self._pool = multiprocessing.Pool(
+            processes=trabalhadores,
+            initializer=_iniciar_trabalhador,
+            initargs=(driver.get_cookies() if driver else [], argumentos or ARGUMENTOS_CHROME_HEADLESS, perfil),
+        )
+        self._pendentes = []
+        logging.info(f"Pool de captura com {trabalhadores} navegadores iniciado.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def enviar(self, link, caminho_pdf, ao_concluir=None, sessao=None):
+        """
+        Coloca um documento na fila de captura.
+
+        Args:
+            ao_concluir (opcional): Chamada com (link, caminho_pdf, erro) assim que
+                o documento terminar, numa thread interna do pool.
+            sessao (tuple[int, list[dict]], opcional): (renovação, cookies) de um
+                login refeito; o trabalhador troca seus cookies antes de capturar,
+                se ainda estiver com uma renovação anterior.
+        """
+        callback = (lambda resultado: ao_concluir(*resultado)) if ao_concluir else None
+        self._pendentes.append(self._pool.apply_async(_capturar, ((link, caminho_pdf, sessao),), callback=callback))
+
+    def aguardar(self):
+        """
+        Aguarda todos os documentos enviados.
+
+        Returns:
+            list[tuple[str, str, str | None]]: (link, caminho_pdf, erro) de cada documento.
+        """
+        resultados = [pendente.get() for pendente in self._pendentes]
+        self._pendentes = []
+        falhas = sum(1 for _, _, erro in resultados if erro)
+        logging.info(f"Captura concluída: {len(resultados) - falhas} PDFs salvos, {falhas} falhas.")
+        return resultados
+
+    def fechar(self):
+        """
+        Aguarda a fila e encerra os navegadores.
+
+        Returns:
+            list[tuple[str, str, str | None]]: Resultados ainda não entregues por aguardar().
+        """
+        if self._pool is None:
+            return []
+        resultados = self.aguardar()
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        return resultados
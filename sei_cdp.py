@@ -0,0 +1,342 @@
+import os
+import json
+import base64
+import asyncio
+import logging
+import itertools
+import urllib.request
+from urllib.parse import urlsplit
+from wsproto import WSConnection, ConnectionType
+from wsproto.events import Request, AcceptConnection, RejectConnection, TextMessage, Ping, CloseConnection
+
+import sei_rede
+import sei_espera
+from sei_captura import PARAMETROS_PDF, TAMANHO_BLOCO_PDF, SCRIPT_HTML, formato_do_caminho
+
+# --- 1. CONEXÃO CDP ASSÍNCRONA ---
+
+# Tempo máximo, em segundos, pela resposta de um comando (Page.printToPDF de um
+# documento grande é o mais lento)
+ESPERA_COMANDO = 120
+
+class ErroCDP(Exception):
+    """Erro devolvido pelo Chrome a um comando do DevTools Protocol."""
+
+
+class ConexaoCDP:
+    """
+    Conexão assíncrona com o DevTools Protocol do navegador (WebSocket via wsproto).
+
+    Usa sessões "flatten": todos os alvos (abas) compartilham a mesma conexão e
+    cada comando ou evento carrega o sessionId da aba a que pertence.
+    """
+
+    def __init__(self, url_websocket):
+        self.url_websocket = url_websocket
+        self._ids = itertools.count(1)
+        self._pendentes = {}
+        self._esperas = {}
+        self._ws = WSConnection(ConnectionType.CLIENT)
+        self._leitor = None
+        self._escritor = None
+        self._tarefa = None
+        self._encerrada = False
+
+    async def conectar(self):
+        partes = urlsplit(self.url_websocket)
+        self._leitor, self._escritor = await asyncio.open_connection(partes.hostname, partes.port)
+        self._escritor.write(self._ws.send(Request(host=partes.netloc, target=partes.path)))
+        await self._escritor.drain()
+
+        while True:
+            dados = await self._leitor.read(65536)
+            if not dados:
+                raise ErroCDP("Conexão DevTools encerrada antes do handshake.")
+            self._ws.receive_data(dados)
+            for evento in self._ws.events():
+                if isinstance(evento, AcceptConnection):
+                    self._tarefa = asyncio.create_task(self._receber())
+                    return self
+                if isinstance(evento, RejectConnection):
+                    raise ErroCDP(f"Conexão DevTools recusada (HTTP {evento.status_code}).")
+
+    async def fechar(self):
+        if self._tarefa:
+            self._tarefa.cancel()
+        if self._escritor:
+            self._escritor.close()
+
+    async def __aenter__(self):
+        return await self.conectar()
+
+    async def __aexit__(self, *exc):
+        await self.fechar()
+
+    async def _receber(self):
+        """
+        Lê as mensagens do navegador e entrega respostas e eventos a quem os aguarda.
+
+        Quando a leitura termina, por qualquer motivo, os comandos e eventos ainda
+        aguardados falham com ConnectionError, em vez de esperarem para sempre.
+        """
+        partes = []
+        try:
+            while True:
+                dados = await self._leitor.read(65536)
+                if not dados:
+                    return
+                self._ws.receive_data(dados)
+                for evento in self._ws.events():
+                    if isinstance(evento, Ping):
+                        self._escritor.write(self._ws.send(evento.response()))
+                    elif isinstance(evento, CloseConnection):
+                        return
+                    elif isinstance(evento, TextMessage):
+                        partes.append(evento.data)
+                        if evento.message_finished:
+                            self._despachar(json.loads("".join(partes)))
+                            partes = []
+        except Exception as e:
+            logging.error(f"Erro na leitura da conexão DevTools: {e}")
+        finally:
+            self._encerrada = True
+            aguardados = list(self._pendentes.values())
+            for esperas in self._esperas.values():
+                aguardados.extend(esperas)
+            self._pendentes.clear()
+            self._esperas.clear()
+            for futuro in aguardados:
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("Conexão DevTools encerrada."))
+
+    def _despachar(self, mensagem):
+        if "id" in mensagem:
+            futuro = self._pendentes.pop(mensagem["id"], None)
+            if futuro is None or futuro.done():
+                return
+            if "error" in mensagem:
+                futuro.set_exception(ErroCDP(mensagem["error"].get("message", mensagem["error"])))
+            else:
+                futuro.set_result(mensagem.get("result", {}))
+            return
+
+        chave = (mensagem.get("method"), mensagem.get("sessionId"))
+        for futuro in self._esperas.pop(chave, []):
+            if not futuro.done():
+                futuro.set_result(mensagem.get("params", {}))
+
+    async def enviar(self, metodo, parametros=None, sessao=None, espera=ESPERA_COMANDO):
+        """
+        Envia um comando CDP e aguarda a resposta.
+
+        Args:
+            metodo (str): Por exemplo, "Page.navigate".
+            parametros (dict, opcional): Parâmetros do comando.
+            sessao (str, opcional): sessionId da aba; sem ele, o comando vai para o navegador.
+            espera (float): Tempo máximo, em segundos, pela resposta.
+
+        Returns:
+            dict: Campo "result" da resposta.
+
+        Raises:
+            ConnectionError: Se a conexão foi encerrada.
+            asyncio.TimeoutError: Se o navegador não respondeu a tempo.
+        """
+        if self._encerrada:
+            raise ConnectionError("Conexão DevTools encerrada.")
+        identificador = next(self._ids)
+        mensagem = {"id": identificador, "method": metodo, "params": parametros or {}}
+        if sessao:
+            mensagem["sessionId"] = sessao
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes[identificador] = futuro
+        self._escritor.write(self._ws.send(TextMessage(data=json.dumps(mensagem))))
+        try:
+            await self._escritor.drain()
+            return await asyncio.wait_for(futuro, espera)
+        finally:
+            self._pendentes.pop(identificador, None)
+
+    def evento(self, metodo, sessao=None):
+        """
+        Registra a espera por um evento antes do comando que o dispara.
+
+        Returns:
+            asyncio.Future: Resolvido com os "params" do próximo evento `metodo` da sessão.
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        if self._encerrada:
+            futuro.set_exception(ConnectionError("Conexão DevTools encerrada."))
+            return futuro
+        self._esperas.setdefault((metodo, sessao), []).append(futuro)
+        return futuro
+
+
+def endereco_devtools(driver):
+    """
+    Descobre o WebSocket do navegador controlado pelo WebDriver.
+
+    Returns:
+        str: URL ws:// do alvo "browser" do Chrome.
+    """
+    endereco = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+    if not endereco:
+        raise ErroCDP("O WebDriver não informou o debuggerAddress do Chrome.")
+    with urllib.request.urlopen(f"http://{endereco}/json/version", timeout=10) as resposta:
+        return json.load(resposta)["webSocketDebuggerUrl"]
+
+# --- 2. IMPRESSÃO EM VÁRIAS ABAS ---
+
+async def _pagina_de_login(conexao, sessao):
+    """Versão CDP de sei_espera.pagina_de_login."""
+    expressao = sei_espera.SCRIPT_PAGINA_LOGIN.removeprefix("return ").rstrip(";")
+    resposta = await conexao.enviar("Runtime.evaluate", {"expression": expressao, "returnByValue": True}, sessao)
+    return bool(resposta["result"].get("value"))
+
+
+async def _carregar(conexao, sessao, link, espera):
+    """Navega a aba até o link e aguarda o evento load (ou o teto `espera`)."""
+    carregada = conexao.evento("Page.loadEventFired", sessao)
+    await conexao.enviar("Page.navigate", {"url": link}, sessao)
+    try:
+        await asyncio.wait_for(carregada, espera)
+    except asyncio.TimeoutError:
+        logging.warning(f"[AVISO] Timeout ao carregar {link}; salvando o que foi carregado.")
+
+
+async def _trabalhador_aba(conexao, proxima, ao_concluir, espera, perfil=None, reautenticador=None):
+    """
+    Abre uma aba e captura, nela, os documentos até acabarem.
+
+    Se o SEI devolver o formulário de login no lugar de um documento, nada é
+    salvo: com `reautenticador`, o login é refeito e o mesmo documento carregado
+    de novo; sem ele, o documento é registrado como falha.
+
+    Args:
+        proxima: Corrotina que devolve o próximo par (link, caminho), ou None no fim.
+        ao_concluir: Chamada com (link, caminho, erro) de cada documento.
+        perfil (str, opcional): Perfil de rede da aba (sei_rede.PERFIS).
+        reautenticador (sei_sessao.Reautenticador, opcional): Refaz o login no
+            navegador; as abas compartilham os cookies dele.
+    """
+    alvo = (await conexao.enviar("Target.createTarget", {"url": "about:blank"}))["targetId"]
+    sessao = (await conexao.enviar("Target.attachToTarget", {"targetId": alvo, "flatten": True}))["sessionId"]
+    try:
+        await conexao.enviar("Page.enable", sessao=sessao)
+        if perfil:
+            await sei_rede.aplicar_perfil_async(conexao, sessao, perfil)
+        while True:
+            tarefa = await proxima()
+            if tarefa is None:
+                return
+            link, caminho = tarefa
+            try:
+                tentativas = reautenticador.tentativas if reautenticador else 0
+                for tentativa in range(tentativas + 1):
+                    geracao = reautenticador.geracao if reautenticador else 0
+                    await _carregar(conexao, sessao, link, espera)
+                    if not await _pagina_de_login(conexao, sessao):
+                        break
+                    if tentativa == tentativas:
+                        raise sei_espera.SessaoExpirada(f"O SEI pediu login ao abrir {link}.")
+                    await asyncio.to_thread(reautenticador.renovar, geracao)
+
+                await capturar_aba_async(conexao, sessao, caminho)
+                logging.info(f"Documento salvo: {caminho}")
+                ao_concluir(link, caminho, None)
+            except Exception as e:
+                logging.error(f"Erro ao salvar documento '{caminho}': {e}")
+                ao_concluir(link, caminho, str(e))
+    finally:
+        # Com a conexão já caída, o fechamento também falha; registrar basta,
+        # para não trocar o erro da captura por este
+        try:
+            await conexao.enviar("Target.closeTarget", {"targetId": alvo})
+        except Exception as e:
+            logging.warning(f"Não foi possível fechar a aba de captura: {e}")
+
+
+async def imprimir_pdf_async(conexao, sessao, caminho_pdf, parametros=None):
+    """
+    Imprime a aba da sessão em PDF, lendo o stream em blocos direto para o disco.
+
+    Mesma estratégia de sei_captura.imprimir_pdf: o PDF nunca fica inteiro em
+    memória, e o arquivo só recebe o nome final quando está completo.
+    """
+    parametros = dict(parametros or PARAMETROS_PDF, transferMode="ReturnAsStream")
+    stream = (await conexao.enviar("Page.printToPDF", parametros, sessao))["stream"]
+    caminho_parcial = caminho_pdf + ".parcial"
+    try:
+        with open(caminho_parcial, "wb") as f:
+            while True:
+                bloco = await conexao.enviar("IO.read", {"handle": stream, "size": TAMANHO_BLOCO_PDF}, sessao)
+                if bloco.get("data"):
+                    dados = base64.b64decode(bloco["data"]) if bloco.get("base64Encoded") else bloco["data"].encode("latin-1")
+                    await asyncio.to_thread(f.write, dados)
+                if bloco.get("eof"):
+                    break
+        os.replace(caminho_parcial, caminho_pdf)
+    finally:
+        try:
+            await conexao.enviar("IO.close", {"handle": stream}, sessao)
+        except Exception as e:
+            logging.warning(f"Não foi possível fechar o stream do PDF: {e}")
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+
+
+async def capturar_aba_async(conexao, sessao, caminho):
+    """
+    Salva a aba da sessão no formato indicado pela extensão do caminho (.pdf, .mhtml ou .html).
+
+    Versão assíncrona de sei_captura.capturar_aba.
+    """
+    formato = formato_do_caminho(caminho)
+    if formato == "pdf":
+        await imprimir_pdf_async(conexao, sessao, caminho)
+        return
+    if formato == "mhtml":
+        texto = (await conexao.enviar("Page.captureSnapshot", {"format": "mhtml"}, sessao))["data"]
+    else:
+        # O script do WebDriver termina em "return"; aqui basta a expressão
+        expressao = SCRIPT_HTML.removeprefix("return ").rstrip(";")
+        resposta = await conexao.enviar("Runtime.evaluate", {"expression": expressao, "returnByValue": True}, sessao)
+        texto = resposta["result"]["value"]
+
+    caminho_parcial = caminho + ".parcial"
+    try:
+        with open(caminho_parcial, "w", encoding="utf-8", newline="") as f:
+            await asyncio.to_thread(f.write, texto)
+        os.replace(caminho_parcial, caminho)
+    finally:
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+
+
+async def capturar_fila_async(url_websocket, fila, ao_concluir, abas=1, espera=30, perfil=None, reautenticador=None):
+    """
+    Imprime em PDF os documentos que chegam numa fila de outra thread.
+
+    As abas ficam abertas enquanto a fila não terminar, então a captura anda no
+    seu próprio ritmo, ao lado da paginação feita pelo WebDriver.
+
+    Args:
+        url_websocket (str): WebSocket do navegador (veja endereco_devtools).
+        fila (queue.Queue): Pares (link, caminho_pdf); None marca o fim.
+        ao_concluir: Chamada com (link, caminho_pdf, erro) de cada documento.
+        abas (int): Quantidade de abas abertas simultaneamente.
+        espera (int): Tempo máximo, em segundos, para o carregamento de cada documento.
+        perfil (str, opcional): Perfil de rede das abas (sei_rede.PERFIS).
+        reautenticador (sei_sessao.Reautenticador, opcional): Refaz o login quando a
+            sessão expira no meio da captura.
+    """
+    async def proxima():
+        tarefa = await asyncio.to_thread(fila.get)
+        if tarefa is None:
+            # Devolve o marcador de fim para as demais abas
+            fila.put(None)
+        return tarefa
+
+    async with ConexaoCDP(url_websocket) as conexao:
+        await asyncio.gather(*(_trabalhador_aba(conexao, proxima, ao_concluir, espera, perfil, reautenticador)
+                               for _ in range(max(abas, 1))))
@@ -0,0 +1,192 @@
+import os
+import glob
+import sqlite3
+import logging
+from datetime import datetime
+
+# --- 1. MANIFESTO DA EXECUÇÃO ---
+
+# Sufixo do manifesto, gravado ao lado do arquivo de saída da execução
+SUFIXO_MANIFESTO = ".manifesto.sqlite3"
+
+# Situação de cada documento no manifesto
+PENDENTE = "pendente"
+CAPTURADO = "capturado"
+FALHOU = "falhou"
+
+
+def caminho_manifesto(caminho_saida):
+    """Manifesto associado a um arquivo de saída (CSV, JSONL...)."""
+    return os.path.splitext(caminho_saida)[0] + SUFIXO_MANIFESTO
+
+
+def ultimo_manifesto(pasta):
+    """
+    Manifesto mais recente da pasta, para retomar a última execução.
+
+    Returns:
+        str | None: Caminho do manifesto, ou None se a pasta não tiver nenhum.
+    """
+    manifestos = glob.glob(os.path.join(pasta, "*" + SUFIXO_MANIFESTO))
+    return max(manifestos, key=os.path.getmtime) if manifestos else None
+
+
+class Manifesto:
+    """
+    Ponto de controle de uma execução, em SQLite.
+
+    Registra as páginas percorridas (com a posição da saída ao fim de cada uma),
+    os resultados vistos e a situação de cada documento (pendente, capturado ou
+    falhou). Cada página é confirmada numa única transação depois de gravada na
+    saída, então, se o Chrome cair ou a sessão expirar, a execução seguinte
+    (--resume) sabe exatamente de onde continuar.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        # As etapas de sei_pipeline usam a mesma conexão a partir de threads diferentes
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS execucao (
+                chave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+            CREATE TABLE IF NOT EXISTS paginas (
+                pagina INTEGER PRIMARY KEY,
+                registros INTEGER NOT NULL,
+                posicao_saida INTEGER,
+                concluida_em TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS registros (
+                chave TEXT PRIMARY KEY,
+                pagina INTEGER NOT NULL,
+                processo TEXT,
+                documento TEXT,
+                link TEXT
+            );
+            CREATE TABLE IF NOT EXISTS documentos (
+                link TEXT PRIMARY KEY,
+                caminho TEXT,
+                situacao TEXT NOT NULL,
+                erro TEXT,
+                atualizado_em TEXT NOT NULL
+            );
+        """)
+        self._conexao.commit()
+
+    @classmethod
+    def para_saida(cls, caminho_saida, retomar=False):
+        """
+        Abre o manifesto de uma saída.
+
+        Args:
+            caminho_saida (str): Arquivo de saída da execução.
+            retomar (bool): Se False, descarta o manifesto de uma execução anterior
+                com a mesma saída e começa do zero.
+        """
+        caminho = caminho_manifesto(caminho_saida)
+        if not retomar and os.path.exists(caminho):
+            os.remove(caminho)
+        manifesto = cls(caminho)
+        manifesto.definir("caminho_saida", caminho_saida)
+        if not retomar:
+            manifesto.definir("iniciada_em", datetime.now().isoformat(timespec='seconds'))
+        return manifesto
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self._conexao.close()
+
+    def definir(self, chave, valor):
+        """Guarda um parâmetro da execução (por exemplo, o caminho da saída)."""
+        self._conexao.execute("INSERT OR REPLACE INTO execucao VALUES (?, ?)", (chave, valor))
+        self._conexao.commit()
+
+    def obter(self, chave, padrao=None):
+        linha = self._conexao.execute("SELECT valor FROM execucao WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else padrao
+
+    # --- Páginas e resultados ---
+
+    def pagina_concluida(self, pagina):
+        """Indica se a página já foi gravada na saída."""
+        return self._conexao.execute("SELECT 1 FROM paginas WHERE pagina = ?", (pagina,)).fetchone() is not None
+
+    def posicao_saida(self):
+        """Posição, em bytes, da saída ao fim da última página confirmada (ou None)."""
+        linha = self._conexao.execute(
+            "SELECT posicao_saida FROM paginas ORDER BY pagina DESC LIMIT 1"
+        ).fetchone()
+        return linha[0] if linha else None
+
+    def concluir_pagina(self, pagina, registros, posicao_saida=None):
+        """
+        Confirma uma página já gravada na saída, com seus resultados e documentos.
+
+        Args:
+            pagina (int): Número da página.
+            registros (list[Registro]): Resultados da página.
+            posicao_saida (int, opcional): Tamanho da saída depois da página.
+        """
+        agora = datetime.now().isoformat(timespec='seconds')
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT OR IGNORE INTO registros VALUES (?, ?, ?, ?, ?)",
+                [(r.chave_texto(), pagina, r.processo, r.documento, r.link) for r in registros],
+            )
+            self._conexao.executemany(
+                "INSERT OR IGNORE INTO documentos (link, situacao, atualizado_em) VALUES (?, ?, ?)",
+                [(r.link, PENDENTE, agora) for r in registros if r.link],
+            )
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO paginas VALUES (?, ?, ?, ?)",
+                (pagina, len(registros), posicao_saida, agora),
+            )
+
+    # --- Documentos ---
+
+    def documento_capturado(self, link):
+        """Indica se o documento já foi capturado nesta execução."""
+        linha = self._conexao.execute("SELECT situacao FROM documentos WHERE link = ?", (link,)).fetchone()
+        return linha is not None and linha[0] == CAPTURADO
+
+    def marcar_documento(self, link, caminho, erro=None):
+        """Registra o resultado da captura de um documento."""
+        situacao = FALHOU if erro else CAPTURADO
+        self._conexao.execute(
+            "INSERT OR REPLACE INTO documentos VALUES (?, ?, ?, ?, ?)",
+            (link, caminho, situacao, erro, datetime.now().isoformat(timespec='seconds')),
+        )
+        self._conexao.commit()
+
+    def resumo(self):
+        """Contagem de páginas, resultados e documentos por situação."""
+        paginas = self._conexao.execute("SELECT COUNT(*) FROM paginas").fetchone()[0]
+        registros = self._conexao.execute("SELECT COUNT(*) FROM registros").fetchone()[0]
+        documentos = dict(self._conexao.execute("SELECT situacao, COUNT(*) FROM documentos GROUP BY situacao"))
+        return {"paginas": paginas, "registros": registros, "documentos": documentos}
+
+
+def abrir_para_retomar(pasta):
+    """
+    Abre o manifesto mais recente da pasta para continuar a execução.
+
+    Returns:
+        Manifesto | None: O manifesto, ou None se não houver execução a retomar.
+    """
+    caminho = ultimo_manifesto(pasta)
+    if caminho is None:
+        logging.warning(f"Nenhuma execução anterior encontrada em '{pasta}'. Começando do zero.")
+        return None
+    manifesto = Manifesto(caminho)
+    resumo = manifesto.resumo()
+    logging.info(
+        f"Retomando {manifesto.obter('caminho_saida')}: {resumo['paginas']} páginas e "
+        f"{resumo['documentos'].get(CAPTURADO, 0)} documentos já concluídos."
+    )
+    return manifesto
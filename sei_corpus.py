@@ -0,0 +1,267 @@
+import os
+import re
+import csv
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import sei_acervo
+import sei_texto
+
+# --- 1. CORPUS DE TEXTO DOS DOCUMENTOS ---
+#
+# Lê os documentos já capturados (HTML, MHTML e PDF, soltos em pastas ou no
+# acervo) e extrai o texto de cada um uma única vez, num pool de processos.
+# O texto fica num cache SQLite endereçado pelo SHA-256 do arquivo: cópias do
+# mesmo documento, ou o mesmo arquivo numa nova execução, não são lidas de novo.
+
+# Cache padrão do corpus
+ARQUIVO_CACHE = "corpus_sei.sqlite3"
+
+# Extensões lidas nas pastas
+EXTENSOES_CORPUS = (".html", ".htm", ".mhtml", ".pdf")
+
+# Arquivos por tarefa enviada ao pool (reduz o custo de comunicação entre processos)
+TAMANHO_LOTE_POOL = 16
+
+
+class CacheTextos:
+    """Texto extraído de cada conteúdo, pelo SHA-256 do arquivo, em SQLite."""
+
+    def __init__(self, caminho=ARQUIVO_CACHE):
+        self.caminho = caminho
+        self._conexao = sqlite3.connect(caminho)
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS textos (
+                sha256 TEXT PRIMARY KEY,
+                extensao TEXT,
+                texto TEXT,
+                erro TEXT,
+                extraido_em TEXT NOT NULL
+            )
+        """)
+        self._conexao.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self._conexao.close()
+
+    def conhecidos(self, shas):
+        """Hashes, entre os informados, cujo texto já está no cache."""
+        shas = list(shas)
+        conhecidos = set()
+        # Em blocos, abaixo do limite de parâmetros do SQLite
+        for inicio in range(0, len(shas), 500):
+            bloco = shas[inicio:inicio + 500]
+            marcadores = ", ".join("?" * len(bloco))
+            conhecidos.update(sha for (sha,) in self._conexao.execute(
+                f"SELECT sha256 FROM textos WHERE sha256 IN ({marcadores})", bloco
+            ))
+        return conhecidos
+
+    def texto(self, sha256):
+        """Texto do conteúdo ("" se a extração falhou ou ainda não foi feita)."""
+        linha = self._conexao.execute("SELECT texto FROM textos WHERE sha256 = ?", (sha256,)).fetchone()
+        return (linha[0] or "") if linha else ""
+
+    def guardar(self, resultados):
+        """
+        Args:
+            resultados (list[tuple[str, str, str, str | None]]): (sha256, extensão, texto, erro).
+        """
+        agora = datetime.now().isoformat(timespec='seconds')
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO textos VALUES (?, ?, ?, ?, ?)",
+                [(sha, extensao, texto, erro, agora) for sha, extensao, texto, erro in resultados],
+            )
+
+
+def arquivos_da_pasta(pasta):
+    """Documentos capturados na pasta e nas subpastas, em ordem de nome."""
+    encontrados = []
+    for raiz, _, arquivos in os.walk(pasta):
+        encontrados += [os.path.join(raiz, nome) for nome in arquivos if nome.lower().endswith(EXTENSOES_CORPUS)]
+    return sorted(encontrados)
+
+
+def _extrair(caminho, sha256):
+    """Tarefa do pool: (sha256, extensão, texto, erro) de um arquivo já identificado pelo hash."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    try:
+        return sha256, extensao, sei_texto.texto_do_arquivo(caminho), None
+    except Exception as e:
+        return sha256, extensao, "", str(e)
+
+
+def construir_corpus(caminhos, cache, processos=None):
+    """
+    Garante o texto de cada arquivo no cache, extraindo só o que ainda não está lá.
+
+    Os arquivos são primeiro identificados pelo hash (no pool) e, dos conteúdos
+    novos, um arquivo de cada é lido (também no pool).
+
+    Args:
+        caminhos (list[str]): Documentos capturados.
+        cache (CacheTextos): Cache do corpus.
+        processos (int, opcional): Tamanho do pool. Padrão: número de CPUs.
+
+    Returns:
+        dict[str, str]: SHA-256 de cada arquivo.
+    """
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        shas = dict(zip(caminhos, pool.map(sei_acervo.hash_arquivo, caminhos, chunksize=TAMANHO_LOTE_POOL)))
+        conhecidos = cache.conhecidos(shas.values())
+        novos = {}
+        for caminho, sha in shas.items():
+            if sha not in conhecidos:
+                novos.setdefault(sha, caminho)
+        logging.info(f"{len(caminhos)} arquivos, {len(novos)} conteúdos novos para extrair.")
+
+        resultados = []
+        for resultado in pool.map(_extrair, novos.values(), novos.keys(), chunksize=TAMANHO_LOTE_POOL):
+            if resultado[3]:
+                logging.warning(f"Falha ao extrair o texto de {novos[resultado[0]]}: {resultado[3]}")
+            resultados.append(resultado)
+            if len(resultados) >= 100:
+                cache.guardar(resultados)
+                resultados = []
+        cache.guardar(resultados)
+    return shas
+
+# --- 2. ENTIDADES ---
+
+# Leis, projetos (PL, PLP, PLN) e requerimentos de informação (RIC), num único
+# padrão compilado: o texto de cada documento é percorrido uma só vez.
+PADRAO_ENTIDADES = re.compile(
+    r"""
+    \b(?:
+        (?P<lei>Lei(?P<complementar>\s+Complementar)?)
+      | (?P<sigla>PLP|PLN|PL)
+      | (?P<projeto>Projeto\s+de\s+Lei(?P<tipo_projeto>\s+Complementar|\s+do\s+Congresso\s+Nacional)?)
+      | (?P<ric>RIC|Requerimento\s+de\s+Informa[çc](?:ão|ao|ões|oes))
+    )
+    \s*(?:n[º°o]?\.?\s*)?
+    (?P<numero>\d{1,3}(?:\.\d{3})+|\d{1,5})\b
+    (?:
+        \s*/\s*(?P<ano>\d{4}|\d{2})\b
+      | ,?\s+de\s+\d{1,2}º?\s+de\s+[a-zç]+\s+de\s+(?P<ano_extenso>\d{4})
+      | ,?\s+de\s+(?P<ano_de>\d{4})\b
+    )?
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
+def _ano(texto):
+    if texto is None:
+        return None
+    ano = int(texto)
+    if ano < 100:
+        ano += 1900 if ano >= 50 else 2000
+    return ano
+
+
+def _tipo(encontrado):
+    if encontrado["lei"]:
+        return "LC" if encontrado["complementar"] else "Lei"
+    if encontrado["sigla"]:
+        return encontrado["sigla"].upper()
+    if encontrado["projeto"]:
+        complemento = (encontrado["tipo_projeto"] or "").lower()
+        return "PLP" if "complementar" in complemento else "PLN" if "congresso" in complemento else "PL"
+    return "RIC"
+
+
+def extrair_entidades(texto):
+    """
+    Leis, projetos de lei e requerimentos de informação citados no texto.
+
+    Projetos e requerimentos só contam com o ano (PL 1234/2023, PL 1234, de 2023),
+    para não confundir a sigla com outros números; leis, com ou sem ele.
+
+    Returns:
+        list[tuple[str, str, int | None]]: (tipo, número, ano), na ordem do texto.
+            Tipos: Lei, LC, PL, PLP, PLN e RIC.
+    """
+    entidades = []
+    for encontrado in PADRAO_ENTIDADES.finditer(texto):
+        tipo = _tipo(encontrado)
+        ano = _ano(encontrado["ano"] or encontrado["ano_extenso"] or encontrado["ano_de"])
+        if ano is None and tipo not in ("Lei", "LC"):
+            continue
+        entidades.append((tipo, encontrado["numero"].replace(".", ""), ano))
+    return entidades
+
+
+def referencia(tipo, numero, ano):
+    """Forma canônica da entidade: 'Lei 8213/1991', 'PL 1234/2023'."""
+    return f"{tipo} {numero}/{ano}" if ano else f"{tipo} {numero}"
+
+
+def entidades_do_corpus(shas, cache):
+    """
+    Roda o extrator sobre o texto de todo o corpus.
+
+    Args:
+        shas (dict[str, str]): SHA-256 de cada arquivo (construir_corpus).
+        cache (CacheTextos): Cache do corpus.
+
+    Yields:
+        dict: Arquivo, hash, referência, tipo, número, ano e ocorrências no documento.
+    """
+    por_conteudo = {}
+    for caminho, sha in shas.items():
+        if sha not in por_conteudo:
+            por_conteudo[sha] = Counter(extrair_entidades(cache.texto(sha)))
+        for (tipo, numero, ano), ocorrencias in por_conteudo[sha].items():
+            yield {
+                "arquivo": caminho, "sha256": sha, "referencia": referencia(tipo, numero, ano),
+                "tipo": tipo, "numero": numero, "ano": ano, "ocorrencias": ocorrencias,
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrai o texto dos documentos capturados e as leis, PLs e RICs citados.")
+    parser.add_argument("--pasta", action="append", default=[], help="Pasta com documentos .html/.mhtml/.pdf. Pode repetir.")
+    parser.add_argument("--acervo", nargs="?", const=sei_acervo.PASTA_ACERVO, default=None,
+                        help=f"Inclui os documentos do acervo (padrão: {sei_acervo.PASTA_ACERVO}).")
+    parser.add_argument("--cache", default=ARQUIVO_CACHE, help=f"Cache do texto extraído (padrão: {ARQUIVO_CACHE}).")
+    parser.add_argument("--processos", type=int, default=None, help="Tamanho do pool de processos.")
+    parser.add_argument("-o", "--saida", default="entidades_documentos.csv", help="CSV com as entidades por documento.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    caminhos = []
+    for pasta in args.pasta:
+        caminhos += arquivos_da_pasta(pasta)
+    if args.acervo is not None:
+        with sei_acervo.Acervo(args.acervo) as acervo:
+            caminhos += [objeto for _, _, _, objeto in acervo.listar(EXTENSOES_CORPUS)]
+    if not caminhos:
+        parser.error("Nenhum documento encontrado. Informe --pasta ou --acervo.")
+
+    with CacheTextos(args.cache) as cache:
+        shas = construir_corpus(caminhos, cache, args.processos)
+        campos = ["arquivo", "sha256", "referencia", "tipo", "numero", "ano", "ocorrencias"]
+        total = 0
+        with open(args.saida, "w", encoding="utf-8-sig", newline="") as f:
+            escritor = csv.DictWriter(f, fieldnames=campos, delimiter=";")
+            escritor.writeheader()
+            for entidade in entidades_do_corpus(shas, cache):
+                escritor.writerow(entidade)
+                total += 1
+    logging.info(f"{total} citações de {len(shas)} documentos salvas em: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import sqlite3
+import logging
+from datetime import datetime
+
+# --- 1. ESTADO DO MODO INCREMENTAL ---
+
+# Formato das datas do SEI (campo "Data de Inclusão" e txtDataInicio)
+FORMATO_DATA = "%d/%m/%Y"
+
+# Nome da pesquisa quando o script só tem uma
+CONSULTA_PADRAO = "padrao"
+
+
+def data_inclusao(registro):
+    """Data de inclusão do registro como date, ou None se estiver vazia ou fora do formato."""
+    try:
+        return datetime.strptime((registro.data_inclusao or "").strip(), FORMATO_DATA).date()
+    except ValueError:
+        return None
+
+
+class EstadoDelta:
+    """
+    Marca d'água das execuções incrementais, em SQLite.
+
+    Guarda, por pesquisa, a data de inclusão mais recente já coletada e a chave de
+    cada resultado visto. A próxima execução começa a busca nessa data (inclusive,
+    porque no mesmo dia podem ter entrado documentos novos) e descarta os
+    resultados já vistos.
+
+    A marca só avança em concluir(), ao fim de uma execução completa; se a
+    execução cair no meio, a seguinte parte da mesma data e nada se perde.
+    """
+
+    def __init__(self, caminho, consulta=CONSULTA_PADRAO):
+        self.caminho = caminho
+        self.consulta = consulta
+        self._maior_data = None
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS marcas (
+                consulta TEXT PRIMARY KEY,
+                data_inclusao TEXT NOT NULL,
+                atualizada_em TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS vistos (
+                consulta TEXT NOT NULL,
+                chave TEXT NOT NULL,
+                data_inclusao TEXT,
+                PRIMARY KEY (consulta, chave)
+            );
+        """)
+        self._conexao.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self._conexao.close()
+
+    def marca(self):
+        """Data de inclusão mais recente já coletada (date), ou None na primeira execução."""
+        linha = self._conexao.execute(
+            "SELECT data_inclusao FROM marcas WHERE consulta = ?", (self.consulta,)
+        ).fetchone()
+        return datetime.strptime(linha[0], "%Y-%m-%d").date() if linha else None
+
+    def data_inicio(self, padrao):
+        """
+        Data inicial da busca no formato do SEI.
+
+        Args:
+            padrao (str): Data usada quando ainda não há marca (por exemplo, '30/07/2024').
+        """
+        marca = self.marca()
+        return marca.strftime(FORMATO_DATA) if marca else padrao
+
+    def conhecido(self, registro):
+        """Indica se o resultado já foi coletado por uma execução anterior."""
+        return self._conexao.execute(
+            "SELECT 1 FROM vistos WHERE consulta = ? AND chave = ?", (self.consulta, registro.chave_texto())
+        ).fetchone() is not None
+
+    def registrar(self, registros):
+        """Marca os resultados de uma página, já gravada na saída, como vistos."""
+        linhas = []
+        for registro in registros:
+            data = data_inclusao(registro)
+            if data and (self._maior_data is None or data > self._maior_data):
+                self._maior_data = data
+            linhas.append((self.consulta, registro.chave_texto(), data.isoformat() if data else None))
+        with self._conexao:
+            self._conexao.executemany("INSERT OR IGNORE INTO vistos VALUES (?, ?, ?)", linhas)
+
+    def concluir(self):
+        """Avança a marca d'água para a data mais recente vista nesta execução."""
+        marca = self.marca()
+        if self._maior_data is None or (marca and self._maior_data <= marca):
+            logging.info(f"Marca d'água da pesquisa '{self.consulta}' mantida em {marca}.")
+            return
+        with self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO marcas VALUES (?, ?, ?)",
+                (self.consulta, self._maior_data.isoformat(), datetime.now().isoformat(timespec='seconds')),
+            )
+        logging.info(f"Marca d'água da pesquisa '{self.consulta}' avançou para {self._maior_data:%d/%m/%Y}.")
+
+    def filtrar_paginas(self, paginas):
+        """
+        Descarta os resultados já vistos em cada página.
+
+        A paginação vai até o fim: o SEI ordena a pesquisa por relevância, então
+        uma página só de resultados conhecidos não indica que as seguintes também
+        sejam. O que limita a busca é a marca d'água (data_inicio).
+
+        Args:
+            paginas (iterável de tuple[int, list[Registro]]): Saída de sei_http.iterar_paginas.
+
+        Yields:
+            tuple[int, list[Registro]]: Número da página e os registros inéditos dela.
+        """
+        for pagina, registros in paginas:
+            yield pagina, [registro for registro in registros if not self.conhecido(registro)]
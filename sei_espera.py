@@ -0,0 +1,166 @@
+import os
+import time
+import logging
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+# --- 1. CONFIGURAÇÃO ---
+
+# Teto, em segundos, de qualquer espera. As esperas terminam assim que o sinal
+# aparece; o teto só é atingido quando a página realmente não carrega.
+ESPERA_MAXIMA = float(os.environ.get("SEI_ESPERA_MAXIMA", "15"))
+
+# Intervalo entre verificações do WebDriverWait
+INTERVALO = 0.1
+
+# Elementos que só existem depois do login (menu principal do SEI)
+SELETOR_POS_LOGIN = (By.ID, "infraMenu")
+SELETOR_FORM_LOGIN = (By.ID, "txtUsuario")
+
+# Trecho do HTML do formulário de login: numa resposta que deveria ser outra
+# página, indica que a sessão expirou e o SEI redirecionou para o login
+MARCADOR_LOGIN = 'id="txtUsuario"'
+
+# Testa o formulário de login sem passar pela espera implícita do WebDriver
+SCRIPT_PAGINA_LOGIN = "return document.getElementById('txtUsuario') !== null;"
+
+
+class SessaoExpirada(Exception):
+    """O SEI devolveu o formulário de login no lugar da página pedida."""
+
+# --- 2. ESPERAS ---
+
+def _espera(driver, espera):
+    return WebDriverWait(driver, ESPERA_MAXIMA if espera is None else espera, poll_frequency=INTERVALO)
+
+
+def documento_pronto(driver, espera=None):
+    """
+    Aguarda document.readyState == 'complete' na aba atual.
+
+    Returns:
+        bool: True se a página ficou pronta, False se o teto foi atingido.
+    """
+    try:
+        _espera(driver, espera).until(lambda d: d.execute_script("return document.readyState") == "complete")
+        return True
+    except TimeoutException:
+        logging.warning("Tempo esgotado aguardando o carregamento da página.")
+        return False
+
+
+def elemento_presente(driver, localizador, espera=None):
+    """
+    Aguarda um elemento aparecer na página.
+
+    Args:
+        driver: Instância do WebDriver.
+        localizador (tuple): Par (By, valor), por exemplo (By.ID, 'q').
+        espera (float, opcional): Teto da espera; padrão ESPERA_MAXIMA.
+
+    Returns:
+        WebElement: O elemento encontrado.
+
+    Raises:
+        TimeoutException: Se o elemento não aparecer dentro do teto.
+    """
+    return _espera(driver, espera).until(EC.presence_of_element_located(localizador))
+
+
+def rede_ociosa(driver, ociosidade=0.5, espera=None):
+    """
+    Aguarda a página carregar e parar de pedir recursos por `ociosidade` segundos.
+
+    Usa a Resource Timing API do navegador: a rede é considerada ociosa quando a
+    quantidade de recursos carregados não muda durante o intervalo.
+
+    Returns:
+        bool: True se a rede ficou ociosa, False se o teto foi atingido.
+    """
+    if not documento_pronto(driver, espera):
+        return False
+    limite = time.monotonic() + (ESPERA_MAXIMA if espera is None else espera)
+    contagem = None
+    estavel_desde = time.monotonic()
+    while time.monotonic() < limite:
+        atual = driver.execute_script("return performance.getEntriesByType('resource').length")
+        if atual != contagem:
+            contagem = atual
+            estavel_desde = time.monotonic()
+        elif time.monotonic() - estavel_desde >= ociosidade:
+            return True
+        time.sleep(INTERVALO)
+    logging.warning("Tempo esgotado aguardando a rede ficar ociosa.")
+    return False
+
+
+def clicar_e_aguardar(driver, elemento, localizador=None, espera=None):
+    """
+    Clica num elemento que carrega uma nova página e aguarda a troca.
+
+    A troca é detectada pelo descarte (staleness) do <html> da página anterior;
+    depois aguarda o readyState e, se informado, o elemento esperado na nova página.
+
+    Args:
+        driver: Instância do WebDriver.
+        elemento (WebElement): Link ou botão a clicar.
+        localizador (tuple, opcional): Elemento que deve existir na nova página.
+        espera (float, opcional): Teto da espera; padrão ESPERA_MAXIMA.
+    """
+    pagina_anterior = driver.find_element(By.TAG_NAME, "html")
+    elemento.click()
+    _espera(driver, espera).until(EC.staleness_of(pagina_anterior))
+    documento_pronto(driver, espera)
+    if localizador is not None:
+        elemento_presente(driver, localizador, espera)
+
+
+def login_concluido(driver, espera=None, formulario=None):
+    """
+    Aguarda o fim do login e confirma que ele deu certo.
+
+    Com `formulario` (um elemento do formulário enviado), espera antes a página
+    dele ser descartada, para não confundir a página antiga com o resultado. Em
+    seguida aguarda o menu do SEI ou o formulário de login de novo (senha errada):
+    só o menu conta como sucesso.
+
+    Args:
+        driver: Instância do WebDriver.
+        espera (float, opcional): Teto da espera; padrão ESPERA_MAXIMA.
+        formulario (WebElement, opcional): Campo do formulário de login clicado.
+
+    Returns:
+        bool: True se a página pós-login carregou; False se o SEI voltou ao
+        formulário de login ou o teto foi atingido.
+    """
+    try:
+        if formulario is not None:
+            _espera(driver, espera).until(EC.staleness_of(formulario))
+        _espera(driver, espera).until(EC.any_of(
+            EC.presence_of_element_located(SELETOR_POS_LOGIN),
+            EC.presence_of_element_located(SELETOR_FORM_LOGIN),
+        ))
+        documento_pronto(driver, espera)
+    except TimeoutException:
+        logging.warning("Tempo esgotado aguardando a página após o login.")
+        return False
+    if pagina_de_login(driver) or not driver.find_elements(*SELETOR_POS_LOGIN):
+        logging.warning("O SEI continua no formulário de login.")
+        return False
+    return True
+
+
+# --- 3. SESSÃO EXPIRADA ---
+
+def pagina_de_login(driver):
+    """True se a aba atual mostra o formulário de login do SEI (sessão expirada)."""
+    return bool(driver.execute_script(SCRIPT_PAGINA_LOGIN))
+
+
+def html_de_login(html):
+    """True se o HTML (str ou bytes) é o formulário de login do SEI."""
+    if isinstance(html, bytes):
+        return MARCADOR_LOGIN.encode("ascii") in html
+    return MARCADOR_LOGIN in html
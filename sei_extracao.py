@@ -0,0 +1,200 @@
+import json
+import logging
+import pandas as pd
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
+
+import sei_espera
+from sei_registros import COLUNAS, Registro
+
+# --- 1. LAYOUT DA PÁGINA DE RESULTADOS ---
+
+XPATH_TABELA_RESULTADOS = '//*[@id="conteudo"]/table'
+XPATH_PROXIMA = "//a[text()='Próxima']"
+
+# Percorre as linhas de #conteudo uma única vez e agrupa título, snippet e metatags
+# de cada resultado. Cada registro começa numa linha com 'pesquisaTituloEsquerda',
+# então uma metatag ausente não desloca os registros seguintes.
+SCRIPT_EXTRACAO = r"""
+var linhas = document.querySelectorAll('#conteudo table tr');
+var registros = [];
+var atual = null;
+var ordemMetatags = ['unidade', 'usuario', 'data'];
+
+function texto(el) {
+    return (el.innerText || el.textContent || '').trim();
+}
+
+function campoMetatag(rotulo) {
+    rotulo = rotulo.toLowerCase();
+    if (rotulo.indexOf('unidade') === 0) { return 'unidade'; }
+    if (rotulo.indexOf('usu') === 0) { return 'usuario'; }
+    if (rotulo.indexOf('data') === 0) { return 'data'; }
+    return null;
+}
+
+for (var i = 0; i < linhas.length; i++) {
+    var linha = linhas[i];
+    var titulo = linha.querySelector('.pesquisaTituloEsquerda');
+    if (titulo) {
+        var ancoras = titulo.querySelectorAll('a');
+        var textos = [];
+        for (var j = 0; j < ancoras.length; j++) {
+            var t = texto(ancoras[j]);
+            if (t !== '') { textos.push(t); }
+        }
+        atual = {
+            processo: textos.length > 0 ? textos[0] : '',
+            documento: textos.length > 1 ? textos[1] : '',
+            resumo: '',
+            unidade: '',
+            usuario: '',
+            data: '',
+            link: ancoras.length > 0 ? ancoras[0].href : null
+        };
+        registros.push(atual);
+        continue;
+    }
+    if (atual === null) { continue; }
+
+    var snippet = linha.querySelector('.pesquisaSnippet');
+    if (snippet) { atual.resumo = texto(snippet); }
+
+    var metatags = linha.querySelectorAll('.pesquisaMetatag');
+    for (var k = 0; k < metatags.length; k++) {
+        var conteudo = texto(metatags[k]);
+        var pos = conteudo.indexOf(':');
+        if (pos < 0) { continue; }
+        var valor = conteudo.slice(pos + 1).trim();
+        var campo = campoMetatag(conteudo.slice(0, pos).trim());
+        if (campo === null) {
+            for (var m = 0; m < ordemMetatags.length; m++) {
+                if (atual[ordemMetatags[m]] === '') { campo = ordemMetatags[m]; break; }
+            }
+        }
+        if (campo !== null) { atual[campo] = valor; }
+    }
+}
+return JSON.stringify(registros.map(function (r) {
+    return [r.processo, r.documento, r.resumo, r.unidade, r.usuario, r.data, r.link];
+}));
+"""
+
+# --- 2. EXTRAÇÃO ---
+
+def iterar_registros_pagina(driver):
+    """
+    Extrai todos os resultados da página atual com uma única chamada ao navegador.
+
+    Args:
+        driver: Instância do WebDriver posicionada numa página de resultados do SEI.
+
+    Yields:
+        Registro: Um registro por resultado, na ordem da página.
+    """
+    bruto = driver.execute_script(SCRIPT_EXTRACAO)
+    for valores in json.loads(bruto) if bruto else []:
+        yield Registro(*valores)
+
+
+def extrair_registros_pagina(driver):
+    """
+    Extrai todos os resultados da página atual como dicionários.
+
+    Args:
+        driver: Instância do WebDriver posicionada numa página de resultados do SEI.
+
+    Returns:
+        list[dict]: Um dicionário por resultado, com as chaves de COLUNAS.
+    """
+    return [registro.como_dict() for registro in iterar_registros_pagina(driver)]
+
+
+def extrair_dados(driver):
+    """
+    Extrai dados da página atual do SEI num DataFrame com as colunas de COLUNAS.
+
+    Args:
+        driver: Instância do WebDriver.
+
+    Returns:
+        pd.DataFrame: Um resultado por linha.
+    """
+    linhas = [registro.como_tupla() for registro in iterar_registros_pagina(driver)]
+    logging.info(f"{len(linhas)} resultados extraídos da página.")
+    return pd.DataFrame.from_records(linhas, columns=COLUNAS)
+
+
+def _ir_para_proxima(driver, espera=None):
+    """
+    Clica em 'Próxima' e aguarda a página seguinte.
+
+    Returns:
+        bool: False se não há próxima página.
+
+    Raises:
+        sei_espera.SessaoExpirada: Se o SEI respondeu com o formulário de login.
+    """
+    try:
+        proxima = driver.find_element(By.XPATH, XPATH_PROXIMA)
+    except NoSuchElementException:
+        logging.info("Não há mais páginas.")
+        return False
+    if not proxima.get_attribute('href'):
+        return False
+    sei_espera.clicar_e_aguardar(driver, proxima, espera=espera)
+    if sei_espera.pagina_de_login(driver):
+        raise sei_espera.SessaoExpirada("O SEI pediu login ao abrir a próxima página de resultados.")
+    sei_espera.elemento_presente(driver, (By.XPATH, XPATH_TABELA_RESULTADOS), espera)
+    return True
+
+
+def avancar_paginas(driver, quantidade, espera=None):
+    """
+    Avança `quantidade` páginas sem extrair nada (para voltar a uma página depois de refazer a busca).
+
+    Returns:
+        int: Páginas efetivamente avançadas (menos que `quantidade` se a lista acabou antes).
+    """
+    for avancadas in range(quantidade):
+        if not _ir_para_proxima(driver, espera):
+            return avancadas
+    return quantidade
+
+
+def iterar_paginas(driver, espera=None, ao_expirar=None, pagina_inicial=1):
+    """
+    Percorre todas as páginas de resultado, lendo cada uma numa única chamada.
+
+    Quem consome pode abrir outras abas entre uma página e outra, desde que volte
+    para a aba de resultados antes de pedir a próxima.
+
+    Args:
+        driver: Instância do WebDriver posicionada na primeira página de resultados.
+        espera (float, opcional): Teto, em segundos, para a próxima página carregar
+            (padrão: sei_espera.ESPERA_MAXIMA).
+        ao_expirar (opcional): Chamada com o número da página quando o SEI pede
+            login no lugar dela; deve autenticar de novo e deixar o navegador nessa
+            página (veja sei_sessao.Reautenticador.reposicionar). Sem ela, a
+            expiração interrompe a paginação com sei_espera.SessaoExpirada.
+        pagina_inicial (int): Número da página em que o navegador está (quando a
+            paginação começou por outro motor).
+
+    Yields:
+        tuple[int, list[Registro]]: Número da página e os registros dela.
+    """
+    pagina = pagina_inicial
+    while True:
+        logging.info(f"Extraindo dados da página {pagina}")
+        yield pagina, list(iterar_registros_pagina(driver))
+
+        try:
+            if not _ir_para_proxima(driver, espera):
+                break
+        except sei_espera.SessaoExpirada:
+            if ao_expirar is None:
+                raise
+            logging.warning(f"Sessão expirada ao abrir a página {pagina + 1}.")
+            ao_expirar(pagina + 1)
+        pagina += 1
+
@@ -0,0 +1,307 @@
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+import sei_parser
+import sei_espera
+import sei_extracao
+
+# --- 1. SESSÃO HTTP A PARTIR DO NAVEGADOR ---
+
+class PaginacaoIndisponivel(Exception):
+    """
+    O link 'Próxima' não é uma URL navegável (por exemplo, javascript:), então só o navegador consegue paginar.
+
+    Attributes:
+        url (str): Endereço da página em que o link foi encontrado.
+        pagina (int): Número dessa página, ainda não entregue a quem consome.
+    """
+
+    def __init__(self, mensagem, url=None, pagina=1):
+        super().__init__(mensagem)
+        self.url = url
+        self.pagina = pagina
+
+
+def criar_sessao(driver, conexoes=10):
+    """
+    Cria uma requests.Session autenticada com os cookies do WebDriver já logado.
+
+    Args:
+        driver: Instância do WebDriver após realizar_login.
+        conexoes (int): Tamanho do pool de conexões mantidas abertas por host.
+
+    Returns:
+        requests.Session: Sessão com os cookies e o User-Agent do navegador.
+    """
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+
+    sessao.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    copiar_cookies(sessao, driver.get_cookies())
+    logging.info(f"Sessão HTTP criada com {len(sessao.cookies)} cookies do navegador.")
+    return sessao
+
+
+def copiar_cookies(sessao, cookies):
+    """Copia para a sessão HTTP os cookies do Selenium (driver.get_cookies())."""
+    for cookie in cookies:
+        sessao.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path", "/"),
+        )
+
+
+def baixar_pagina(sessao, url, timeout=30, ao_expirar=None):
+    """
+    Baixa uma página de resultados e a converte em BeautifulSoup.
+
+    Args:
+        ao_expirar (opcional): Chamada com (sessao, geracao) quando o SEI responde
+            com o formulário de login; deve autenticar de novo e atualizar os
+            cookies da sessão (veja sei_sessao.Reautenticador.renovar_sessao_http).
+            A página é pedida de novo uma vez.
+
+    Returns:
+        BeautifulSoup: Página pronta para o parser.
+
+    Raises:
+        sei_espera.SessaoExpirada: Se a resposta for o formulário de login.
+    """
+    # Geração dos cookies usados neste pedido: se outra thread já os renovou,
+    # quem chega depois não refaz o login
+    geracao = getattr(sessao, "geracao_sei", 0)
+    resposta = sessao.get(url, timeout=timeout)
+    resposta.raise_for_status()
+    if sei_espera.html_de_login(resposta.content):
+        if ao_expirar is None:
+            raise sei_espera.SessaoExpirada(f"O SEI pediu login ao baixar {url}.")
+        logging.warning("Sessão expirada durante a paginação por HTTP.")
+        ao_expirar(sessao, geracao)
+        resposta = sessao.get(url, timeout=timeout)
+        resposta.raise_for_status()
+        if sei_espera.html_de_login(resposta.content):
+            raise sei_espera.SessaoExpirada(f"O SEI continuou pedindo login em {url}.")
+    return BeautifulSoup(resposta.content, sei_parser.PARSER_HTML)
+
+# --- 2. PAGINAÇÃO ---
+
+def _proxima_url(soup, url_atual, pagina=1):
+    """Link da próxima página, ou None na última. Exige uma URL http(s)."""
+    proxima = sei_parser.link_proxima_pagina(soup, url_atual)
+    if proxima is None:
+        return None
+    if not proxima.lower().startswith(("http://", "https://")):
+        raise PaginacaoIndisponivel(f"Link 'Próxima' não navegável por HTTP: {proxima}", url_atual, pagina)
+    return proxima
+
+
+def iterar_paginas_http(sessao, url_inicial, html_inicial=None, timeout=30, ao_expirar=None):
+    """
+    Percorre as páginas de resultado por HTTP, sem renderizar nada no navegador.
+
+    Args:
+        sessao (requests.Session): Sessão criada com criar_sessao.
+        url_inicial (str): URL da primeira página de resultados (driver.current_url).
+        html_inicial (str | BeautifulSoup, opcional): HTML da primeira página
+            (driver.page_source), para não baixá-la de novo.
+        timeout (int): Tempo máximo, em segundos, de cada requisição.
+        ao_expirar (opcional): Novo login quando a sessão expira (veja baixar_pagina).
+
+    Yields:
+        tuple[int, list[Registro]]: Número da página e os registros dela.
+
+    Raises:
+        PaginacaoIndisponivel: Se o link 'Próxima' de uma página não for uma URL. A
+            exceção traz o endereço e o número dessa página, que não é entregue, para
+            o navegador continuar dali (veja iterar_paginas).
+    """
+    url = url_inicial
+    soup = sei_parser.carregar_html(html_inicial) if html_inicial is not None else baixar_pagina(sessao, url, timeout, ao_expirar)
+    proxima = _proxima_url(soup, url)
+
+    pagina = 1
+    while True:
+        logging.info(f"Extraindo dados da página {pagina} (HTTP)")
+        yield pagina, list(sei_parser.iterar_registros(soup, url))
+        if proxima is None:
+            logging.info("Não há mais páginas.")
+            break
+
+        url = proxima
+        soup = baixar_pagina(sessao, url, timeout, ao_expirar)
+        pagina += 1
+        proxima = _proxima_url(soup, url, pagina)
+
+
+def _parametro_offset(url_atual, url_proxima, tamanho_pagina):
+    """
+    Nome do parâmetro da URL que carrega o deslocamento da próxima página.
+
+    Candidatos são os parâmetros do link 'Próxima' com valor igual ao tamanho da
+    página que mudaram em relação à página atual (um parâmetro de linhas por página
+    tem o mesmo valor nas duas). Só um candidato é aceito; havendo nenhum ou mais
+    de um, devolve None e a paginação segue sequencial.
+    """
+    atuais = dict(parse_qsl(urlsplit(url_atual).query, keep_blank_values=True))
+    candidatos = [
+        nome for nome, valor in parse_qsl(urlsplit(url_proxima).query, keep_blank_values=True)
+        if valor.isdigit() and int(valor) == tamanho_pagina and atuais.get(nome) != valor
+    ]
+    return candidatos[0] if len(candidatos) == 1 else None
+
+
+def url_com_offset(url, parametro, offset):
+    """Troca o valor do parâmetro de deslocamento na URL."""
+    partes = urlsplit(url)
+    consulta = [(nome, str(offset) if nome == parametro else valor)
+                for nome, valor in parse_qsl(partes.query, keep_blank_values=True)]
+    return urlunsplit(partes._replace(query=urlencode(consulta)))
+
+
+def iterar_paginas_paralelo(sessao, url_inicial, html_inicial=None, trabalhadores=4, timeout=30, ao_expirar=None):
+    """
+    Baixa as páginas de resultado em paralelo, calculando o deslocamento de cada uma.
+
+    A primeira página informa o total de resultados e o tamanho da página; com o
+    link 'Próxima' se descobre o parâmetro de deslocamento. As demais páginas são
+    pedidas de uma vez, com no máximo `trabalhadores` requisições simultâneas, e
+    entregues na ordem original. Resultados repetidos (a lista pode mudar durante
+    a navegação) são descartados.
+
+    Se o total, o tamanho ou o parâmetro não puderem ser determinados, ou se a URL
+    for assinada (infra_hash), segue a navegação sequencial por HTTP.
+
+    Args:
+        sessao (requests.Session): Sessão criada com criar_sessao.
+        url_inicial (str): URL da primeira página de resultados.
+        html_inicial (str | BeautifulSoup, opcional): HTML da primeira página.
+        trabalhadores (int): Máximo de requisições simultâneas.
+        timeout (int): Tempo máximo, em segundos, de cada requisição.
+        ao_expirar (opcional): Novo login quando a sessão expira (veja baixar_pagina).
+
+    Yields:
+        tuple[int, list[Registro]]: Número da página e os registros ineditos dela.
+    """
+    soup = sei_parser.carregar_html(html_inicial) if html_inicial is not None else baixar_pagina(sessao, url_inicial, timeout, ao_expirar)
+    vistos = set()
+
+    def ineditos(registros):
+        novos = []
+        for registro in registros:
+            chave = registro.chave()
+            if chave not in vistos:
+                vistos.add(chave)
+                novos.append(registro)
+        return novos
+
+    primeira = list(sei_parser.iterar_registros(soup, url_inicial))
+    proxima = _proxima_url(soup, url_inicial)
+    yield 1, ineditos(primeira)
+    if proxima is None:
+        logging.info("Não há mais páginas.")
+        return
+
+    total = sei_parser.total_resultados(soup)
+    tamanho = len(primeira)
+    parametro = _parametro_offset(url_inicial, proxima, tamanho) if tamanho else None
+    assinada = any(nome == "infra_hash" for nome, _ in parse_qsl(urlsplit(proxima).query))
+    if not total or not parametro or assinada:
+        logging.warning("Não foi possível calcular os deslocamentos das páginas. Seguindo a navegação sequencial.")
+        for pagina, registros in iterar_paginas_http(sessao, url_inicial, soup, timeout, ao_expirar):
+            if pagina > 1:
+                yield pagina, ineditos(registros)
+        return
+
+    offsets = list(range(tamanho, total, tamanho))
+    urls = [url_com_offset(proxima, parametro, offset) for offset in offsets]
+    logging.info(f"{total} resultados em {len(urls) + 1} páginas; baixando {len(urls)} com {trabalhadores} conexões.")
+
+    def baixar(url):
+        return list(sei_parser.iterar_registros(baixar_pagina(sessao, url, timeout, ao_expirar), url))
+
+    with ThreadPoolExecutor(max_workers=trabalhadores) as pool:
+        for pagina, registros in enumerate(pool.map(baixar, urls), start=2):
+            logging.info(f"Extraindo dados da página {pagina} (HTTP)")
+            yield pagina, ineditos(registros)
+
+
+def iterar_paginas(driver, motor="navegador", espera=None, trabalhadores=4, reautenticador=None):
+    """
+    Percorre as páginas de resultado com o motor escolhido.
+
+    Nos motores "http" e "paralelo" a primeira página é lida do navegador e as
+    seguintes são baixadas com os cookies da sessão ("paralelo" baixa várias ao
+    mesmo tempo). Se a paginação do SEI não for navegável por HTTP, volta ao
+    navegador sem perder a primeira página; se isso só aparecer numa página
+    adiante, o navegador abre essa página e continua dali.
+
+    Args:
+        driver: Instância do WebDriver posicionada na primeira página de resultados.
+        motor (str): "navegador", "http" ou "paralelo".
+        espera (float, opcional): Teto, em segundos, para cada página no navegador.
+        trabalhadores (int): Requisições simultâneas no motor "paralelo".
+        reautenticador (sei_sessao.Reautenticador, opcional): Se a sessão expirar no
+            meio da paginação, refaz o login e continua da página em que parou. Sem
+            ele, a expiração interrompe a paginação com sei_espera.SessaoExpirada.
+
+    Yields:
+        tuple[int, list[Registro]]: Número da página e os registros dela.
+    """
+    url_retomada = pagina_inicial = None
+    if motor in ("http", "paralelo"):
+        try:
+            sessao = criar_sessao(driver, conexoes=max(trabalhadores, 1))
+            soup = sei_parser.carregar_html(driver.page_source)
+            _proxima_url(soup, driver.current_url)
+        except PaginacaoIndisponivel as e:
+            logging.warning(f"{e}. Usando o navegador para paginar.")
+        else:
+            ao_expirar = None
+            if reautenticador:
+                ao_expirar = reautenticador.renovar_sessao_http
+                sessao.geracao_sei = reautenticador.geracao
+            try:
+                if motor == "paralelo":
+                    yield from iterar_paginas_paralelo(sessao, driver.current_url, soup, trabalhadores,
+                                                       ao_expirar=ao_expirar)
+                else:
+                    yield from iterar_paginas_http(sessao, driver.current_url, soup, ao_expirar=ao_expirar)
+                return
+            except PaginacaoIndisponivel as e:
+                # Uma página adiante tem paginação só por script: o navegador abre
+                # essa página e continua dali, sem repetir as já entregues
+                logging.warning(f"{e}. Continuando pelo navegador a partir da página {e.pagina}.")
+                url_retomada, pagina_inicial = e.url, e.pagina
+    elif motor != "navegador":
+        raise ValueError(f"Motor de paginação desconhecido: {motor}")
+
+    ao_expirar = reautenticador.reposicionar if reautenticador else None
+    if url_retomada is None:
+        paginas = sei_extracao.iterar_paginas(driver, espera, ao_expirar)
+    else:
+        paginas = _continuar_no_navegador(driver, url_retomada, pagina_inicial, espera, ao_expirar)
+    if reautenticador is None:
+        yield from paginas
+    else:
+        # Cada página é lida com o navegador reservado: um novo login pedido
+        # pela captura espera a página terminar em vez de tirar a aba do lugar
+        yield from reautenticador.exclusivo(paginas)
+
+
+def _continuar_no_navegador(driver, url, pagina, espera=None, ao_expirar=None):
+    """Abre no navegador a página `pagina` dos resultados, já baixada por HTTP, e pagina dali em diante."""
+    driver.get(url)
+    sei_espera.documento_pronto(driver, espera)
+    if sei_espera.pagina_de_login(driver):
+        if ao_expirar is None:
+            raise sei_espera.SessaoExpirada(f"O SEI pediu login ao abrir a página {pagina} no navegador.")
+        ao_expirar(pagina)
+    yield from sei_extracao.iterar_paginas(driver, espera, ao_expirar, pagina_inicial=pagina)
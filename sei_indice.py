@@ -0,0 +1,292 @@
+import sys
+import time
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+
+import sei_acervo
+import sei_texto
+from sei_delta import FORMATO_DATA, data_inclusao
+from sei_pipeline import paginas_do_csv
+
+# --- 1. ÍNDICE DE BUSCA LOCAL ---
+#
+# Responde, sem abrir o SEI, perguntas sobre documentos já coletados: os
+# metadados vêm dos CSVs das execuções e o texto, dos documentos do acervo.
+
+# Arquivo padrão do índice
+ARQUIVO_INDICE = "indice_sei.sqlite3"
+
+# Tokenização sem acentos nem caixa: "previdência" encontra "Previdencia"
+TOKENIZADOR = "unicode61 remove_diacritics 2"
+
+# Formato de onde extrair o texto quando o documento está no acervo em mais de um
+# (do mais barato ao mais caro de ler)
+PREFERENCIA_TEXTO = (".html", ".mhtml", ".pdf")
+
+
+def consulta_fts(texto):
+    """
+    Converte termos digitados numa consulta FTS5 segura.
+
+    Cada termo vira uma frase entre aspas, então números como "8.213/91" não
+    quebram a sintaxe do FTS5; um termo terminado em * continua sendo prefixo.
+    """
+    termos = []
+    for termo in texto.split():
+        prefixo = termo.endswith("*")
+        termo = termo.rstrip("*").replace('"', '""')
+        if termo:
+            termos.append(f'"{termo}"' + ("*" if prefixo else ""))
+    return " ".join(termos)
+
+
+class Indice:
+    """
+    Índice de texto completo (SQLite FTS5) dos resultados e documentos coletados.
+
+    A tabela `registros` guarda os metadados de cada resultado (chave de
+    Registro.chave_texto, data em ISO para filtros por período) e `textos`, o
+    texto de cada documento com o hash do arquivo de onde saiu. A tabela
+    virtual `busca` junta os dois, com a mesma rowid do registro, e é a única
+    consultada com MATCH.
+    """
+
+    def __init__(self, caminho=ARQUIVO_INDICE):
+        self.caminho = caminho
+        self._conexao = sqlite3.connect(caminho)
+        self._conexao.executescript(f"""
+            CREATE TABLE IF NOT EXISTS registros (
+                chave TEXT PRIMARY KEY,
+                processo TEXT,
+                documento TEXT,
+                resumo TEXT,
+                unidade TEXT,
+                usuario TEXT,
+                data_inclusao TEXT,
+                link TEXT,
+                id_documento TEXT
+            );
+            CREATE INDEX IF NOT EXISTS registros_id_documento ON registros (id_documento);
+            CREATE INDEX IF NOT EXISTS registros_data_inclusao ON registros (data_inclusao);
+            CREATE TABLE IF NOT EXISTS textos (
+                id_documento TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                texto TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS busca USING fts5 (
+                processo, documento, resumo, unidade, usuario, texto,
+                tokenize = '{TOKENIZADOR}'
+            );
+        """)
+        self._conexao.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self._conexao.close()
+
+    def _reindexar(self, rowids):
+        """Regrava em `busca` as linhas dos registros, com o texto atual de cada documento."""
+        for rowid in rowids:
+            linha = self._conexao.execute(
+                """
+                SELECT r.processo, r.documento, r.resumo, r.unidade, r.usuario, COALESCE(t.texto, '')
+                FROM registros AS r LEFT JOIN textos AS t ON t.id_documento = r.id_documento
+                WHERE r.rowid = ?
+                """,
+                (rowid,),
+            ).fetchone()
+            self._conexao.execute("DELETE FROM busca WHERE rowid = ?", (rowid,))
+            self._conexao.execute("INSERT INTO busca (rowid, processo, documento, resumo, unidade, usuario, texto) "
+                                  "VALUES (?, ?, ?, ?, ?, ?, ?)", (rowid, *linha))
+
+    # --- Indexação ---
+
+    def indexar_registros(self, registros):
+        """
+        Acrescenta ou atualiza resultados da pesquisa no índice.
+
+        Args:
+            registros (list[Registro]): Resultados (por exemplo, uma página do CSV).
+
+        Returns:
+            int: Quantidade de registros indexados.
+        """
+        with self._conexao:
+            rowids = []
+            for registro in registros:
+                data = data_inclusao(registro)
+                rowids.append(self._conexao.execute(
+                    """
+                    INSERT INTO registros VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (chave) DO UPDATE SET
+                        processo = excluded.processo, documento = excluded.documento,
+                        resumo = excluded.resumo, unidade = excluded.unidade,
+                        usuario = excluded.usuario, data_inclusao = excluded.data_inclusao,
+                        link = excluded.link, id_documento = excluded.id_documento
+                    RETURNING rowid
+                    """,
+                    (registro.chave_texto(), registro.processo, registro.documento, registro.resumo,
+                     registro.unidade, registro.usuario, data.isoformat() if data else None,
+                     registro.link, registro.id_documento),
+                ).fetchone()[0])
+            self._reindexar(rowids)
+        return len(rowids)
+
+    def indexar_csv(self, caminho_csv, encoding='utf-8-sig'):
+        """Indexa os resultados de um CSV gerado pelos scripts, em lotes."""
+        total = 0
+        for _, registros in paginas_do_csv(caminho_csv, encoding=encoding):
+            total += self.indexar_registros(registros)
+        logging.info(f"{total} registros de {caminho_csv} indexados.")
+        return total
+
+    def texto_indexado(self, id_documento, sha256):
+        """Indica se o texto do documento já foi extraído deste mesmo conteúdo."""
+        return self._conexao.execute(
+            "SELECT 1 FROM textos WHERE id_documento = ? AND sha256 = ?", (id_documento, sha256)
+        ).fetchone() is not None
+
+    def indexar_texto(self, id_documento, sha256, texto):
+        """Guarda o texto de um documento e atualiza os registros que apontam para ele."""
+        with self._conexao:
+            self._conexao.execute("INSERT OR REPLACE INTO textos VALUES (?, ?, ?)", (id_documento, sha256, texto))
+            rowids = [rowid for (rowid,) in self._conexao.execute(
+                "SELECT rowid FROM registros WHERE id_documento = ?", (id_documento,)
+            )]
+            self._reindexar(rowids)
+
+    def indexar_acervo(self, diretorio=sei_acervo.PASTA_ACERVO):
+        """
+        Extrai e indexa o texto dos documentos do acervo.
+
+        De cada documento é lido um único formato, o primeiro de PREFERENCIA_TEXTO
+        disponível; documentos cujo conteúdo não mudou desde a última indexação
+        são pulados.
+
+        Returns:
+            int: Quantidade de documentos com texto novo no índice.
+        """
+        with sei_acervo.Acervo(diretorio) as acervo:
+            objetos = acervo.listar(PREFERENCIA_TEXTO)
+        escolhidos = {}
+        for id_documento, extensao, sha256, caminho in objetos:
+            atual = escolhidos.get(id_documento)
+            if atual is None or PREFERENCIA_TEXTO.index(extensao) < PREFERENCIA_TEXTO.index(atual[0]):
+                escolhidos[id_documento] = (extensao, sha256, caminho)
+
+        total = 0
+        for id_documento, (_, sha256, caminho) in escolhidos.items():
+            if self.texto_indexado(id_documento, sha256):
+                continue
+            try:
+                texto = sei_texto.texto_do_arquivo(caminho)
+            except Exception as e:
+                logging.warning(f"Não foi possível extrair o texto do documento {id_documento}: {e}")
+                continue
+            self.indexar_texto(id_documento, sha256, texto)
+            total += 1
+        logging.info(f"Texto de {total} documentos do acervo indexado ({len(escolhidos)} no acervo).")
+        return total
+
+    # --- Consulta ---
+
+    def buscar(self, consulta, limite=20, desde=None, ate=None, unidade=None):
+        """
+        Busca no índice, do resultado mais relevante (bm25) ao menos relevante.
+
+        Args:
+            consulta (str): Consulta na sintaxe do FTS5 (veja consulta_fts).
+            limite (int): Máximo de resultados.
+            desde, ate (date, opcional): Período da Data de Inclusão.
+            unidade (str, opcional): Só resultados dessa unidade.
+
+        Returns:
+            list[dict]: Metadados do resultado e um trecho com os termos encontrados entre [ ].
+        """
+        condicoes = ["busca MATCH ?"]
+        parametros = [consulta]
+        if desde:
+            condicoes.append("r.data_inclusao >= ?")
+            parametros.append(desde.isoformat())
+        if ate:
+            condicoes.append("r.data_inclusao <= ?")
+            parametros.append(ate.isoformat())
+        if unidade:
+            condicoes.append("r.unidade = ?")
+            parametros.append(unidade)
+        linhas = self._conexao.execute(
+            f"""
+            SELECT r.processo, r.documento, r.unidade, r.usuario, r.data_inclusao, r.link,
+                   snippet(busca, -1, '[', ']', '…', 12)
+            FROM busca JOIN registros AS r ON r.rowid = busca.rowid
+            WHERE {' AND '.join(condicoes)}
+            ORDER BY bm25(busca)
+            LIMIT ?
+            """,
+            (*parametros, limite),
+        ).fetchall()
+        campos = ("processo", "documento", "unidade", "usuario", "data_inclusao", "link", "trecho")
+        return [dict(zip(campos, linha)) for linha in linhas]
+
+
+def _data(texto):
+    return datetime.strptime(texto, FORMATO_DATA).date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice local (SQLite FTS5) dos resultados e documentos do SEI.")
+    parser.add_argument("--indice", default=ARQUIVO_INDICE, help=f"Arquivo do índice (padrão: {ARQUIVO_INDICE}).")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    indexar = comandos.add_parser("indexar", help="Acrescenta CSVs de execuções e o texto do acervo ao índice.")
+    indexar.add_argument("csv", nargs="*", help="CSVs gerados pelos scripts.")
+    indexar.add_argument("--acervo", nargs="?", const=sei_acervo.PASTA_ACERVO, default=None,
+                         help=f"Indexa também o texto dos documentos do acervo (padrão: {sei_acervo.PASTA_ACERVO}).")
+
+    buscar = comandos.add_parser("buscar", help="Consulta o índice.")
+    buscar.add_argument("termos", nargs="+", help="Termos da busca (sem acento ou caixa; termo* busca por prefixo).")
+    buscar.add_argument("--fts", action="store_true", help="Usa os termos como consulta FTS5 (AND, OR, NEAR, coluna:termo).")
+    buscar.add_argument("--desde", type=_data, help="Data de Inclusão inicial (dd/mm/aaaa).")
+    buscar.add_argument("--ate", type=_data, help="Data de Inclusão final (dd/mm/aaaa).")
+    buscar.add_argument("--unidade", help="Só resultados desta unidade.")
+    buscar.add_argument("--limite", type=int, default=20, help="Máximo de resultados (padrão: 20).")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    with Indice(args.indice) as indice:
+        if args.comando == "indexar":
+            for caminho in args.csv:
+                indice.indexar_csv(caminho)
+            if args.acervo is not None:
+                indice.indexar_acervo(args.acervo)
+            return
+
+        termos = " ".join(args.termos)
+        inicio = time.perf_counter()
+        try:
+            resultados = indice.buscar(termos if args.fts else consulta_fts(termos),
+                                       args.limite, args.desde, args.ate, args.unidade)
+        except sqlite3.OperationalError as e:
+            logging.error(f"Consulta inválida: {e}")
+            sys.exit(1)
+        duracao = (time.perf_counter() - inicio) * 1000
+        for resultado in resultados:
+            data = resultado["data_inclusao"]
+            data = datetime.fromisoformat(data).strftime(FORMATO_DATA) if data else "-"
+            print(f"{data}  {resultado['processo']}  {resultado['documento']}  ({resultado['unidade']})")
+            print(f"    {resultado['trecho']}")
+            if resultado["link"]:
+                print(f"    {resultado['link']}")
+        print(f"{len(resultados)} resultados em {duracao:.1f} ms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,532 @@
+import os
+import re
+import csv
+import json
+import glob
+import sqlite3
+import getpass
+import logging
+import argparse
+import importlib
+import threading
+from dataclasses import dataclass, fields
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+import sei_http
+import sei_rede
+import sei_saida
+import sei_delta
+import sei_espera
+import sei_acervo
+import sei_sessao
+import sei_captura
+import sei_pipeline
+import sei_extracao
+import sei_navegador
+import sei_checkpoint
+
+# --- 1. CONFIGURAÇÃO ---
+#
+# Várias pesquisas do SEI numa única execução: um login, uma aba por consulta.
+# As consultas ficam num arquivo JSON (veja consultas.json):
+#
+#     {
+#       "padrao": {"restringir_orgao": true, "data_inicio": "30/07/2024"},
+#       "consultas": [
+#         {"nome": "mps", "termos": "MPS não \"SIC\"", "tramitacao": true},
+#         {"nome": "proposicoes", "termos": "\"PLP\" ou \"PLN\"", "campo": "especificacao"}
+#       ]
+#     }
+#
+# "padrao" vale para todas as consultas, que podem sobrescrevê-lo.
+
+# Pasta dos lotes; cada execução ganha uma subpasta <arquivo>_<data e hora>
+PASTA_LOTES = "lotes"
+
+# Estado do modo incremental (--delta), compartilhado entre os lotes
+ARQUIVO_ESTADO_DELTA = os.path.join(PASTA_LOTES, "estado_delta.sqlite3")
+
+# Consultas executadas ao mesmo tempo, cada uma na sua aba
+CONSULTAS_SIMULTANEAS = 3
+
+# Campos de texto do formulário de pesquisa
+CAMPOS_PESQUISA = {
+    "texto": "q",
+    "especificacao": "txtDescricaoPesquisa",
+}
+
+XPATH_MENU_PESQUISA = '//*[@id="infraMenu"]/li[14]/a/span'
+XPATH_RESTRINGIR_ORGAO = '//*[@id="divSinRestringirOrgao"]/div'
+XPATH_TRAMITACAO = '//*[@id="divSinTramitacao"]/div'
+
+# Nome das consultas: vira nome de arquivo
+PADRAO_NOME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Colunas do arquivo que liga cada resultado às consultas que o encontraram
+COLUNAS_OCORRENCIAS = ["Consulta", "Dona", "Chave", "Documento", "Link Completo"]
+
+
+@dataclass
+class Consulta:
+    """
+    Uma pesquisa do lote e seus filtros.
+
+    Attributes:
+        nome: Identificador da consulta (nome do CSV e da pasta dos documentos).
+        termos: Texto da pesquisa, com os operadores do SEI ("ou", "não", aspas).
+        campo: "texto" (pesquisa livre, #q) ou "especificacao" (#txtDescricaoPesquisa).
+        restringir_orgao: Marca "Restringir ao órgão".
+        tramitacao: Marca "Tramitação dentro do órgão".
+        data_inicio, data_fim: Período de inclusão (dd/mm/aaaa). Sem data_fim, até hoje.
+    """
+    nome: str
+    termos: str
+    campo: str = "texto"
+    restringir_orgao: bool = True
+    tramitacao: bool = False
+    data_inicio: str = ""
+    data_fim: str = ""
+
+    def __post_init__(self):
+        if not PADRAO_NOME.match(self.nome or ""):
+            raise ValueError(f"Nome de consulta inválido: {self.nome!r} (use letras, números, '_' e '-').")
+        if not self.termos:
+            raise ValueError(f"A consulta '{self.nome}' não tem termos.")
+        if self.campo not in CAMPOS_PESQUISA:
+            raise ValueError(f"Campo desconhecido na consulta '{self.nome}': {self.campo}")
+        for data in (self.data_inicio, self.data_fim):
+            if data:
+                datetime.strptime(data, sei_delta.FORMATO_DATA)
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Cria a consulta a partir de um item do arquivo, recusando chaves desconhecidas."""
+        conhecidas = {campo.name for campo in fields(cls)}
+        desconhecidas = set(dados) - conhecidas
+        if desconhecidas:
+            raise ValueError(f"Chaves desconhecidas na consulta {dados.get('nome')!r}: {sorted(desconhecidas)}")
+        return cls(**dados)
+
+
+def carregar_consultas(caminho):
+    """
+    Lê o arquivo de consultas do lote.
+
+    Returns:
+        list[Consulta]: Consultas na ordem do arquivo.
+
+    Raises:
+        ValueError: Se o arquivo tiver consultas inválidas ou nomes repetidos.
+    """
+    with open(caminho, encoding="utf-8") as f:
+        configuracao = json.load(f)
+    padrao = configuracao.get("padrao", {})
+    consultas = [Consulta.de_dict({**padrao, **item}) for item in configuracao.get("consultas", [])]
+    if not consultas:
+        raise ValueError(f"Nenhuma consulta em {caminho}.")
+    nomes = [consulta.nome for consulta in consultas]
+    repetidos = sorted({nome for nome in nomes if nomes.count(nome) > 1})
+    if repetidos:
+        raise ValueError(f"Consultas com o mesmo nome: {repetidos}")
+    return consultas
+
+# --- 2. PESQUISA NUMA ABA ---
+
+def executar_consulta(driver, consulta, data_inicio=None):
+    """
+    Abre o formulário de pesquisa na aba atual, preenche os filtros da consulta e pesquisa.
+
+    Args:
+        driver: Instância do WebDriver numa página do SEI com o menu principal.
+        consulta (Consulta): Termos e filtros.
+        data_inicio (str, opcional): Substitui consulta.data_inicio (modo incremental).
+
+    Returns:
+        bool: True se a primeira página de resultados carregou.
+    """
+    id_campo = CAMPOS_PESQUISA[consulta.campo]
+    data_inicio = data_inicio or consulta.data_inicio
+    try:
+        menu = driver.find_element(By.XPATH, XPATH_MENU_PESQUISA)
+        sei_espera.clicar_e_aguardar(driver, menu, (By.ID, id_campo))
+
+        if consulta.restringir_orgao:
+            driver.find_element(By.XPATH, XPATH_RESTRINGIR_ORGAO).click()
+        if consulta.tramitacao:
+            driver.find_element(By.XPATH, XPATH_TRAMITACAO).click()
+        driver.find_element(By.ID, id_campo).send_keys(consulta.termos)
+
+        if data_inicio:
+            campo_inicio = driver.find_element(By.ID, "txtDataInicio")
+            campo_inicio.clear()
+            campo_inicio.send_keys(data_inicio)
+            campo_fim = driver.find_element(By.ID, "txtDataFim")
+            campo_fim.clear()
+            campo_fim.send_keys(consulta.data_fim or datetime.now().strftime(sei_delta.FORMATO_DATA))
+
+        driver.find_element(By.ID, "sbmPesquisar").click()
+        sei_espera.elemento_presente(driver, (By.XPATH, sei_extracao.XPATH_TABELA_RESULTADOS))
+        logging.info(f"Consulta '{consulta.nome}' pesquisada.")
+        return True
+    except WebDriverException as e:
+        logging.error(f"Falha na pesquisa da consulta '{consulta.nome}': {e}")
+        return False
+
+
+class _AbaDaConsulta:
+    """
+    O Reautenticador visto da aba de uma consulta.
+
+    Antes de cada uso do navegador, volta para a aba da consulta; um novo login no
+    meio da paginação refaz a busca desta consulta. O resto vem do Reautenticador
+    do lote, compartilhado por todas as abas.
+    """
+
+    def __init__(self, reautenticador, aba, refazer_busca):
+        self._reautenticador = reautenticador
+        self.aba = aba
+        self.refazer_busca = refazer_busca
+
+    def __getattr__(self, nome):
+        return getattr(self._reautenticador, nome)
+
+    def exclusivo(self, paginas):
+        return self._reautenticador.exclusivo(paginas, antes=lambda: self.driver.switch_to.window(self.aba))
+
+    def reposicionar(self, pagina, geracao=None):
+        self._reautenticador.reposicionar(pagina, self.refazer_busca, geracao)
+
+# --- 3. DEDUPLICAÇÃO ENTRE CONSULTAS ---
+
+class Ocorrencias:
+    """
+    Resultados de todas as consultas do lote, em SQLite, para deduplicar entre elas.
+
+    Cada resultado pertence à primeira consulta que o encontrou: só ela o grava no
+    seu CSV e captura o documento. Os encontros das demais ficam registrados, então
+    nenhuma etiqueta se perde (veja exportar_csv). Numa retomada, a consulta dona
+    reconhece os próprios resultados e continua a gravá-los.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS donos (
+                chave TEXT PRIMARY KEY,
+                consulta TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS ocorrencias (
+                consulta TEXT NOT NULL,
+                chave TEXT NOT NULL,
+                documento TEXT,
+                link TEXT,
+                PRIMARY KEY (consulta, chave)
+            );
+        """)
+        self._conexao.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self._conexao.close()
+
+    def da_consulta(self, consulta, registros):
+        """
+        Registra os resultados encontrados pela consulta e devolve os que são dela.
+
+        Returns:
+            list[Registro]: Resultados ainda sem dona, ou que já eram desta consulta.
+        """
+        chaves = [registro.chave_texto() for registro in registros]
+        with self._trava, self._conexao:
+            self._conexao.executemany(
+                "INSERT OR IGNORE INTO ocorrencias VALUES (?, ?, ?, ?)",
+                [(consulta, chave, registro.documento, registro.link) for chave, registro in zip(chaves, registros)],
+            )
+            self._conexao.executemany("INSERT OR IGNORE INTO donos VALUES (?, ?)", [(chave, consulta) for chave in chaves])
+            donos = dict(self._conexao.execute(
+                f"SELECT chave, consulta FROM donos WHERE chave IN ({','.join('?' * len(chaves))})", chaves
+            ).fetchall()) if chaves else {}
+        return [registro for chave, registro in zip(chaves, registros) if donos.get(chave) == consulta]
+
+    def filtrar_paginas(self, consulta, paginas):
+        """
+        Deixa em cada página só os resultados da consulta (veja da_consulta).
+
+        Yields:
+            tuple[int, list[Registro]]: Número da página e os resultados dela que são da consulta.
+        """
+        for pagina, registros in paginas:
+            registros = list(registros)
+            proprios = self.da_consulta(consulta, registros)
+            if len(proprios) < len(registros):
+                logging.info(f"[Página {pagina}] {len(registros) - len(proprios)} resultados já vieram de outra consulta.")
+            yield pagina, proprios
+
+    def exportar_csv(self, caminho):
+        """
+        Grava, para cada resultado, todas as consultas que o encontraram e a dona dele.
+
+        Returns:
+            int: Quantidade de linhas gravadas.
+        """
+        with self._trava:
+            linhas = self._conexao.execute("""
+                SELECT o.consulta, d.consulta, o.chave, o.documento, o.link
+                FROM ocorrencias o JOIN donos d ON d.chave = o.chave
+                ORDER BY d.consulta, o.chave, o.consulta
+            """).fetchall()
+        with open(caminho, "w", encoding="utf-8-sig", newline="") as f:
+            escritor = csv.writer(f, delimiter=";")
+            escritor.writerow(COLUNAS_OCORRENCIAS)
+            escritor.writerows(linhas)
+        return len(linhas)
+
+    def resumo(self):
+        """Por consulta: resultados encontrados e quantos ficaram com ela."""
+        with self._trava:
+            encontrados = dict(self._conexao.execute("SELECT consulta, COUNT(*) FROM ocorrencias GROUP BY consulta"))
+            proprios = dict(self._conexao.execute("SELECT consulta, COUNT(*) FROM donos GROUP BY consulta"))
+        return {consulta: {"encontrados": total, "proprios": proprios.get(consulta, 0)}
+                for consulta, total in encontrados.items()}
+
+# --- 4. EXECUÇÃO DO LOTE ---
+
+class Lote:
+    """
+    Executa as consultas de um lote com um único navegador autenticado.
+
+    Cada consulta roda numa thread com o nome dela e numa aba própria: pesquisa,
+    percorre os resultados e os passa pela pipeline (sei_pipeline), com CSV,
+    manifesto e pasta de documentos próprios. O navegador é compartilhado pela
+    trava do Reautenticador: com o motor "navegador", as abas se revezam página a
+    página; com "http" ou "paralelo", só a primeira página passa pelo navegador e
+    as consultas avançam de fato ao mesmo tempo.
+    """
+
+    def __init__(self, driver, reautenticador, pasta, acervo=sei_acervo.PASTA_ACERVO, motor="navegador",
+                 capturar=True, trabalhadores=1, abas=1, formato="pdf", retomar=False, delta=None,
+                 perfil_listagem=sei_rede.PERFIL_LISTAGEM, perfil_captura=sei_rede.PERFIL_CAPTURA):
+        """
+        Args:
+            driver: WebDriver já autenticado, na página inicial do SEI.
+            reautenticador (sei_sessao.Reautenticador): Novo login se a sessão expirar.
+            pasta (str): Pasta do lote (CSVs, documentos e ocorrências).
+            acervo (str): Pasta do acervo compartilhado entre execuções.
+            motor (str): "navegador", "http" ou "paralelo" (veja sei_http.iterar_paginas).
+            capturar (bool): Se False, só grava os metadados.
+            trabalhadores, abas, formato: Captura dos documentos (veja sei_pipeline.criar_capturador).
+            retomar (bool): Continua um lote interrompido a partir dos manifestos.
+            delta (str, opcional): Arquivo do estado incremental; cada consulta começa na
+                sua última data coletada e grava só os resultados novos.
+            perfil_listagem, perfil_captura: Perfis de rede (sei_rede.PERFIS).
+        """
+        self.driver = driver
+        self.reautenticador = reautenticador
+        self.pasta = pasta
+        self.acervo = acervo
+        self.motor = motor
+        self.capturar = capturar
+        self.trabalhadores = trabalhadores
+        self.abas = abas
+        self.formato = formato
+        self.retomar = retomar
+        self.delta = delta
+        self.perfil_listagem = perfil_listagem
+        self.perfil_captura = perfil_captura
+        self.aba_inicial = driver.current_window_handle
+        os.makedirs(pasta, exist_ok=True)
+        self.ocorrencias = Ocorrencias(os.path.join(pasta, "ocorrencias.sqlite3"))
+        self.resultados = {}
+
+    def caminho_csv(self, consulta):
+        return os.path.join(self.pasta, f"{consulta.nome}.csv")
+
+    def executar(self, consultas, simultaneas=CONSULTAS_SIMULTANEAS):
+        """
+        Executa as consultas, no máximo `simultaneas` ao mesmo tempo.
+
+        Returns:
+            dict: Por consulta, os totais da pipeline (ou o erro) e os resultados encontrados.
+        """
+        vagas = threading.Semaphore(max(simultaneas, 1))
+
+        def rodar(consulta):
+            with vagas:
+                try:
+                    self.resultados[consulta.nome] = self._executar_consulta(consulta)
+                except Exception as e:
+                    logging.error(f"Consulta '{consulta.nome}' falhou: {e}")
+                    self.resultados[consulta.nome] = {"erro": str(e)}
+
+        threads = [threading.Thread(target=rodar, args=(consulta,), name=consulta.nome) for consulta in consultas]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        total = self.ocorrencias.exportar_csv(os.path.join(self.pasta, "consultas_por_registro.csv"))
+        logging.info(f"{total} ocorrências gravadas em consultas_por_registro.csv.")
+        for nome, resumo in self.ocorrencias.resumo().items():
+            self.resultados.setdefault(nome, {}).update(resumo)
+        return self.resultados
+
+    def fechar(self):
+        self.ocorrencias.fechar()
+
+    def _abrir_aba(self, consulta, data_inicio):
+        """Abre a aba da consulta e pesquisa nela. Devolve o identificador da aba."""
+        with self.reautenticador.trava:
+            self.driver.switch_to.window(self.aba_inicial)
+            self.driver.switch_to.new_window("tab")
+            aba = self.driver.current_window_handle
+            sei_rede.aplicar_perfil(self.driver, self.perfil_listagem)
+            self.driver.get(self.reautenticador.pagina_inicial)
+            sei_espera.documento_pronto(self.driver)
+            if not executar_consulta(self.driver, consulta, data_inicio):
+                self._fechar_aba(aba)
+                raise RuntimeError("Falha na pesquisa.")
+            return aba
+
+    def _fechar_aba(self, aba):
+        with self.reautenticador.trava:
+            self.driver.switch_to.window(aba)
+            self.driver.close()
+            self.driver.switch_to.window(self.aba_inicial)
+
+    def _paginas(self, aba, vista):
+        """Páginas da consulta; a primeira é sempre lida na aba dela, com o navegador reservado."""
+        paginas = iter(sei_http.iterar_paginas(self.driver, self.motor, trabalhadores=4, reautenticador=vista))
+        with self.reautenticador.trava:
+            self.driver.switch_to.window(aba)
+            primeira = next(paginas, None)
+        if primeira is None:
+            return
+        yield primeira
+        yield from paginas
+
+    def _executar_consulta(self, consulta):
+        delta = sei_delta.EstadoDelta(self.delta, consulta.nome) if self.delta else None
+        try:
+            data_inicio = delta.data_inicio(consulta.data_inicio) if delta else consulta.data_inicio
+            logging.info(f"Iniciando a consulta '{consulta.nome}'" + (f" a partir de {data_inicio}." if data_inicio else "."))
+            aba = self._abrir_aba(consulta, data_inicio)
+            vista = _AbaDaConsulta(self.reautenticador, aba,
+                                   lambda driver: executar_consulta(driver, consulta, data_inicio))
+            try:
+                return self._listar(consulta, aba, vista, delta)
+            finally:
+                self._fechar_aba(aba)
+        finally:
+            if delta:
+                delta.fechar()
+
+    def _listar(self, consulta, aba, vista, delta):
+        caminho_csv = self.caminho_csv(consulta)
+        pasta_documentos = os.path.join(self.pasta, f"documentos_{consulta.nome}")
+        os.makedirs(pasta_documentos, exist_ok=True)
+        with sei_checkpoint.Manifesto.para_saida(caminho_csv, self.retomar) as manifesto, \
+                sei_saida.abrir_saida(caminho_csv, encoding='utf-8-sig', anexar=self.retomar,
+                                      posicao=manifesto.posicao_saida()) as saida, \
+                sei_acervo.Acervo(self.acervo) as acervo:
+            capturador = None
+            if self.capturar:
+                with self.reautenticador.trava:
+                    capturador = sei_pipeline.criar_capturador(self.driver, self.trabalhadores, self.abas,
+                                                               self.perfil_captura, vista)
+            pipeline = sei_pipeline.Pipeline(
+                pasta_documentos, saida, capturador, manifesto, acervo,
+                ao_gravar=(lambda pagina, registros: delta.registrar(registros)) if delta else None,
+                formato=self.formato,
+            )
+            paginas = self._paginas(aba, vista)
+            if delta:
+                paginas = delta.filtrar_paginas(paginas)
+            totais = pipeline.executar(self.ocorrencias.filtrar_paginas(consulta.nome, paginas))
+            if delta and pipeline.completa:
+                delta.concluir()
+        return dict(totais, csv=caminho_csv, completa=pipeline.completa)
+
+
+def pasta_do_lote(arquivo_consultas, retomar=False):
+    """
+    Pasta do lote: a mais recente do mesmo arquivo de consultas, ao retomar, ou uma nova.
+    """
+    base = os.path.splitext(os.path.basename(arquivo_consultas))[0]
+    if retomar:
+        anteriores = sorted(glob.glob(os.path.join(PASTA_LOTES, f"{base}_*")))
+        if anteriores:
+            return anteriores[-1]
+    return os.path.join(PASTA_LOTES, f"{base}_{datetime.now():%Y-%m-%d_%H%M%S}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa várias pesquisas do SEI com um único login, uma aba por consulta.")
+    parser.add_argument("consultas", help="Arquivo JSON com as consultas (veja consultas.json).")
+    parser.add_argument("--script", choices=["auto_sei", "auto_sei1"], default="auto_sei1",
+                        help="Script de onde vêm a URL e o login do SEI (padrão: auto_sei1).")
+    parser.add_argument("--simultaneas", type=int, default=CONSULTAS_SIMULTANEAS,
+                        help=f"Consultas executadas ao mesmo tempo (padrão: {CONSULTAS_SIMULTANEAS}).")
+    parser.add_argument("--motor", choices=["navegador", "http", "paralelo"], default="navegador",
+                        help="Motor de paginação (padrão: navegador).")
+    parser.add_argument("--modo", choices=["completo", "metadados"], default="completo",
+                        help="completo: lista e captura; metadados: só a lista.")
+    parser.add_argument("--workers", type=int, default=1, help="Navegadores headless de captura por consulta (padrão: 1).")
+    parser.add_argument("--abas", type=int, default=1, help="Abas de captura por consulta quando --workers é 1 (padrão: 1).")
+    parser.add_argument("--formato", choices=list(sei_captura.EXTENSOES_FORMATO), default="pdf",
+                        help="Formato dos documentos capturados (padrão: pdf).")
+    parser.add_argument("--resume", action="store_true", help="Continua o último lote do mesmo arquivo de consultas.")
+    parser.add_argument("--delta", action="store_true",
+                        help="Modo incremental: cada consulta começa na sua última data coletada.")
+    args = parser.parse_args()
+
+    script = importlib.import_module(args.script)
+    script.configurar_logging()
+    # As consultas rodam em threads com o nome delas
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s'))
+
+    consultas = carregar_consultas(args.consultas)
+    pasta = pasta_do_lote(args.consultas, args.resume)
+    logging.info(f"{len(consultas)} consultas; resultados em '{pasta}'.")
+    os.makedirs(PASTA_LOTES, exist_ok=True)
+
+    usuario = input("Digite seu usuário do SEI: ")
+    senha = getpass.getpass("Digite sua senha do SEI: ")
+    orgao = input("Digite a sigla do Órgão (ex: MGI): ")
+
+    driver = None
+    lote = None
+    try:
+        driver = sei_navegador.criar_driver()
+        driver.implicitly_wait(5)
+        if not sei_sessao.entrar(driver, script.URL_SEI, usuario, senha, orgao, script.realizar_login):
+            logging.error("Processo encerrado devido a falha no login.")
+            return
+        reautenticador = sei_sessao.Reautenticador(driver, script.URL_SEI, usuario, senha, orgao, script.realizar_login)
+        lote = Lote(driver, reautenticador, pasta, acervo=script.PASTA_ACERVO, motor=args.motor,
+                    capturar=args.modo == "completo", trabalhadores=args.workers, abas=args.abas,
+                    formato=args.formato, retomar=args.resume,
+                    delta=ARQUIVO_ESTADO_DELTA if args.delta else None)
+        for nome, resultado in lote.executar(consultas, args.simultaneas).items():
+            logging.info(f"Consulta '{nome}': {resultado}")
+    except Exception as e:
+        logging.critical(f"Ocorreu um erro fatal no lote: {e}")
+    finally:
+        if lote:
+            lote.fechar()
+        if driver:
+            logging.info("Fechando o navegador.")
+            driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import os
+import time
+import json
+import logging
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.common.exceptions import SessionNotCreatedException
+
+# --- 1. FÁBRICA DO WEBDRIVER ---
+
+# Perfil de opções compartilhado por todos os navegadores (o da pesquisa e os
+# trabalhadores de captura); o modo headless é acrescentado por quem precisa.
+ARGUMENTOS_CHROME = [
+    '--disable-gpu',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-popup-blocking',
+]
+ARGUMENTO_HEADLESS = '--headless=new'
+
+# Onde fica guardado o caminho do chromedriver resolvido pelo webdriver_manager
+ARQUIVO_CACHE_DRIVER = os.path.join(os.path.expanduser("~"), ".cache", "sei_aspar", "chromedriver.json")
+
+# Depois desse tempo o driver é resolvido de novo (o Chrome se atualiza sozinho)
+VALIDADE_CACHE_DRIVER = 7 * 24 * 3600
+
+# Caminho já resolvido neste processo
+_caminho_driver = None
+
+
+def _ler_cache():
+    try:
+        with open(ARQUIVO_CACHE_DRIVER, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    caminho = cache.get("caminho")
+    if not caminho or not os.path.exists(caminho) or time.time() - cache.get("resolvido_em", 0) > VALIDADE_CACHE_DRIVER:
+        return None
+    return caminho
+
+
+def _gravar_cache(caminho):
+    os.makedirs(os.path.dirname(ARQUIVO_CACHE_DRIVER), exist_ok=True)
+    with open(ARQUIVO_CACHE_DRIVER, "w", encoding="utf-8") as f:
+        json.dump({"caminho": caminho, "resolvido_em": time.time()}, f)
+
+
+def caminho_chromedriver(renovar=False):
+    """
+    Caminho do chromedriver, resolvido pelo webdriver_manager só quando necessário.
+
+    ChromeDriverManager().install() consulta a rede a cada chamada; aqui o
+    resultado fica guardado em memória e em ARQUIVO_CACHE_DRIVER, então as
+    execuções seguintes abrem o Chrome sem esperar a resolução.
+
+    Args:
+        renovar (bool): Ignora o cache (por exemplo, depois de uma atualização do Chrome).
+    """
+    global _caminho_driver
+    if not renovar:
+        _caminho_driver = _caminho_driver or _ler_cache()
+        if _caminho_driver:
+            return _caminho_driver
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    logging.info("Resolvendo o chromedriver compatível com o Chrome instalado.")
+    _caminho_driver = ChromeDriverManager().install()
+    _gravar_cache(_caminho_driver)
+    return _caminho_driver
+
+
+def opcoes_chrome(headless=False, argumentos=None):
+    """
+    Opções do Chrome a partir do perfil compartilhado.
+
+    Args:
+        headless (bool): Acrescenta ARGUMENTO_HEADLESS.
+        argumentos (list[str], opcional): Substituem ARGUMENTOS_CHROME.
+    """
+    options = webdriver.ChromeOptions()
+    argumentos = list(ARGUMENTOS_CHROME if argumentos is None else argumentos)
+    if headless and not any(a.startswith('--headless') for a in argumentos):
+        argumentos.append(ARGUMENTO_HEADLESS)
+    for argumento in argumentos:
+        options.add_argument(argumento)
+    return options
+
+
+def criar_driver(headless=False, argumentos=None):
+    """
+    Abre o Chrome com o perfil compartilhado e o chromedriver em cache.
+
+    Nada é aberto até a chamada: os scripts só criam o navegador quando vão usá-lo.
+    Se o driver em cache não servir mais para o Chrome instalado, ele é
+    resolvido de novo e a abertura é repetida uma vez.
+
+    Returns:
+        WebDriver: Navegador pronto para uso.
+    """
+    options = opcoes_chrome(headless, argumentos)
+    try:
+        return webdriver.Chrome(service=ChromeService(caminho_chromedriver()), options=options)
+    except SessionNotCreatedException as e:
+        logging.warning(f"O chromedriver em cache não abriu o Chrome ({e.msg}). Resolvendo de novo.")
+        return webdriver.Chrome(service=ChromeService(caminho_chromedriver(renovar=True)), options=options)
@@ -0,0 +1,218 @@
+import os
+import io
+import sys
+import gzip
+import lzma
+import json
+import time
+import tarfile
+import logging
+import argparse
+
+# --- 1. PACOTE DA EXECUÇÃO ---
+
+# Compressão aplicada a cada documento dentro do pacote. "auto" comprime tudo
+# menos PDF, que já vem comprimido e quase não diminui.
+COMPRESSOES = {
+    "nenhuma": ("", None),
+    "gzip": (".gz", gzip),
+    "lzma": (".xz", lzma),
+}
+EXTENSOES_JA_COMPRIMIDAS = (".pdf", ".zip", ".gz", ".xz", ".png", ".jpg", ".jpeg")
+
+# Sufixo do índice de acesso aleatório, gravado ao lado do pacote
+SUFIXO_INDICE = ".indice.jsonl"
+
+
+def caminho_indice(caminho_pacote):
+    return caminho_pacote + SUFIXO_INDICE
+
+
+def _descartar_membro_incompleto(caminho_pacote):
+    """
+    Corta o pacote logo depois do último membro registrado no índice.
+
+    Descarta um membro gravado pela metade numa execução interrompida (e o fim
+    de arquivo do tar), para que o pacote possa ser continuado.
+    """
+    if not os.path.exists(caminho_indice(caminho_pacote)):
+        return
+    fim = 0
+    for entrada in carregar_indice(caminho_pacote).values():
+        blocos = -(-entrada["tamanho"] // tarfile.BLOCKSIZE)
+        fim = max(fim, entrada["offset"] + blocos * tarfile.BLOCKSIZE)
+    os.truncate(caminho_pacote, fim)
+    # Fim de arquivo do tar (dois blocos zerados), onde o modo "a" continua
+    with open(caminho_pacote, "ab") as f:
+        f.write(b"\0" * 2 * tarfile.BLOCKSIZE)
+
+
+class Pacote:
+    """
+    Pacote .tar de uma execução, só de acréscimo, com os documentos e o CSV.
+
+    Cada documento entra como um membro do tar, comprimido individualmente se
+    pedido, e o arquivo é sincronizado com o disco em seguida. Um índice JSONL
+    ao lado do pacote guarda, para cada membro, o deslocamento e o tamanho dos
+    dados, então um documento pode ser lido sem descompactar o resto (ler_membro).
+
+    Como o tar é gravado membro a membro, uma queda no meio da execução preserva
+    tudo o que já entrou; ao reabrir, o pacote é continuado.
+    """
+
+    def __init__(self, caminho, compressao="nenhuma"):
+        """
+        Args:
+            caminho (str): Arquivo .tar do pacote.
+            compressao (str): "nenhuma", "gzip", "lzma" ou "auto" (gzip, exceto PDFs).
+        """
+        if compressao not in COMPRESSOES and compressao != "auto":
+            raise ValueError(f"Compressão desconhecida: {compressao}")
+        self.caminho = caminho
+        self.compressao = compressao
+        existe = os.path.exists(caminho)
+        if existe:
+            _descartar_membro_incompleto(caminho)
+        self._tar = tarfile.open(caminho, "a" if existe else "w", format=tarfile.PAX_FORMAT)
+        self._indice = open(caminho_indice(caminho), "a", encoding="utf-8")
+        self.total = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def _compressao_para(self, nome):
+        if self.compressao == "auto":
+            return "nenhuma" if nome.lower().endswith(EXTENSOES_JA_COMPRIMIDAS) else "gzip"
+        return self.compressao
+
+    def adicionar(self, nome, dados, id_documento=None):
+        """
+        Acrescenta um membro ao pacote.
+
+        Args:
+            nome (str): Nome do membro (sem o sufixo da compressão).
+            dados (bytes): Conteúdo.
+            id_documento (str, opcional): Identificador do documento no SEI, guardado no índice.
+
+        Returns:
+            dict: Entrada do índice.
+        """
+        compressao = self._compressao_para(nome)
+        sufixo, modulo = COMPRESSOES[compressao]
+        conteudo = modulo.compress(dados) if modulo else dados
+
+        info = tarfile.TarInfo(nome + sufixo)
+        info.size = len(conteudo)
+        info.mtime = int(time.time())
+        cabecalho = info.tobuf(self._tar.format, self._tar.encoding, self._tar.errors)
+        inicio = self._tar.offset
+        self._tar.addfile(info, io.BytesIO(conteudo))
+        self._tar.fileobj.flush()
+        os.fsync(self._tar.fileobj.fileno())
+
+        entrada = {
+            "nome": nome,
+            "membro": info.name,
+            "offset": inicio + len(cabecalho),
+            "tamanho": len(conteudo),
+            "tamanho_original": len(dados),
+            "compressao": compressao,
+            "id_documento": id_documento,
+        }
+        self._indice.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+        self._indice.flush()
+        os.fsync(self._indice.fileno())
+        self.total += 1
+        return entrada
+
+    def adicionar_arquivo(self, caminho_arquivo, nome=None, id_documento=None, remover=False):
+        """
+        Acrescenta um arquivo ao pacote.
+
+        Args:
+            caminho_arquivo (str): Arquivo a guardar.
+            nome (str, opcional): Nome do membro; padrão, o nome do arquivo.
+            id_documento (str, opcional): Identificador do documento no SEI.
+            remover (bool): Apaga o arquivo solto depois de guardado.
+        """
+        with open(caminho_arquivo, "rb") as f:
+            entrada = self.adicionar(nome or os.path.basename(caminho_arquivo), f.read(), id_documento)
+        if remover:
+            os.remove(caminho_arquivo)
+        return entrada
+
+    def fechar(self):
+        if not self._indice.closed:
+            self._tar.close()
+            self._indice.close()
+            logging.info(f"{self.total} arquivos acrescentados ao pacote: {self.caminho}")
+
+
+def pacote_da_saida(caminho_saida, compressao="nenhuma"):
+    """Abre o pacote .tar da execução, ao lado do seu arquivo de saída (CSV)."""
+    return Pacote(os.path.splitext(caminho_saida)[0] + ".tar", compressao)
+
+# --- 2. LEITURA ---
+
+def carregar_indice(caminho_pacote):
+    """
+    Índice do pacote: nome de cada membro para sua entrada (a última, se repetido).
+
+    Returns:
+        dict[str, dict]: Entradas do índice por nome.
+    """
+    indice = {}
+    with open(caminho_indice(caminho_pacote), encoding="utf-8") as f:
+        for linha in f:
+            if linha.strip():
+                entrada = json.loads(linha)
+                indice[entrada["nome"]] = entrada
+    return indice
+
+
+def ler_membro(caminho_pacote, nome, indice=None):
+    """
+    Lê um documento do pacote direto do seu deslocamento, sem descompactar o resto.
+
+    Args:
+        caminho_pacote (str): Arquivo .tar.
+        nome (str): Nome do membro (como em adicionar).
+        indice (dict, opcional): Índice já carregado com carregar_indice.
+
+    Returns:
+        bytes: Conteúdo original do documento.
+    """
+    entrada = (indice or carregar_indice(caminho_pacote))[nome]
+    with open(caminho_pacote, "rb") as f:
+        f.seek(entrada["offset"])
+        conteudo = f.read(entrada["tamanho"])
+    modulo = COMPRESSOES[entrada["compressao"]][1]
+    return modulo.decompress(conteudo) if modulo else conteudo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lista ou extrai documentos de um pacote de execução.")
+    parser.add_argument("pacote", help="Arquivo .tar gerado pelos scripts.")
+    parser.add_argument("nome", nargs="?", help="Documento a extrair; sem ele, lista o conteúdo.")
+    parser.add_argument("-o", "--saida", help="Arquivo de destino (padrão: o nome do documento; '-' para a saída padrão).")
+    args = parser.parse_args()
+
+    indice = carregar_indice(args.pacote)
+    if args.nome is None:
+        for entrada in indice.values():
+            print(f"{entrada['tamanho_original']:>12}  {entrada['compressao']:<8} {entrada['nome']}")
+        return
+
+    dados = ler_membro(args.pacote, args.nome, indice)
+    if args.saida == "-":
+        sys.stdout.buffer.write(dados)
+        return
+    with open(args.saida or os.path.basename(args.nome), "wb") as f:
+        f.write(dados)
+
+
+if __name__ == "__main__":
+    main()
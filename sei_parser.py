@@ -0,0 +1,227 @@
+import os
+import re
+import argparse
+import logging
+from urllib.parse import urljoin
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from sei_registros import COLUNAS, Registro
+
+try:
+    import lxml  # noqa: F401
+    PARSER_HTML = "lxml"
+except ImportError:
+    PARSER_HTML = "html.parser"
+
+# --- 1. PARSING DA PÁGINA DE RESULTADOS ---
+
+def carregar_html(html):
+    """Aceita o HTML (str ou bytes) ou uma página já convertida em BeautifulSoup."""
+    if isinstance(html, BeautifulSoup):
+        return html
+    return BeautifulSoup(html, PARSER_HTML)
+
+
+def _texto(elemento):
+    """Texto visível do elemento, com os espaços normalizados."""
+    return " ".join(elemento.get_text(" ").split())
+
+
+def _campo_metatag(rotulo):
+    """Identifica o campo de uma metatag ('Unidade', 'Usuário', 'Data de Inclusão') pelo rótulo."""
+    rotulo = rotulo.lower()
+    if rotulo.startswith("unidade"):
+        return "unidade"
+    if rotulo.startswith("usu"):
+        return "usuario"
+    if rotulo.startswith("data"):
+        return "data_inclusao"
+    return None
+
+
+def _registro_do_titulo(titulo, url_base):
+    """Cria o registro a partir da célula 'pesquisaTituloEsquerda' (processo, documento e link)."""
+    ancoras = titulo.find_all("a")
+    textos = [t for t in (_texto(a) for a in ancoras) if t]
+    link = ancoras[0].get("href") if ancoras else None
+    if link and url_base:
+        link = urljoin(url_base, link)
+    return {
+        "processo": textos[0] if len(textos) > 0 else "",
+        "documento": textos[1] if len(textos) > 1 else "",
+        "link": link,
+    }
+
+
+def iterar_registros(html, url_base=None):
+    """
+    Percorre uma página de resultados do SEI e gera um registro por resultado, sem acessar o navegador.
+
+    Cada registro começa numa linha com 'pesquisaTituloEsquerda' e recebe o snippet e as
+    metatags das linhas seguintes, então um campo ausente afeta apenas o próprio registro.
+
+    Args:
+        html (str | bytes | BeautifulSoup): Conteúdo da página (driver.page_source ou arquivo salvo).
+        url_base (str, opcional): URL da página, usada para tornar os links absolutos.
+
+    Yields:
+        Registro: Um registro por resultado, na ordem da página.
+    """
+    soup = carregar_html(html)
+    conteudo = soup.find(id="conteudo") or soup
+    ordem_metatags = ["unidade", "usuario", "data_inclusao"]
+
+    atual = None
+    for linha in conteudo.find_all("tr"):
+        titulo = linha.find(class_="pesquisaTituloEsquerda")
+        if titulo is not None:
+            if atual is not None:
+                yield Registro(**atual)
+            atual = _registro_do_titulo(titulo, url_base)
+            continue
+        if atual is None:
+            continue
+
+        snippet = linha.find(class_="pesquisaSnippet")
+        if snippet is not None:
+            atual["resumo"] = _texto(snippet)
+
+        for metatag in linha.find_all(class_="pesquisaMetatag"):
+            rotulo, separador, valor = _texto(metatag).partition(":")
+            if not separador:
+                continue
+            campo = _campo_metatag(rotulo.strip())
+            if campo is None:
+                campo = next((c for c in ordem_metatags if not atual.get(c)), None)
+            if campo is not None:
+                atual[campo] = valor.strip()
+
+    if atual is not None:
+        yield Registro(**atual)
+
+
+def parse_pagina_resultados(html, url_base=None):
+    """
+    Converte o HTML de uma página de resultados do SEI em registros, sem acessar o navegador.
+
+    Args:
+        html (str): Conteúdo da página (driver.page_source ou arquivo salvo).
+        url_base (str, opcional): URL da página, usada para tornar os links absolutos.
+
+    Returns:
+        list[dict]: Um dicionário por resultado, com as chaves de COLUNAS.
+    """
+    return [registro.como_dict() for registro in iterar_registros(html, url_base)]
+
+
+def link_proxima_pagina(html, url_base=None):
+    """
+    Localiza o link 'Próxima' de uma página de resultados.
+
+    Args:
+        html (str | bytes | BeautifulSoup): Conteúdo da página.
+        url_base (str, opcional): URL da página, usada para tornar o link absoluto.
+
+    Returns:
+        str | None: Link da próxima página, ou None se esta for a última.
+    """
+    soup = carregar_html(html)
+    for ancora in soup.find_all("a"):
+        if _texto(ancora) == "Próxima":
+            href = (ancora.get("href") or "").strip()
+            if not href:
+                return None
+            return urljoin(url_base, href) if url_base else href
+    return None
+
+
+# Contador da barra de resultados, por exemplo "1 - 10 de 237"
+PADRAO_TOTAL_RESULTADOS = re.compile(r"(\d[\d.]*)\s*(?:-|a)\s*(\d[\d.]*)\s+de\s+(\d[\d.]*)")
+
+
+def total_resultados(html):
+    """
+    Lê o total de resultados da pesquisa informado na página.
+
+    Args:
+        html (str | bytes | BeautifulSoup): Conteúdo da página.
+
+    Returns:
+        int | None: Total de resultados, ou None se a página não o informar.
+    """
+    soup = carregar_html(html)
+    conteudo = soup.find(id="conteudo") or soup
+    # O contador fica fora da tabela de resultados; ignorá-la evita casar com datas nos snippets
+    for elemento in conteudo.find_all(recursive=False):
+        if elemento.name == "table":
+            continue
+        encontrado = PADRAO_TOTAL_RESULTADOS.search(_texto(elemento))
+        if encontrado:
+            return int(encontrado.group(3).replace(".", ""))
+    return None
+
+
+def extrair_dados_offline(driver):
+    """
+    Captura o HTML da página atual numa única chamada e faz o parsing fora do navegador.
+
+    Args:
+        driver: Instância do WebDriver posicionada numa página de resultados do SEI.
+
+    Returns:
+        list[dict]: Registros da página, como em parse_pagina_resultados.
+    """
+    return parse_pagina_resultados(driver.page_source, driver.current_url)
+
+# --- 2. PÁGINAS ARQUIVADAS ---
+
+def parse_arquivo(caminho, url_base=None):
+    """
+    Lê uma página de resultados salva em disco e devolve seus registros.
+    """
+    with open(caminho, encoding="utf-8", errors="replace") as f:
+        return parse_pagina_resultados(f.read(), url_base)
+
+
+def parse_arquivos(caminhos, processos=None, url_base=None):
+    """
+    Faz o parsing de várias páginas salvas num pool de processos.
+
+    Args:
+        caminhos (list[str]): Arquivos HTML, na ordem em que os registros devem sair.
+        processos (int, opcional): Tamanho do pool. Padrão: número de CPUs.
+        url_base (str, opcional): URL usada para tornar os links absolutos.
+
+    Yields:
+        tuple[str, list[dict]]: Caminho do arquivo e seus registros, na ordem de entrada.
+    """
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        resultados = pool.map(parse_arquivo, caminhos, [url_base] * len(caminhos))
+        for caminho, registros in zip(caminhos, resultados):
+            yield caminho, registros
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrai os registros de páginas de resultados do SEI salvas em disco.")
+    parser.add_argument("paginas", nargs="+", help="Arquivos HTML (driver.page_source) a processar.")
+    parser.add_argument("-o", "--saida", default="documentos_extraidos.csv", help="CSV de saída.")
+    parser.add_argument("--processos", type=int, default=None, help="Tamanho do pool de processos.")
+    parser.add_argument("--url-base", default=None, help="URL da pesquisa, para tornar os links absolutos.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    paginas = [os.path.abspath(p) for p in args.paginas]
+    registros = []
+    for caminho, registros_pagina in parse_arquivos(paginas, args.processos, args.url_base):
+        logging.info(f"{len(registros_pagina)} registros em {caminho}")
+        registros.extend(registros_pagina)
+
+    pd.DataFrame(registros, columns=COLUNAS).to_csv(args.saida, sep=';', encoding='utf-8-sig', index=False)
+    logging.info(f"{len(registros)} registros salvos em: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import os
+import queue
+import asyncio
+import logging
+import threading
+import pandas as pd
+
+import sei_cdp
+import sei_captura
+from sei_registros import Registro, id_documento_do_link
+
+# --- 1. CONFIGURAÇÃO ---
+
+# Páginas aguardando a etapa de resolução (a paginação para quando a fila enche)
+TAMANHO_FILA_PAGINAS = 4
+
+# Documentos aguardando captura
+TAMANHO_FILA_CAPTURA = 50
+
+# Resultados por lote ao materializar uma lista já salva
+TAMANHO_LOTE_MATERIALIZAR = 100
+
+# Marcador de fim das filas
+_FIM = None
+
+
+def caminho_documento(pasta, pagina, idx, registro, extensao=".pdf"):
+    """
+    Caminho do arquivo de um documento: pgPP_III_<documento>, sem caracteres inválidos.
+
+    Args:
+        pasta (str): Pasta dos documentos.
+        pagina (int): Página (ou lote) do resultado.
+        idx (int): Posição do resultado na página, a partir de 0.
+        registro (Registro): Resultado da pesquisa.
+        extensao (str): Extensão do arquivo.
+    """
+    nome_base = f"pg{pagina:02d}_{idx+1:03d}_{registro.documento}".replace('/', '-')
+    nome_limpo = "".join(c for c in nome_base if c.isalnum() or c in " _-").rstrip()
+    return os.path.join(pasta, nome_limpo + extensao)
+
+
+def paginas_do_csv(caminho_csv, tamanho_lote=TAMANHO_LOTE_MATERIALIZAR, sep=';', encoding='utf-8-sig'):
+    """
+    Lê uma lista salva (CSV de navegar_paginas) em lotes, no formato das páginas.
+
+    Yields:
+        tuple[int, list[Registro]]: Número do lote e os registros dele.
+    """
+    lotes = pd.read_csv(caminho_csv, sep=sep, encoding=encoding, dtype=str,
+                        keep_default_na=False, chunksize=tamanho_lote)
+    for lote, df in enumerate(lotes, start=1):
+        yield lote, [Registro.de_dict(linha) for linha in df.to_dict("records")]
+
+# --- 2. CAPTURADORES ---
+
+class CapturaAbas:
+    """Captura em abas do próprio navegador do WebDriver, pelo DevTools Protocol."""
+
+    def __init__(self, driver, abas=1, espera=30, perfil=None, reautenticador=None):
+        self.url_websocket = sei_cdp.endereco_devtools(driver)
+        self.abas = abas
+        self.espera = espera
+        self.perfil = perfil
+        self.reautenticador = reautenticador
+
+    def executar(self, fila, ao_concluir):
+        asyncio.run(sei_cdp.capturar_fila_async(self.url_websocket, fila, ao_concluir, self.abas, self.espera,
+                                                self.perfil, self.reautenticador))
+
+
+class CapturaPool:
+    """Captura num pool de navegadores headless (sei_captura.PoolCaptura)."""
+
+    def __init__(self, driver, trabalhadores=4, perfil=None, reautenticador=None):
+        self.pool = sei_captura.PoolCaptura(driver, trabalhadores, perfil=perfil)
+        self.reautenticador = reautenticador
+        # No máximo dois documentos por navegador esperando no pool; o resto
+        # fica na fila limitada da etapa
+        self._vagas = threading.Semaphore(2 * trabalhadores)
+
+    def _enviar(self, link, caminho_pdf, concluido, geracoes):
+        """Envia o documento com os cookies do último login refeito, se houver."""
+        sessao = None
+        if self.reautenticador:
+            geracoes[link] = self.reautenticador.geracao
+            if self.reautenticador.geracao:
+                sessao = (self.reautenticador.geracao, self.reautenticador.cookies)
+        self.pool.enviar(link, caminho_pdf, ao_concluir=concluido, sessao=sessao)
+
+    def executar(self, fila, ao_concluir):
+        geracoes = {}
+        tentativas = {}
+
+        def concluido(link, caminho_pdf, erro):
+            # Sessão expirada: renova (uma vez por expiração) e reenvia o mesmo
+            # documento, que continua ocupando a sua vaga
+            if erro == sei_captura.ERRO_SESSAO_EXPIRADA and self.reautenticador \
+                    and tentativas.get(link, 0) < self.reautenticador.tentativas:
+                tentativas[link] = tentativas.get(link, 0) + 1
+                try:
+                    self.reautenticador.renovar(geracoes.get(link))
+                    self._enviar(link, caminho_pdf, concluido, geracoes)
+                    return
+                except Exception as e:
+                    erro = str(e)
+            # Roda na thread de resultados do pool: uma exceção que escapasse daqui
+            # a encerraria, e a vaga nunca voltaria
+            try:
+                ao_concluir(link, caminho_pdf, erro)
+            except Exception as e:
+                logging.error(f"Erro ao registrar a captura de {link}: {e}")
+            finally:
+                self._vagas.release()
+
+        try:
+            while (tarefa := fila.get()) is not _FIM:
+                self._vagas.acquire()
+                self._enviar(*tarefa, concluido, geracoes)
+        finally:
+            self.pool.fechar()
+
+
+def criar_capturador(driver, trabalhadores=1, abas=1, perfil=None, reautenticador=None):
+    """
+    Escolhe o capturador: pool de navegadores com trabalhadores > 1, senão abas do próprio navegador.
+
+    As abas CDP são independentes da aba controlada pelo WebDriver, então a
+    captura segue em paralelo com a paginação mesmo com um único navegador, e
+    cada uma tem seu próprio perfil de rede (sei_rede), sem afetar a listagem.
+
+    Com `reautenticador` (sei_sessao.Reautenticador), um documento que volta
+    como formulário de login dispara um novo login e é capturado de novo.
+    """
+    if trabalhadores > 1:
+        return CapturaPool(driver, trabalhadores, perfil, reautenticador)
+    return CapturaAbas(driver, max(abas, 1), perfil=perfil, reautenticador=reautenticador)
+
+# --- 3. PIPELINE ---
+
+class Pipeline:
+    """
+    Pipeline em etapas: listar → resolver → capturar → gravar.
+
+    Cada etapa roda no seu ritmo, ligada à seguinte por uma fila limitada:
+
+    - listar (thread de quem chama): percorre as páginas com o WebDriver, ou lê
+      uma lista já salva, e entrega cada página à resolução;
+    - resolver: decide o destino de cada documento. Os já capturados (manifesto)
+      são pulados, os que estão no acervo são copiados, e os demais vão para
+      a captura, cada link uma única vez;
+    - capturar: salva os documentos no formato escolhido (abas CDP ou pool de navegadores);
+    - gravar: grava as páginas na saída, registra capturas no manifesto e no
+      acervo e, se houver pacote, move os documentos para ele.
+
+    Sem capturador, a pipeline só grava os metadados; com saida=None, só captura
+    (modo "materializar", a partir de uma lista já salva).
+    """
+
+    def __init__(self, pasta_documentos, saida=None, capturador=None, manifesto=None,
+                 acervo=None, ao_gravar=None, tamanho_fila=TAMANHO_FILA_PAGINAS, formato="pdf", pacote=None):
+        """
+        Args:
+            pasta_documentos (str): Pasta dos documentos capturados.
+            saida (sei_saida.Saida, opcional): Destino dos metadados.
+            capturador (CapturaAbas | CapturaPool, opcional): Sem ele, nada é capturado.
+            manifesto (sei_checkpoint.Manifesto, opcional): Páginas e documentos concluídos.
+            acervo (sei_acervo.Acervo, opcional): Documentos de execuções anteriores.
+            ao_gravar (opcional): Chamada com (pagina, registros) depois de cada página gravada.
+            tamanho_fila (int): Páginas em espera entre a listagem e a resolução.
+            formato (str): "pdf", "mhtml" ou "html" (veja sei_captura.EXTENSOES_FORMATO).
+            pacote (sei_pacote.Pacote, opcional): Se informado, cada documento salvo é
+                movido para o pacote da execução em vez de ficar solto na pasta.
+        """
+        self.pasta_documentos = pasta_documentos
+        self.saida = saida
+        self.capturador = capturador
+        self.manifesto = manifesto
+        self.acervo = acervo
+        self.ao_gravar = ao_gravar
+        self.pacote = pacote
+        self.extensao = sei_captura.EXTENSOES_FORMATO[formato]
+        self._fila_paginas = queue.Queue(tamanho_fila)
+        self._fila_captura = queue.Queue(TAMANHO_FILA_CAPTURA)
+        # Sem limite: quem grava nunca espera outra etapa, então não há risco de travar
+        self._fila_gravacao = queue.Queue()
+        # Documentos a caminho da captura: registro de cada link e links já despachados.
+        # A resolução acrescenta, a gravação retira quando o documento é gravado.
+        self._registros = {}
+        self._despachados = set()
+        self._parar = threading.Event()
+        self.completa = False
+        self.totais = {"paginas": 0, "registros": 0, "capturados": 0, "do_acervo": 0, "falhas": 0}
+
+    def executar(self, paginas):
+        """
+        Roda a pipeline até o fim das páginas.
+
+        Args:
+            paginas (iterável de tuple[int, list[Registro]]): Por exemplo,
+                sei_http.iterar_paginas(driver) ou paginas_do_csv(caminho).
+
+        Returns:
+            dict: Totais de páginas, registros, documentos capturados, vindos do acervo e falhas.
+            O atributo `completa` indica se todas as páginas passaram por todas as etapas.
+        """
+        produtores = 2 if self.capturador else 1
+        # As etapas levam o nome da thread que chamou, para os logs de cada execução
+        # poderem ser separados (sei_servico)
+        prefixo = threading.current_thread().name + "/"
+        etapas = [
+            threading.Thread(target=self._etapa, args=(self._resolver, self._fila_paginas), name=prefixo + "resolver"),
+            threading.Thread(target=self._gravar, args=(produtores,), name=prefixo + "gravar"),
+        ]
+        if self.capturador:
+            etapas.append(threading.Thread(target=self._etapa, args=(self._capturar, self._fila_captura),
+                                           name=prefixo + "capturar"))
+        for etapa in etapas:
+            etapa.start()
+
+        try:
+            for pagina, registros in paginas:
+                if self._parar.is_set():
+                    break
+                self._fila_paginas.put((pagina, list(registros)))
+            else:
+                self.completa = True
+        except Exception as e:
+            logging.error(f"Erro durante a listagem: {e}")
+        finally:
+            self._fila_paginas.put(_FIM)
+            for etapa in etapas:
+                etapa.join()
+        self.completa = self.completa and not self._parar.is_set()
+
+        logging.info(f"Pipeline concluída: {self.totais}")
+        return self.totais
+
+    def _etapa(self, funcao, entrada):
+        """Roda uma etapa; se ela falhar, interrompe a listagem e esvazia a fila de entrada."""
+        try:
+            funcao()
+        except Exception as e:
+            logging.error(f"Erro na etapa '{threading.current_thread().name}': {e}")
+            self._parar.set()
+            while entrada.get() is not _FIM:
+                pass
+        finally:
+            if funcao == self._resolver and self.capturador:
+                self._fila_captura.put(_FIM)
+            self._fila_gravacao.put(_FIM)
+
+    def _resolver(self):
+        while (item := self._fila_paginas.get()) is not _FIM:
+            pagina, registros = item
+            # A página vai para a gravação antes dos seus documentos irem para a captura
+            self._fila_gravacao.put(("pagina", pagina, registros))
+            if not self.capturador:
+                continue
+
+            for idx, registro in enumerate(registros):
+                link = registro.link
+                if not link or link in self._despachados:
+                    continue
+                self._despachados.add(link)
+                if self.manifesto and self.manifesto.documento_capturado(link):
+                    continue
+
+                caminho = caminho_documento(self.pasta_documentos, pagina, idx, registro, self.extensao)
+                if self.acervo and self.acervo.exportar(registro.id_documento, caminho):
+                    self._fila_gravacao.put(("acervo", link, caminho, None))
+                    continue
+                self._registros[link] = registro
+                self._fila_captura.put((link, caminho))
+
+    def _capturar(self):
+        def ao_concluir(link, caminho_pdf, erro):
+            self._fila_gravacao.put(("captura", link, caminho_pdf, erro))
+
+        self.capturador.executar(self._fila_captura, ao_concluir)
+
+    def _gravar(self, produtores):
+        """Única etapa que escreve: saída, manifesto, acervo e pacote."""
+        while produtores:
+            item = self._fila_gravacao.get()
+            if item is _FIM:
+                produtores -= 1
+                continue
+            try:
+                if item[0] == "pagina":
+                    self._gravar_pagina(*item[1:])
+                else:
+                    self._gravar_documento(*item)
+            except Exception as e:
+                logging.error(f"Erro ao gravar {item[:2]}: {e}")
+
+    def _gravar_pagina(self, pagina, registros):
+        self.totais["paginas"] += 1
+        self.totais["registros"] += len(registros)
+        if self.saida is None:
+            return
+        if self.manifesto and self.manifesto.pagina_concluida(pagina):
+            logging.info(f"[Página {pagina}] Já gravada numa execução anterior.")
+            return
+        self.saida.escrever_pagina(registros)
+        if self.manifesto:
+            self.manifesto.concluir_pagina(pagina, registros, self.saida.posicao)
+        if self.ao_gravar:
+            self.ao_gravar(pagina, registros)
+
+    def _gravar_documento(self, origem, link, caminho, erro):
+        registro = self._registros.pop(link, None)
+        if erro is None and not os.path.exists(caminho):
+            erro = "Arquivo não gerado"
+        if erro:
+            self.totais["falhas"] += 1
+        else:
+            self.totais["do_acervo" if origem == "acervo" else "capturados"] += 1
+            id_documento = id_documento_do_link(link)
+            if self.acervo and id_documento and origem != "acervo":
+                self.acervo.guardar(id_documento, caminho, registro)
+            if self.pacote:
+                self.pacote.adicionar_arquivo(caminho, id_documento=id_documento, remover=True)
+        if self.manifesto:
+            self.manifesto.marcar_documento(link, caminho, erro)
+            if not erro:
+                # Daqui em diante o manifesto responde se o link já foi capturado
+                self._despachados.discard(link)
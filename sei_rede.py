@@ -0,0 +1,88 @@
+import logging
+
+# --- 1. PERFIS DE REDE ---
+#
+# Cada etapa escolhe o que o navegador baixa. A listagem lê o texto da página de
+# resultados com innerText, que depende do layout (display:none, text-transform),
+# então mantém as folhas de estilo e dispensa imagens, fontes e scripts de
+# terceiros. A captura precisa de tudo quando o PDF tem de sair fiel; um MHTML
+# para renderizar depois, ou um HTML só para extrair o texto, dispensa imagens e fontes.
+#
+# Os bloqueios usam Network.setBlockedURLs, que aceita padrões com '*'.
+
+
+def _extensoes(*extensoes):
+    """Padrões de URL terminadas na extensão, com ou sem query string (estilo.css?v=3)."""
+    return [padrao for extensao in extensoes for padrao in (f"*.{extensao}", f"*.{extensao}?*")]
+
+
+IMAGENS = _extensoes("png", "jpg", "jpeg", "gif", "svg", "ico", "webp", "bmp")
+FONTES = _extensoes("woff", "woff2", "ttf", "otf", "eot")
+MIDIA = _extensoes("mp4", "webm", "mp3", "ogg")
+ESTILOS = _extensoes("css")
+
+# Scripts e rastreadores de terceiros que as páginas do SEI/gov.br carregam
+TERCEIROS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*hotjar.com*",
+    "*barra.sistema.gov.br*",
+    "*vlibras.gov.br*",
+]
+
+PERFIS = {
+    # Só o HTML e os scripts do próprio SEI (a paginação depende deles). Sem CSS,
+    # o innerText pode mudar: confira com benchmark_extracao.py --perfil html
+    "html": IMAGENS + FONTES + MIDIA + ESTILOS + TERCEIROS,
+    # Página com layout, sem imagens, fontes e terceiros
+    "leve": IMAGENS + FONTES + MIDIA + TERCEIROS,
+    # Tudo, para capturas fiéis
+    "completo": [],
+}
+
+# Perfil padrão de cada etapa
+PERFIL_LISTAGEM = "leve"
+PERFIL_CAPTURA = "completo"
+
+
+def padroes_do_perfil(perfil):
+    """Padrões de URL bloqueados pelo perfil (None ou "completo" não bloqueiam nada)."""
+    if perfil is None:
+        return []
+    if perfil not in PERFIS:
+        raise ValueError(f"Perfil de rede desconhecido: {perfil}")
+    return PERFIS[perfil]
+
+
+def aplicar_perfil(driver, perfil):
+    """
+    Aplica o perfil à aba controlada pelo WebDriver, até ser trocado.
+
+    Args:
+        driver: WebDriver do Selenium (Chrome).
+        perfil (str | None): Nome em PERFIS.
+    """
+    padroes = padroes_do_perfil(perfil)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+    logging.info(f"Perfil de rede '{perfil}' aplicado ({len(padroes)} padrões bloqueados).")
+
+
+def restaurar_perfil(driver):
+    """
+    Volta a aba ao perfil "completo" ao fim de uma etapa.
+
+    Feito num finally: uma falha aqui (navegador já fechado, por exemplo) só é
+    registrada, para não esconder o erro que interrompeu a etapa.
+    """
+    try:
+        aplicar_perfil(driver, "completo")
+    except Exception as e:
+        logging.warning(f"Não foi possível restaurar o perfil de rede: {e}")
+
+
+async def aplicar_perfil_async(conexao, sessao, perfil):
+    """Aplica o perfil a uma aba aberta pelo DevTools (sei_cdp)."""
+    await conexao.enviar("Network.enable", sessao=sessao)
+    await conexao.enviar("Network.setBlockedURLs", {"urls": padroes_do_perfil(perfil)}, sessao)
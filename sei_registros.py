@@ -0,0 +1,72 @@
+import re
+import sys
+from dataclasses import dataclass
+
+# Colunas do CSV gerado pelos scripts de automação, na ordem em que são gravadas
+COLUNAS = [
+    "Número do Processo",
+    "Documento",
+    "Resumo",
+    "Unidade",
+    "Usuário",
+    "Data de Inclusão",
+    "Link Completo",
+]
+
+PADRAO_ID_DOCUMENTO = re.compile(r"[?&]id_documento=(\d+)")
+
+
+def id_documento_do_link(link):
+    """Identificador do documento no SEI, lido do parâmetro id_documento do link (ou None)."""
+    encontrado = PADRAO_ID_DOCUMENTO.search(link or "")
+    return encontrado.group(1) if encontrado else None
+
+
+@dataclass(slots=True)
+class Registro:
+    """
+    Um resultado da pesquisa do SEI.
+
+    Os campos seguem a ordem de COLUNAS. Unidade e usuário se repetem muito entre
+    os resultados, então são internados para que todos os registros compartilhem
+    a mesma string.
+    """
+    processo: str = ""
+    documento: str = ""
+    resumo: str = ""
+    unidade: str = ""
+    usuario: str = ""
+    data_inclusao: str = ""
+    link: str | None = None
+
+    def __post_init__(self):
+        self.unidade = sys.intern(self.unidade or "")
+        self.usuario = sys.intern(self.usuario or "")
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Cria o registro a partir de um dicionário com as chaves de COLUNAS."""
+        return cls(*(dados.get(coluna) or "" for coluna in COLUNAS[:-1]), dados.get("Link Completo") or None)
+
+    def como_tupla(self):
+        """Valores na ordem de COLUNAS."""
+        return (self.processo, self.documento, self.resumo, self.unidade,
+                self.usuario, self.data_inclusao, self.link)
+
+    def como_dict(self):
+        """Dicionário com as chaves de COLUNAS."""
+        return dict(zip(COLUNAS, self.como_tupla()))
+
+    @property
+    def id_documento(self):
+        """Identificador do documento no SEI, lido do parâmetro id_documento do link (ou None)."""
+        return id_documento_do_link(self.link)
+
+    def chave(self):
+        """Chave para deduplicar resultados: o id do documento ou, sem ele, processo e documento."""
+        return self.id_documento or (self.processo, self.documento)
+
+    def chave_texto(self):
+        """chave() como texto, para guardar em SQLite."""
+        chave = self.chave()
+        return chave if isinstance(chave, str) else "|".join(chave)
@@ -0,0 +1,128 @@
+import os
+import glob
+import logging
+import argparse
+from pathlib import Path
+
+import sei_captura
+import sei_acervo
+
+# --- 1. RENDERIZAÇÃO DIFERIDA ---
+#
+# Durante a sessão, os scripts podem capturar só o MHTML (ou HTML) de cada
+# documento, que é muito mais rápido que imprimir o PDF. Este job transforma
+# esses arquivos em PDF depois, fora da janela autenticada: o MHTML é
+# autocontido, então o Chrome o abre como arquivo local, sem login.
+
+# Extensões que podem virar PDF
+EXTENSOES_ORIGEM = (".mhtml", ".html")
+
+# Prioridade dos processos do job (nice), para não disputar a máquina com as capturas
+PRIORIDADE_BAIXA = 10
+
+
+def pendentes_na_pasta(pasta):
+    """
+    Arquivos capturados na pasta que ainda não têm o PDF ao lado.
+
+    Returns:
+        list[tuple[str, str]]: (arquivo de origem, PDF de destino).
+    """
+    tarefas = []
+    for extensao in EXTENSOES_ORIGEM:
+        for origem in sorted(glob.glob(os.path.join(pasta, "*" + extensao))):
+            destino = os.path.splitext(origem)[0] + ".pdf"
+            if not os.path.exists(destino):
+                tarefas.append((origem, destino))
+    return tarefas
+
+
+def renderizar(tarefas, trabalhadores=2):
+    """
+    Renderiza arquivos locais em PDF num pool de Chrome headless.
+
+    Args:
+        tarefas (list[tuple[str, str]]): (arquivo de origem, PDF de destino).
+        trabalhadores (int): Navegadores (processos) simultâneos.
+
+    Returns:
+        list[tuple[str, str, str | None]]: (arquivo de origem, PDF, erro) de cada tarefa.
+    """
+    if not tarefas:
+        return []
+    uris = {}
+    with sei_captura.PoolCaptura(None, trabalhadores) as pool:
+        for origem, destino in tarefas:
+            uri = Path(origem).resolve().as_uri()
+            uris[uri] = origem
+            pool.enviar(uri, destino)
+        resultados = pool.fechar()
+    return [(uris[uri], destino, erro) for uri, destino, erro in resultados]
+
+
+def renderizar_pasta(pasta, trabalhadores=2):
+    """Gera o PDF de cada MHTML/HTML da pasta que ainda não tem um."""
+    tarefas = pendentes_na_pasta(pasta)
+    logging.info(f"{len(tarefas)} arquivos para renderizar em '{pasta}'.")
+    return renderizar(tarefas, trabalhadores)
+
+
+def renderizar_acervo(diretorio=sei_acervo.PASTA_ACERVO, trabalhadores=2):
+    """
+    Gera o PDF dos documentos do acervo guardados só como MHTML e os guarda de volta.
+
+    Os PDFs são renderizados numa pasta temporária do acervo e, depois de
+    guardados (endereçados pelo hash), removidos dela.
+    """
+    with sei_acervo.Acervo(diretorio) as acervo:
+        pendentes = acervo.sem_formato(".mhtml", ".pdf")
+        logging.info(f"{len(pendentes)} documentos do acervo sem PDF.")
+        pasta_temporaria = os.path.join(diretorio, "renderizando")
+        os.makedirs(pasta_temporaria, exist_ok=True)
+
+        ids = {}
+        tarefas = []
+        for id_documento, origem in pendentes:
+            destino = os.path.join(pasta_temporaria, f"{id_documento}.pdf")
+            ids[destino] = id_documento
+            tarefas.append((origem, destino))
+
+        resultados = renderizar(tarefas, trabalhadores)
+        for _, destino, erro in resultados:
+            if erro or not os.path.exists(destino):
+                continue
+            acervo.guardar(ids[destino], destino)
+            os.remove(destino)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renderiza em PDF, fora da sessão, os documentos capturados como MHTML/HTML.")
+    parser.add_argument("--pasta", action="append", default=[],
+                        help="Pasta com arquivos .mhtml/.html; o PDF é gravado ao lado de cada um. Pode repetir.")
+    parser.add_argument("--acervo", nargs="?", const=sei_acervo.PASTA_ACERVO, default=None,
+                        help=f"Renderiza os documentos do acervo guardados só como MHTML (padrão: {sei_acervo.PASTA_ACERVO}).")
+    parser.add_argument("--workers", type=int, default=2, help="Navegadores headless simultâneos (padrão: 2).")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not args.pasta and args.acervo is None:
+        args.acervo = sei_acervo.PASTA_ACERVO
+
+    # Os navegadores herdam a prioridade baixa deste processo
+    if hasattr(os, "nice"):
+        os.nice(PRIORIDADE_BAIXA)
+
+    resultados = []
+    for pasta in args.pasta:
+        resultados += renderizar_pasta(pasta, args.workers)
+    if args.acervo is not None:
+        resultados += renderizar_acervo(args.acervo, args.workers)
+
+    falhas = sum(1 for _, _, erro in resultados if erro)
+    logging.info(f"Renderização concluída: {len(resultados) - falhas} PDFs gerados, {falhas} falhas.")
+
+
+if __name__ == "__main__":
+    main()
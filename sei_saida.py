@@ -0,0 +1,390 @@
+import os
+import csv
+import json
+import glob
+import inspect
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+import pandas as pd
+
+from sei_registros import COLUNAS, Registro
+
+# --- 1. SAÍDAS INCREMENTAIS ---
+
+class Saida(ABC):
+    """
+    Destino dos registros extraídos, gravado página a página.
+
+    Cada chamada a escrever_pagina grava as linhas no arquivo e força a escrita em
+    disco (fsync), então uma falha no meio da navegação preserva tudo o que já foi
+    extraído. Apenas a página atual fica em memória.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.total = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    @staticmethod
+    def _linhas(registros):
+        """Converte Registros, dicionários ou um DataFrame em tuplas na ordem de COLUNAS."""
+        if isinstance(registros, pd.DataFrame):
+            yield from registros.reindex(columns=COLUNAS).itertuples(index=False, name=None)
+            return
+        for registro in registros:
+            if isinstance(registro, dict):
+                registro = Registro.de_dict(registro)
+            yield registro.como_tupla()
+
+    def escrever_pagina(self, registros):
+        """
+        Grava os registros de uma página e sincroniza o arquivo com o disco.
+
+        Args:
+            registros: Registros da página (Registro, dict ou um DataFrame com as colunas de COLUNAS).
+
+        Returns:
+            int: Quantidade de linhas gravadas.
+        """
+        linhas = list(self._linhas(registros))
+        if linhas:
+            self._gravar(linhas)
+            self._sincronizar()
+        self.total += len(linhas)
+        return len(linhas)
+
+    @property
+    def posicao(self):
+        """Tamanho, em bytes, do que já foi gravado (ponto de retomada da saída)."""
+        return None
+
+    @abstractmethod
+    def _gravar(self, linhas):
+        """Grava as linhas (tuplas na ordem de COLUNAS) de uma página."""
+
+    @abstractmethod
+    def _sincronizar(self):
+        """Força a escrita em disco do que já foi gravado."""
+
+    @abstractmethod
+    def fechar(self):
+        """Conclui e fecha a saída."""
+
+
+class _SaidaTexto(Saida):
+    """
+    Base das saídas em arquivo texto, mantido aberto durante toda a navegação.
+
+    Com `anexar`, continua um arquivo existente; se `posicao` for informada, o
+    arquivo é antes truncado nesse ponto, descartando uma página gravada pela
+    metade numa execução interrompida.
+    """
+
+    def __init__(self, caminho, encoding='utf-8', anexar=False, posicao=None):
+        super().__init__(caminho)
+        anexar = anexar and os.path.exists(caminho)
+        if anexar and posicao is not None:
+            os.truncate(caminho, posicao)
+        self._novo = not anexar or os.path.getsize(caminho) == 0
+        self._arquivo = open(caminho, 'a' if anexar else 'w', encoding=encoding, newline='')
+
+    @property
+    def posicao(self):
+        self._arquivo.flush()
+        return self._arquivo.buffer.tell()
+
+    def _sincronizar(self):
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def fechar(self):
+        if not self._arquivo.closed:
+            self._sincronizar()
+            self._arquivo.close()
+            logging.info(f"{self.total} registros salvos em: {self.caminho}")
+
+
+class SaidaCSV(_SaidaTexto):
+    """
+    CSV separado por ';', idêntico ao gerado por DataFrame.to_csv(sep=';', index=False).
+    """
+
+    def __init__(self, caminho, sep=';', encoding='utf-8', anexar=False, posicao=None):
+        super().__init__(caminho, encoding, anexar, posicao)
+        self._writer = csv.writer(self._arquivo, delimiter=sep, lineterminator=os.linesep)
+        if self._novo:
+            self._writer.writerow(COLUNAS)
+            self._sincronizar()
+
+    def _gravar(self, linhas):
+        self._writer.writerows(linhas)
+
+
+class SaidaJSONL(_SaidaTexto):
+    """Um objeto JSON por linha, com as chaves de COLUNAS."""
+
+    def _gravar(self, linhas):
+        for linha in linhas:
+            self._arquivo.write(json.dumps(dict(zip(COLUNAS, linha)), ensure_ascii=False) + "\n")
+
+
+class SaidaParquet(Saida):
+    """
+    Arquivo Parquet com um row group por página.
+
+    O rodapé do Parquet só é gravado em fechar(); até lá os row groups já estão
+    em disco, mas o arquivo só pode ser lido depois de fechado.
+    """
+
+    def __init__(self, caminho, anexar=False, posicao=None):
+        if anexar and os.path.exists(caminho):
+            raise ValueError("Um arquivo Parquet não pode ser continuado; use CSV ou JSONL para retomar a execução.")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(caminho)
+        self._pa = pa
+        self._schema = pa.schema([(coluna, pa.string()) for coluna in COLUNAS])
+        self._arquivo = open(caminho, 'wb')
+        self._writer = pq.ParquetWriter(self._arquivo, self._schema)
+
+    def _gravar(self, linhas):
+        colunas = list(zip(*linhas))
+        tabela = self._pa.Table.from_arrays(
+            [self._pa.array(valores, type=self._pa.string()) for valores in colunas],
+            schema=self._schema,
+        )
+        self._writer.write_table(tabela)
+
+    def _sincronizar(self):
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def fechar(self):
+        if not self._arquivo.closed:
+            self._writer.close()
+            self._sincronizar()
+            self._arquivo.close()
+            logging.info(f"{self.total} registros salvos em: {self.caminho}")
+
+
+class SaidaDataset(Saida):
+    """
+    Dataset Parquet particionado pelo mês da Data de Inclusão (estilo Hive).
+
+    Cada mês tem um único arquivo, `mes_inclusao=AAAA-MM/<nome>.parquet`. As
+    colunas são tipadas: a Data de Inclusão vira date32 e Unidade e Usuário são
+    codificadas em dicionário, então ler um ano de resultados não exige
+    reinterpretar datas nem repetir as mesmas strings:
+
+        pyarrow.dataset.dataset(pasta, partitioning="hive")
+        pandas.read_parquet(pasta, filters=[("mes_inclusao", ">=", "2024-01")])
+
+    Enquanto a execução grava, os arquivos têm um ponto na frente do nome e são
+    ignorados pelos leitores. Em fechar(), cada mês gravado é consolidado: os
+    registros da execução se juntam aos que o mês já tinha, sem repetir a mesma
+    chave (Registro.chave_texto; vale a versão mais recente), e o resultado
+    substitui os arquivos anteriores do mês. Os scripts percorrem sempre todo o
+    histórico, então é isso que impede o dataset de acumular duplicatas.
+
+    Registros sem data válida ficam na raiz do dataset, em `sem_data_<nome>.parquet`,
+    onde a partição vale nulo: um filtro por mês não os inclui.
+    """
+
+    COLUNA_PARTICAO = "mes_inclusao"
+    SEM_DATA = "sem_data"
+    COLUNAS_DICIONARIO = ("Unidade", "Usuário")
+    COLUNA_DATA = "Data de Inclusão"
+    FORMATO_DATA = "%d/%m/%Y"
+
+    def __init__(self, pasta, nome=None, anexar=False, posicao=None):
+        """
+        Args:
+            pasta (str): Diretório raiz do dataset, compartilhado entre execuções.
+            nome (str, opcional): Nome dos arquivos desta execução; padrão, a data e hora atuais.
+        """
+        if anexar:
+            raise ValueError("O dataset Parquet não pode ser continuado; gere-o de novo a partir do CSV (dataset_do_csv).")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(pasta)
+        self._pa = pa
+        self._pq = pq
+        self.nome = nome or datetime.now().strftime('%Y-%m-%d_%H%M%S')
+        self._schema = pa.schema([
+            (coluna,
+             pa.date32() if coluna == self.COLUNA_DATA
+             else pa.dictionary(pa.int32(), pa.string()) if coluna in self.COLUNAS_DICIONARIO
+             else pa.string())
+            for coluna in COLUNAS
+        ])
+        # Um escritor por mês (None: sem data): arquivo temporário, final e os que ele substitui
+        self._escritores = {}
+        os.makedirs(pasta, exist_ok=True)
+        self._migrar_sem_data()
+
+    def _migrar_sem_data(self):
+        """Leva para a raiz os arquivos da antiga partição `mes_inclusao=sem_data`."""
+        antiga = os.path.join(self.caminho, f"{self.COLUNA_PARTICAO}={self.SEM_DATA}")
+        if not os.path.isdir(antiga):
+            return
+        for arquivo in glob.glob(os.path.join(antiga, "*.parquet")):
+            os.replace(arquivo, os.path.join(self.caminho, f"{self.SEM_DATA}_{os.path.basename(arquivo)}"))
+        if not os.listdir(antiga):
+            os.rmdir(antiga)
+
+    def _destino(self, mes):
+        """Pasta do mês, nome do arquivo final e padrão dos arquivos que ele substitui."""
+        if mes is None:
+            return self.caminho, f"{self.SEM_DATA}_{self.nome}.parquet", f"{self.SEM_DATA}_*.parquet"
+        return os.path.join(self.caminho, f"{self.COLUNA_PARTICAO}={mes}"), f"{self.nome}.parquet", "*.parquet"
+
+    def _mes(self, data):
+        return data.strftime('%Y-%m') if data else None
+
+    def _data(self, texto):
+        try:
+            return datetime.strptime((texto or "").strip(), self.FORMATO_DATA).date()
+        except ValueError:
+            return None
+
+    def _escritor(self, mes):
+        if mes not in self._escritores:
+            particao, nome_final, padrao = self._destino(mes)
+            os.makedirs(particao, exist_ok=True)
+            final = os.path.join(particao, nome_final)
+            temporario = os.path.join(particao, "." + nome_final)
+            arquivo = open(temporario, 'wb')
+            self._escritores[mes] = (self._pq.ParquetWriter(arquivo, self._schema), arquivo, temporario, final,
+                                     os.path.join(particao, padrao))
+        return self._escritores[mes][0]
+
+    def _tabela(self, linhas):
+        pa = self._pa
+        colunas = [list(valores) for valores in zip(*linhas)]
+        arrays = []
+        for coluna, valores in zip(COLUNAS, colunas):
+            if coluna == self.COLUNA_DATA:
+                arrays.append(pa.array([self._data(v) for v in valores], type=pa.date32()))
+            elif coluna in self.COLUNAS_DICIONARIO:
+                arrays.append(pa.array(valores, type=pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(valores, type=pa.string()))
+        return pa.Table.from_arrays(arrays, schema=self._schema)
+
+    def _gravar(self, linhas):
+        por_mes = {}
+        indice_data = COLUNAS.index(self.COLUNA_DATA)
+        for linha in linhas:
+            por_mes.setdefault(self._mes(self._data(linha[indice_data])), []).append(linha)
+        for mes, linhas_mes in por_mes.items():
+            self._escritor(mes).write_table(self._tabela(linhas_mes))
+
+    def _sincronizar(self):
+        for _, arquivo, *_ in self._escritores.values():
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+    def _consolidar(self, temporario, final, padrao):
+        """
+        Junta o arquivo da execução aos anteriores do mesmo mês, sem chaves repetidas.
+
+        Os registros da execução vêm primeiro, então a versão mais recente de cada
+        registro é a que fica. O mês inteiro passa pela memória uma vez.
+        """
+        anteriores = sorted(glob.glob(padrao))
+        tabelas = [self._pq.ParquetFile(caminho).read().cast(self._schema)
+                   for caminho in [temporario] + anteriores]
+        tabela = self._pa.concat_tables(tabelas)
+
+        vistas = set()
+        manter = []
+        colunas = [tabela.column(coluna).to_pylist() for coluna in ("Número do Processo", "Documento", "Link Completo")]
+        for processo, documento, link in zip(*colunas):
+            chave = Registro(processo=processo or "", documento=documento or "", link=link).chave_texto()
+            manter.append(chave not in vistas)
+            vistas.add(chave)
+        if not anteriores and all(manter):
+            os.replace(temporario, final)
+            return
+
+        consolidado = temporario + ".consolidado"
+        self._pq.write_table(tabela.filter(self._pa.array(manter)), consolidado)
+        os.replace(consolidado, final)
+        for caminho in [temporario] + anteriores:
+            if caminho != final and os.path.exists(caminho):
+                os.remove(caminho)
+
+    def fechar(self):
+        escritores, self._escritores = self._escritores, {}
+        for escritor, arquivo, temporario, final, padrao in escritores.values():
+            escritor.close()
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+            arquivo.close()
+            self._consolidar(temporario, final, padrao)
+        if escritores:
+            logging.info(f"{self.total} registros salvos no dataset {self.caminho} ({len(escritores)} meses).")
+
+
+def dataset_do_csv(caminho_csv, pasta, nome=None, sep=';', encoding='utf-8-sig', tamanho_lote=10_000):
+    """
+    Grava um CSV de registros no dataset Parquet particionado, em lotes.
+
+    Os scripts chamam ao fim de cada execução: como o CSV é o registro retomável
+    da execução, o dataset fica completo mesmo depois de um --resume. Registros
+    que o dataset já tinha são substituídos, não repetidos (veja SaidaDataset).
+
+    Args:
+        caminho_csv (str): CSV gerado por navegar_paginas.
+        pasta (str): Diretório raiz do dataset.
+        nome (str, opcional): Nome dos arquivos da execução; padrão, o nome do CSV.
+
+    Returns:
+        int: Quantidade de registros gravados.
+    """
+    nome = nome or os.path.splitext(os.path.basename(caminho_csv))[0]
+    lotes = pd.read_csv(caminho_csv, sep=sep, encoding=encoding, dtype=str,
+                        keep_default_na=False, chunksize=tamanho_lote)
+    with SaidaDataset(pasta, nome) as saida:
+        for df in lotes:
+            saida.escrever_pagina(df)
+    return saida.total
+
+
+def abrir_saida(caminho, **kwargs):
+    """
+    Abre a saída adequada à extensão do arquivo (.csv, .jsonl ou .parquet).
+
+    Um caminho sem extensão é tratado como diretório de um dataset Parquet
+    particionado (SaidaDataset).
+
+    Args:
+        caminho (str): Arquivo de destino.
+        **kwargs: Repassados à saída (por exemplo, encoding='utf-8-sig' no CSV, ou
+            anexar=True e posicao para continuar uma execução interrompida). Os que
+            não se aplicam ao formato (encoding no Parquet) são ignorados.
+
+    Returns:
+        Saida: Saída aberta, pronta para escrever_pagina.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.csv':
+        classe = SaidaCSV
+    elif extensao in ('.jsonl', '.ndjson'):
+        classe = SaidaJSONL
+    elif extensao == '.parquet':
+        classe = SaidaParquet
+    elif extensao == '':
+        classe = SaidaDataset
+    else:
+        raise ValueError(f"Formato de saída não suportado: {caminho}")
+    aceitos = inspect.signature(classe).parameters
+    return classe(caminho, **{nome: valor for nome, valor in kwargs.items() if nome in aceitos})
@@ -0,0 +1,386 @@
+import os
+import sys
+import hmac
+import json
+import time
+import queue
+import getpass
+import logging
+import argparse
+import importlib
+import threading
+import itertools
+import secrets
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+
+import sei_espera
+import sei_sessao
+import sei_navegador
+
+# --- 1. CONFIGURAÇÃO ---
+#
+# Serviço local que mantém navegadores já autenticados e executa, sob demanda,
+# as buscas e capturas de um dos scripts (auto_sei ou auto_sei1). Cada tarefa
+# chega por HTTP e recebe de volta, na mesma conexão, uma linha JSON por evento
+# (início, logs da execução e fim), então tarefas seguidas não pagam de novo a
+# abertura do Chrome nem o login.
+
+# Endereço do serviço (só a própria máquina)
+ENDERECO_PADRAO = "127.0.0.1"
+PORTA_PADRAO = 8765
+
+# Qualquer página aberta no navegador do usuário consegue mandar um POST para
+# 127.0.0.1, então cada pedido leva um token sorteado quando o serviço inicia. O
+# token fica num arquivo legível só pelo usuário (0600), onde `enviar` o encontra;
+# como vai num cabeçalho próprio, um navegador só o enviaria depois de um preflight
+# CORS, que o serviço não atende.
+PASTA_TOKENS = os.path.join(os.path.expanduser("~"), ".cache", "sei_aspar")
+CABECALHO_TOKEN = "X-SEI-Token"
+
+# Intervalo, em segundos, em que os navegadores ociosos recarregam a página
+# inicial, para a sessão do SEI não expirar por inatividade
+INTERVALO_RENOVACAO = 10 * 60
+
+# Tipos de tarefa aceitos
+TAREFA_BUSCA = "busca"
+TAREFA_CAPTURA = "captura"
+
+# --- 2. NAVEGADORES AUTENTICADOS ---
+
+class NavegadorAutenticado:
+    """Um Chrome logado no SEI, com a página pós-login para voltar entre tarefas."""
+
+    def __init__(self, numero, script, credenciais):
+        self.numero = numero
+        self.script = script
+        self.credenciais = credenciais
+        self.driver = None
+        self.pagina_inicial = None
+        self.reautenticador = None
+        self.usado_em = 0
+
+    def iniciar(self):
+        """Abre o navegador (de novo, se já existia) e faz o login."""
+        self.fechar()
+        self.driver = sei_navegador.criar_driver()
+        self.driver.implicitly_wait(5)
+        if not sei_sessao.entrar(self.driver, self.script.URL_SEI, *self.credenciais, self.script.realizar_login):
+            raise RuntimeError("Falha no login do SEI.")
+        self.pagina_inicial = self.driver.current_url
+        # Sessão expirada no meio de uma tarefa longa: refaz o login sem interrompê-la
+        self.reautenticador = sei_sessao.Reautenticador(self.driver, self.script.URL_SEI, *self.credenciais,
+                                                        self.script.realizar_login)
+        self.usado_em = time.monotonic()
+        logging.info(f"Navegador {self.numero} autenticado e pronto.")
+
+    def preparar(self):
+        """
+        Volta à página inicial antes de uma tarefa, refazendo o login se a sessão
+        expirou ou abrindo outro navegador se este caiu.
+        """
+        try:
+            self.driver.get(self.pagina_inicial)
+            if sei_espera.login_concluido(self.driver, espera=5):
+                self.usado_em = time.monotonic()
+                return
+            logging.info(f"Sessão do navegador {self.numero} expirou.")
+        except Exception as e:
+            logging.warning(f"Navegador {self.numero} indisponível ({e}). Abrindo outro.")
+        self.iniciar()
+
+    def fechar(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+
+class Servico:
+    """
+    Navegadores autenticados e a fila de tarefas que os usa, um por vez cada.
+
+    As tarefas esperam por um navegador livre; os ociosos são renovados a cada
+    INTERVALO_RENOVACAO.
+    """
+
+    def __init__(self, script, credenciais, navegadores=1):
+        self.script = script
+        self.livres = queue.Queue()
+        self.navegadores = [NavegadorAutenticado(i + 1, script, credenciais) for i in range(navegadores)]
+        self._contador = itertools.count(1)
+        self._parar = threading.Event()
+        script.criar_pastas()
+        for navegador in self.navegadores:
+            navegador.iniciar()
+            self.livres.put(navegador)
+        threading.Thread(target=self._renovar, name="renovacao", daemon=True).start()
+
+    def _renovar(self):
+        while not self._parar.wait(60):
+            for _ in range(self.livres.qsize()):
+                try:
+                    navegador = self.livres.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    if time.monotonic() - navegador.usado_em >= INTERVALO_RENOVACAO:
+                        navegador.preparar()
+                except Exception as e:
+                    logging.error(f"Falha ao renovar o navegador {navegador.numero}: {e}")
+                finally:
+                    self.livres.put(navegador)
+
+    def estado(self):
+        return {
+            "script": self.script.__name__,
+            "navegadores": len(self.navegadores),
+            "livres": self.livres.qsize(),
+        }
+
+    def executar(self, pedido, eventos):
+        """
+        Executa uma tarefa, publicando os eventos em `eventos` (queue.Queue de dicts).
+
+        Args:
+            pedido (dict): {"tipo": "busca" | "captura", "busca": {...}, "opcoes": {...}, "lista": "..."}.
+                "busca" vai para executar_busca do script (por exemplo, data_inicio) e
+                "opcoes", para navegar_paginas ou materializar_documentos (capturar,
+                formato, trabalhadores, abas, compressao).
+        """
+        tarefa = next(self._contador)
+        tipo = pedido.get("tipo", TAREFA_BUSCA)
+        opcoes = pedido.get("opcoes", {})
+        eventos.put({"evento": "fila", "tarefa": tarefa, "livres": self.livres.qsize()})
+
+        navegador = self.livres.get()
+        try:
+            navegador.preparar()
+            eventos.put({"evento": "inicio", "tarefa": tarefa, "tipo": tipo, "navegador": navegador.numero})
+            driver = navegador.driver
+            reautenticador = navegador.reautenticador
+            if tipo == TAREFA_CAPTURA:
+                caminho_csv = pedido["lista"]
+                reautenticador.refazer_busca = None
+                self.script.materializar_documentos(driver, caminho_csv, reautenticador=reautenticador, **opcoes)
+            elif tipo == TAREFA_BUSCA:
+                busca = pedido.get("busca", {})
+                if not self.script.executar_busca(driver, **busca):
+                    raise RuntimeError("Falha na busca.")
+                reautenticador.refazer_busca = lambda d: self.script.executar_busca(d, **busca)
+                agora = datetime.now().strftime('%Y-%m-%d_%H%M%S')
+                caminho_csv = os.path.join(self.script.PASTA_LISTAS_ARQUIVOS, f'documentos_extraidos_{agora}.csv')
+                self.script.navegar_paginas(driver, caminho_csv, reautenticador=reautenticador, **opcoes)
+            else:
+                raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+            eventos.put({"evento": "fim", "tarefa": tarefa, "ok": True, "csv": caminho_csv})
+        except Exception as e:
+            logging.error(f"Tarefa {tarefa} falhou: {e}")
+            eventos.put({"evento": "fim", "tarefa": tarefa, "ok": False, "erro": str(e)})
+        finally:
+            navegador.usado_em = time.monotonic()
+            self.livres.put(navegador)
+
+    def fechar(self):
+        self._parar.set()
+        for navegador in self.navegadores:
+            navegador.fechar()
+
+# --- 3. API HTTP ---
+
+class _EventosDaTarefa(logging.Handler):
+    """Repassa à tarefa os logs da sua thread e das etapas que ela cria (sei_pipeline)."""
+
+    def __init__(self, nome_thread, eventos):
+        super().__init__(logging.INFO)
+        self.prefixo = nome_thread
+        self.eventos = eventos
+
+    def emit(self, registro):
+        if registro.threadName == self.prefixo or registro.threadName.startswith(self.prefixo + "/"):
+            self.eventos.put({"evento": "log", "nivel": registro.levelname, "mensagem": registro.getMessage()})
+
+
+def caminho_token(porta=PORTA_PADRAO):
+    """Arquivo do token do serviço que atende na porta."""
+    return os.path.join(PASTA_TOKENS, f"servico_{porta}.token")
+
+
+def criar_token(porta=PORTA_PADRAO):
+    """Sorteia o token do serviço e o grava, com permissão 0600, em caminho_token(porta)."""
+    token = secrets.token_urlsafe(32)
+    caminho = caminho_token(porta)
+    os.makedirs(PASTA_TOKENS, exist_ok=True)
+    if os.path.exists(caminho):
+        # Recriado em vez de reescrito: o modo de O_CREAT só vale para arquivos novos
+        os.remove(caminho)
+    with os.fdopen(os.open(caminho, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as f:
+        f.write(token)
+    return token
+
+
+def ler_token(porta=PORTA_PADRAO):
+    """Token do serviço em execução na porta."""
+    with open(caminho_token(porta), encoding="utf-8") as f:
+        return f.read().strip()
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    servico = None
+    token = None
+
+    def _json(self, status, dados):
+        corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _autorizado(self):
+        """Confere o token do pedido; se não confere, já responde 401."""
+        if self.token and hmac.compare_digest(self.headers.get(CABECALHO_TOKEN, ""), self.token):
+            return True
+        self._json(401, {"erro": f"Token ausente ou inválido (cabeçalho {CABECALHO_TOKEN})."})
+        return False
+
+    def do_GET(self):
+        if not self._autorizado():
+            return
+        if self.path == "/estado":
+            self._json(200, self.servico.estado())
+        else:
+            self._json(404, {"erro": "Caminho desconhecido."})
+
+    def do_POST(self):
+        if not self._autorizado():
+            return
+        if self.path != "/tarefas":
+            self._json(404, {"erro": "Caminho desconhecido."})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._json(415, {"erro": "Envie a tarefa como application/json."})
+            return
+        try:
+            pedido = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self._json(400, {"erro": "JSON inválido."})
+            return
+
+        # Resposta sem tamanho definido: uma linha JSON por evento, até o fim da tarefa
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.end_headers()
+
+        eventos = queue.Queue()
+        nome = f"tarefa-{id(eventos)}"
+        handler = _EventosDaTarefa(nome, eventos)
+        logging.getLogger().addHandler(handler)
+        execucao = threading.Thread(target=self._executar, args=(pedido, eventos), name=nome)
+        execucao.start()
+        try:
+            while True:
+                evento = eventos.get()
+                if evento is None:
+                    break
+                try:
+                    self.wfile.write((json.dumps(evento, ensure_ascii=False) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                except OSError:
+                    # O cliente desconectou; a tarefa continua até o fim
+                    pass
+        finally:
+            logging.getLogger().removeHandler(handler)
+
+    def _executar(self, pedido, eventos):
+        try:
+            self.servico.executar(pedido, eventos)
+        finally:
+            eventos.put(None)
+
+    def log_message(self, formato, *args):
+        logging.debug(formato % args)
+
+
+def servir(servico, endereco=ENDERECO_PADRAO, porta=PORTA_PADRAO):
+    """Atende a API até Ctrl+C. Os pedidos precisam do token gravado em caminho_token(porta)."""
+    _Manipulador.servico = servico
+    servidor = ThreadingHTTPServer((endereco, porta), _Manipulador)
+    _Manipulador.token = criar_token(porta)
+    logging.info(f"Serviço pronto em http://{endereco}:{porta} ({servico.estado()}). "
+                 f"Token em {caminho_token(porta)}.")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Encerrando o serviço.")
+    finally:
+        servidor.server_close()
+        if os.path.exists(caminho_token(porta)):
+            os.remove(caminho_token(porta))
+        servico.fechar()
+
+
+def enviar_tarefa(pedido, endereco=ENDERECO_PADRAO, porta=PORTA_PADRAO):
+    """
+    Envia uma tarefa ao serviço e devolve os eventos à medida que chegam.
+
+    O token é lido do arquivo gravado pelo serviço (veja caminho_token).
+
+    Yields:
+        dict: Eventos da tarefa (fila, inicio, log, fim).
+    """
+    requisicao = Request(
+        f"http://{endereco}:{porta}/tarefas",
+        data=json.dumps(pedido).encode("utf-8"),
+        headers={"Content-Type": "application/json", CABECALHO_TOKEN: ler_token(porta)},
+    )
+    with urlopen(requisicao) as resposta:
+        for linha in resposta:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local com navegadores do SEI já autenticados.")
+    parser.add_argument("--endereco", default=ENDERECO_PADRAO, help=f"Endereço (padrão: {ENDERECO_PADRAO}).")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help=f"Porta (padrão: {PORTA_PADRAO}).")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    iniciar = comandos.add_parser("iniciar", help="Abre os navegadores, faz login e atende as tarefas.")
+    iniciar.add_argument("--script", choices=["auto_sei", "auto_sei1"], default="auto_sei",
+                         help="Script cuja busca e captura o serviço executa (padrão: auto_sei).")
+    iniciar.add_argument("--navegadores", type=int, default=1, help="Navegadores autenticados mantidos abertos (padrão: 1).")
+
+    enviar = comandos.add_parser("enviar", help="Envia uma tarefa e mostra o progresso.")
+    enviar.add_argument("tipo", choices=[TAREFA_BUSCA, TAREFA_CAPTURA])
+    enviar.add_argument("--lista", help="CSV cujos documentos serão capturados (tarefa captura).")
+    enviar.add_argument("--busca", default="{}", help='Parâmetros da busca em JSON, ex.: \'{"data_inicio": "01/01/2025"}\'.')
+    enviar.add_argument("--opcoes", default="{}", help='Opções da execução em JSON, ex.: \'{"capturar": false}\'.')
+    args = parser.parse_args()
+
+    if args.comando == "enviar":
+        pedido = {"tipo": args.tipo, "busca": json.loads(args.busca), "opcoes": json.loads(args.opcoes)}
+        if args.lista:
+            pedido["lista"] = args.lista
+        ok = False
+        for evento in enviar_tarefa(pedido, args.endereco, args.porta):
+            if evento["evento"] == "log":
+                print(f"[{evento['nivel']}] {evento['mensagem']}")
+            else:
+                print(json.dumps(evento, ensure_ascii=False))
+            ok = evento.get("ok", ok)
+        sys.exit(0 if ok else 1)
+
+    script = importlib.import_module(args.script)
+    script.configurar_logging()
+    usuario = input("Digite seu usuário do SEI: ")
+    senha = getpass.getpass("Digite sua senha do SEI: ")
+    orgao = input("Digite a sigla do Órgão (ex: MGI): ")
+    servir(Servico(script, (usuario, senha, orgao), args.navegadores), args.endereco, args.porta)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+import threading
+import requests
+
+import sei_espera
+import sei_http
+import sei_extracao
+from sei_captura import cookie_cdp
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+# --- 1. CACHE DA SESSÃO AUTENTICADA ---
+#
+# Depois de um login bem-sucedido, os cookies da sessão são guardados cifrados
+# (Fernet, com chave derivada da senha do usuário) e, na execução seguinte,
+# reaproveitados se o SEI ainda os aceitar. Sem o pacote cryptography, o cache
+# fica desligado: os cookies nunca são gravados em claro.
+
+# Pasta dos arquivos de sessão, um por URL, usuário e órgão
+PASTA_SESSOES = os.path.join(os.path.expanduser("~"), ".cache", "sei_aspar", "sessoes")
+
+# Sessões mais antigas que isso nem são testadas
+VALIDADE_SESSAO = 8 * 3600
+
+# Tempo máximo da requisição que testa a sessão
+ESPERA_VALIDACAO = 10
+
+# Tamanho do sal da derivação da chave, gravado no início do arquivo
+TAMANHO_SAL = 16
+
+# Novos logins por documento antes de registrá-lo como falha
+TENTATIVAS_RELOGIN = 2
+
+
+def caminho_sessao(url, usuario, orgao):
+    """Arquivo da sessão de um usuário num SEI (o nome não revela o usuário)."""
+    identificador = hashlib.sha256(f"{url}|{usuario}|{orgao}".encode("utf-8")).hexdigest()[:24]
+    return os.path.join(PASTA_SESSOES, identificador + ".sessao")
+
+
+def _fernet(senha, sal):
+    chave = hashlib.scrypt(senha.encode("utf-8"), salt=sal, n=2 ** 14, r=8, p=1, dklen=32)
+    return Fernet(base64.urlsafe_b64encode(chave))
+
+
+def guardar_sessao(driver, url, usuario, senha, orgao):
+    """
+    Guarda, cifrados, os cookies e a página atual do navegador recém-autenticado.
+
+    Returns:
+        bool: True se a sessão foi guardada.
+    """
+    if Fernet is None:
+        logging.info("Pacote cryptography ausente: a sessão não será guardada para a próxima execução.")
+        return False
+    dados = {
+        "cookies": driver.get_cookies(),
+        "pagina": driver.current_url,
+        "user_agent": driver.execute_script("return navigator.userAgent;"),
+        "salva_em": time.time(),
+    }
+    sal = os.urandom(TAMANHO_SAL)
+    conteudo = sal + _fernet(senha, sal).encrypt(json.dumps(dados).encode("utf-8"))
+
+    caminho = caminho_sessao(url, usuario, orgao)
+    os.makedirs(PASTA_SESSOES, exist_ok=True)
+    temporario = caminho + ".parcial"
+    # Só o dono do arquivo pode lê-lo
+    with os.fdopen(os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+    logging.info("Sessão guardada para as próximas execuções.")
+    return True
+
+
+def descartar_sessao(url, usuario, orgao):
+    caminho = caminho_sessao(url, usuario, orgao)
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+
+def carregar_sessao(url, usuario, senha, orgao):
+    """
+    Lê a sessão guardada, se existir, puder ser decifrada com a senha e estiver no prazo.
+
+    Returns:
+        dict | None: Cookies, página pós-login e User-Agent da sessão.
+    """
+    caminho = caminho_sessao(url, usuario, orgao)
+    if Fernet is None or not os.path.exists(caminho):
+        return None
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    try:
+        dados = json.loads(_fernet(senha, conteudo[:TAMANHO_SAL]).decrypt(conteudo[TAMANHO_SAL:]))
+    except (InvalidToken, ValueError):
+        logging.info("A sessão guardada não pôde ser lida (senha diferente?). Descartando.")
+        descartar_sessao(url, usuario, orgao)
+        return None
+    if time.time() - dados.get("salva_em", 0) > VALIDADE_SESSAO:
+        descartar_sessao(url, usuario, orgao)
+        return None
+    return dados
+
+
+def sessao_valida(dados):
+    """
+    Testa a sessão com uma única requisição à página pós-login, sem o navegador.
+
+    Returns:
+        bool: True se o SEI respondeu a página sem pedir login.
+    """
+    sessao = requests.Session()
+    sessao.headers["User-Agent"] = dados.get("user_agent") or ""
+    for cookie in dados["cookies"]:
+        sessao.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    try:
+        resposta = sessao.get(dados["pagina"], timeout=ESPERA_VALIDACAO)
+    except requests.RequestException as e:
+        logging.info(f"Não foi possível testar a sessão guardada: {e}")
+        return False
+    return resposta.ok and not sei_espera.html_de_login(resposta.text)
+
+
+def restaurar_sessao(driver, url, usuario, senha, orgao):
+    """
+    Reaproveita a sessão guardada: injeta os cookies no navegador e abre a página pós-login.
+
+    Os cookies entram pelo DevTools (Network.setCookies), que não exige estar
+    no domínio do SEI, então o navegador vai direto para a página pós-login.
+
+    Returns:
+        bool: True se o navegador está autenticado; False se é preciso fazer login.
+    """
+    dados = carregar_sessao(url, usuario, senha, orgao)
+    if dados is None:
+        return False
+    if not sessao_valida(dados):
+        logging.info("A sessão guardada expirou. Fazendo login.")
+        descartar_sessao(url, usuario, orgao)
+        return False
+
+    driver.execute_cdp_cmd("Network.setCookies", {"cookies": [cookie_cdp(c) for c in dados["cookies"]]})
+    driver.get(dados["pagina"])
+    if not sei_espera.login_concluido(driver):
+        descartar_sessao(url, usuario, orgao)
+        return False
+    logging.info("Sessão anterior reaproveitada, sem novo login.")
+    return True
+
+
+def entrar(driver, url, usuario, senha, orgao, realizar_login):
+    """
+    Autentica o navegador, reaproveitando a sessão guardada quando possível.
+
+    Args:
+        driver: Instância do WebDriver.
+        url, usuario, senha, orgao: Dados de acesso ao SEI.
+        realizar_login: Login pelo formulário, chamado como realizar_login(driver, url,
+            usuario, senha, orgao) -> bool quando não há sessão válida.
+
+    Returns:
+        bool: True se o navegador está autenticado.
+    """
+    if restaurar_sessao(driver, url, usuario, senha, orgao):
+        return True
+    if not realizar_login(driver, url, usuario, senha, orgao):
+        return False
+    guardar_sessao(driver, url, usuario, senha, orgao)
+    return True
+
+# --- 2. NOVO LOGIN NO MEIO DA EXECUÇÃO ---
+
+class Reautenticador:
+    """
+    Refaz o login quando a sessão do SEI expira no meio de uma execução longa.
+
+    A paginação e a captura reconhecem o formulário de login no lugar da página
+    pedida (sei_espera.pagina_de_login) e chamam renovar(). O login é refeito
+    numa aba nova do próprio navegador, fechada em seguida: a aba da listagem
+    não sai do lugar e as abas de captura, que compartilham os cookies do
+    navegador, já voltam autenticadas.
+
+    Cada login refeito incrementa `geracao`. Quem pede a renovação informa a
+    geração com que a falha aconteceu; se outra etapa já renovou depois disso,
+    não há novo login, só a nova tentativa do que falhou.
+    """
+
+    def __init__(self, driver, url, usuario, senha, orgao, realizar_login, refazer_busca=None,
+                 tentativas=TENTATIVAS_RELOGIN):
+        """
+        Args:
+            driver: Instância do WebDriver já autenticada.
+            url, usuario, senha, orgao: Dados de acesso ao SEI.
+            realizar_login: Login pelo formulário (a mesma função passada a entrar()).
+            refazer_busca (opcional): Chamada com o driver na página inicial do SEI;
+                deve deixá-lo na primeira página de resultados e devolver True.
+                Necessária para continuar a paginação pelo navegador, que perde a
+                posição quando o SEI redireciona para o login.
+            tentativas (int): Novos logins por documento antes de registrá-lo como falha.
+        """
+        self.driver = driver
+        self.url = url
+        self.usuario = usuario
+        self.senha = senha
+        self.orgao = orgao
+        self.realizar_login = realizar_login
+        self.refazer_busca = refazer_busca
+        self.tentativas = tentativas
+        self.geracao = 0
+        self.cookies = None
+        self.pagina_inicial = driver.current_url
+        # Reservada por quem usa o navegador: a paginação e o próprio novo login
+        self.trava = threading.RLock()
+        # Geração da página em curso na paginação, por thread (veja exclusivo)
+        self._passo = threading.local()
+        self._falhou = False
+
+    def renovar(self, geracao=None):
+        """
+        Refaz o login, a menos que outra etapa já o tenha feito depois de `geracao`.
+
+        Args:
+            geracao (int, opcional): Geração com que a sessão expirou. Sem ela, o
+                login é sempre refeito.
+
+        Returns:
+            int: Geração atual.
+
+        Raises:
+            sei_espera.SessaoExpirada: Se o login não puder ser refeito.
+        """
+        with self.trava:
+            if geracao is not None and geracao != self.geracao:
+                return self.geracao
+            if self._falhou:
+                raise sei_espera.SessaoExpirada("O novo login no SEI já falhou nesta execução.")
+
+            logging.warning("Sessão do SEI expirada. Refazendo o login.")
+            descartar_sessao(self.url, self.usuario, self.orgao)
+            aba = self.driver.current_window_handle
+            self.driver.switch_to.new_window("tab")
+            try:
+                autenticado = self.realizar_login(self.driver, self.url, self.usuario, self.senha, self.orgao)
+                if autenticado:
+                    self.pagina_inicial = self.driver.current_url
+                    self.cookies = self.driver.get_cookies()
+                    guardar_sessao(self.driver, self.url, self.usuario, self.senha, self.orgao)
+            finally:
+                self.driver.close()
+                self.driver.switch_to.window(aba)
+            if not autenticado:
+                self._falhou = True
+                raise sei_espera.SessaoExpirada("Não foi possível refazer o login no SEI.")
+
+            self.geracao += 1
+            logging.info(f"Login refeito; a execução continua de onde parou (renovação {self.geracao}).")
+            return self.geracao
+
+    def reposicionar(self, pagina, refazer_busca=None, geracao=None):
+        """
+        Renova a sessão e volta a aba da listagem à página `pagina` dos resultados.
+
+        É o `ao_expirar` de sei_extracao.iterar_paginas: refaz a busca a partir da
+        página inicial e avança até a página em que a paginação parou.
+
+        Args:
+            pagina (int): Página em que a paginação parou.
+            refazer_busca (opcional): Substitui self.refazer_busca (por exemplo, a
+                busca de cada aba num lote de consultas).
+            geracao (int, opcional): Geração com que a página atual da aba foi
+                carregada. Sem ela, vale a guardada por exclusivo(); assim, abas
+                que expiram juntas fazem um único login.
+        """
+        if geracao is None:
+            geracao = getattr(self._passo, "geracao", None)
+        refazer_busca = refazer_busca or self.refazer_busca
+        if refazer_busca is None:
+            raise sei_espera.SessaoExpirada("A sessão expirou na paginação e não há como refazer a busca.")
+        with self.trava:
+            self.renovar(geracao)
+            self.driver.get(self.pagina_inicial)
+            sei_espera.documento_pronto(self.driver)
+            if not refazer_busca(self.driver):
+                raise sei_espera.SessaoExpirada("Não foi possível refazer a busca depois do novo login.")
+            avancadas = sei_extracao.avancar_paginas(self.driver, pagina - 1)
+            if avancadas < pagina - 1:
+                logging.warning(f"A busca refeita tem só {avancadas + 1} páginas; seguindo da última.")
+            logging.info(f"Paginação retomada na página {pagina}.")
+
+    def renovar_sessao_http(self, sessao, geracao):
+        """
+        Renova a sessão e atualiza os cookies da requests.Session (ao_expirar de sei_http.baixar_pagina).
+
+        A geração dos cookies fica guardada na própria sessão (atributo geracao_sei).
+        """
+        with self.trava:
+            self.renovar(geracao)
+            sei_http.copiar_cookies(sessao, self.cookies)
+            sessao.geracao_sei = self.geracao
+
+    def exclusivo(self, paginas, antes=None):
+        """
+        Percorre as páginas com o navegador reservado a cada página.
+
+        Um novo login pedido pela captura espera a página em curso terminar, em
+        vez de trocar de aba no meio de um clique em 'Próxima'. A geração com que
+        a página atual foi carregada fica guardada para reposicionar().
+
+        Args:
+            paginas: Iterável de páginas que usa o navegador.
+            antes (opcional): Chamada sem argumentos, já com o navegador reservado,
+                antes de cada página (por exemplo, para voltar à aba da consulta).
+        """
+        iterador = iter(paginas)
+        # Geração com que a página atual da aba foi carregada
+        vista = self.geracao
+        while True:
+            with self.trava:
+                if antes:
+                    antes()
+                self._passo.geracao = vista
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    return
+                finally:
+                    self._passo.geracao = None
+                vista = self.geracao
+            yield item
@@ -0,0 +1,68 @@
+import os
+import email
+import logging
+from email import policy
+
+from sei_parser import carregar_html
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+# --- 1. TEXTO DOS DOCUMENTOS CAPTURADOS ---
+
+# Elementos da página do documento que não fazem parte do texto
+ELEMENTOS_IGNORADOS = ("script", "style", "noscript", "head")
+
+
+def normalizar_espacos(texto):
+    return " ".join(texto.split())
+
+
+def texto_html(html):
+    """Texto visível de um documento HTML (str ou bytes), com os espaços normalizados."""
+    soup = carregar_html(html)
+    for elemento in soup(ELEMENTOS_IGNORADOS):
+        elemento.decompose()
+    return normalizar_espacos(soup.get_text(" "))
+
+
+def texto_mhtml(dados):
+    """
+    Texto de um documento MHTML (Page.captureSnapshot): o da primeira parte text/html.
+
+    Args:
+        dados (bytes): Conteúdo do arquivo .mhtml.
+    """
+    mensagem = email.message_from_bytes(dados, policy=policy.default)
+    for parte in mensagem.walk():
+        if parte.get_content_type() == "text/html":
+            return texto_html(parte.get_content())
+    return ""
+
+
+def texto_pdf(caminho):
+    """Texto de um PDF, página a página. Requer o pacote pypdf."""
+    if PdfReader is None:
+        raise RuntimeError("pypdf não está instalado; não é possível extrair texto de PDFs.")
+    leitor = PdfReader(caminho)
+    return normalizar_espacos(" ".join(pagina.extract_text() or "" for pagina in leitor.pages))
+
+
+def texto_do_arquivo(caminho):
+    """
+    Extrai o texto de um documento capturado, conforme a extensão (.html, .mhtml ou .pdf).
+
+    Returns:
+        str: Texto do documento ("" se o formato não for suportado).
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".pdf":
+        return texto_pdf(caminho)
+    if extensao not in (".html", ".htm", ".mhtml"):
+        logging.warning(f"Formato sem extração de texto: {caminho}")
+        return ""
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    return texto_mhtml(dados) if extensao == ".mhtml" else texto_html(dados)
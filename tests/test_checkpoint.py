@@ -0,0 +1,56 @@
+import os
+
+import sei_checkpoint
+from sei_registros import Registro
+
+REGISTROS = [
+    Registro("12345.000001/2024-11", "Ofício 10", "", "SEGES", "", "05/08/2024", "https://sei/doc?id_documento=101"),
+    Registro("12345.000002/2024-22", "Nota Técnica", "", "ASPAR", "", "06/08/2024", "https://sei/doc?id_documento=102"),
+    Registro("12345.000003/2024-33", "Despacho", "", "", "", "", None),
+]
+
+
+def test_pagina_confirmada_sobrevive_a_queda(tmp_path):
+    saida = str(tmp_path / "resultados.csv")
+    with sei_checkpoint.Manifesto.para_saida(saida) as manifesto:
+        manifesto.concluir_pagina(1, REGISTROS[:2], posicao_saida=120)
+        manifesto.concluir_pagina(2, REGISTROS[2:], posicao_saida=180)
+        manifesto.marcar_documento(REGISTROS[0].link, "doc1.pdf")
+        manifesto.marcar_documento(REGISTROS[1].link, "doc2.pdf", erro="Tempo esgotado")
+
+    with sei_checkpoint.abrir_para_retomar(str(tmp_path)) as manifesto:
+        assert manifesto.obter("caminho_saida") == saida
+        assert manifesto.pagina_concluida(2) and not manifesto.pagina_concluida(3)
+        assert manifesto.posicao_saida() == 180
+        assert manifesto.documento_capturado(REGISTROS[0].link)
+        assert not manifesto.documento_capturado(REGISTROS[1].link)
+        assert manifesto.resumo() == {
+            "paginas": 2,
+            "registros": 3,
+            "documentos": {sei_checkpoint.CAPTURADO: 1, sei_checkpoint.FALHOU: 1},
+        }
+
+
+def test_pagina_repetida_nao_duplica_documentos(tmp_path):
+    with sei_checkpoint.Manifesto.para_saida(str(tmp_path / "resultados.csv")) as manifesto:
+        manifesto.concluir_pagina(1, REGISTROS[:2])
+        manifesto.marcar_documento(REGISTROS[0].link, "doc1.pdf")
+        manifesto.concluir_pagina(1, REGISTROS[:2])
+
+        assert manifesto.documento_capturado(REGISTROS[0].link)
+        assert manifesto.resumo()["documentos"] == {sei_checkpoint.CAPTURADO: 1, sei_checkpoint.PENDENTE: 1}
+
+
+def test_nova_execucao_descarta_o_manifesto_anterior(tmp_path):
+    saida = str(tmp_path / "resultados.csv")
+    with sei_checkpoint.Manifesto.para_saida(saida) as manifesto:
+        manifesto.concluir_pagina(1, REGISTROS)
+
+    with sei_checkpoint.Manifesto.para_saida(saida) as manifesto:
+        assert manifesto.posicao_saida() is None
+        assert not manifesto.pagina_concluida(1)
+    assert os.path.exists(sei_checkpoint.caminho_manifesto(saida))
+
+
+def test_sem_execucao_para_retomar(tmp_path):
+    assert sei_checkpoint.abrir_para_retomar(str(tmp_path)) is None
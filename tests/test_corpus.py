@@ -0,0 +1,33 @@
+import pytest
+
+import sei_corpus
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("Projeto de Lei nº 1.234, de 2023", [("PL", "1234", 2023)]),
+    ("conforme a lei 13.846 de 2019", [("Lei", "13846", 2019)]),
+    ("PL 2 de 2023", [("PL", "2", 2023)]),
+    ("PL 1234/2023 e PLP 12/23", [("PL", "1234", 2023), ("PLP", "12", 2023)]),
+    ("Lei nº 8.213, de 24 de julho de 1991", [("Lei", "8213", 1991)]),
+    ("Lei Complementar 101/2000", [("LC", "101", 2000)]),
+    ("Projeto de Lei Complementar nº 5, de 2024", [("PLP", "5", 2024)]),
+    ("Projeto de Lei do Congresso Nacional 3/2024", [("PLN", "3", 2024)]),
+    ("Requerimento de Informação nº 1.500/2023 e RIC 7, de 2024", [("RIC", "1500", 2023), ("RIC", "7", 2024)]),
+    ("Lei 8.112", [("Lei", "8112", None)]),
+])
+def test_extrair_entidades(texto, esperado):
+    assert sei_corpus.extrair_entidades(texto) == esperado
+
+
+@pytest.mark.parametrize("texto", [
+    "PL 2 páginas",
+    "RIC 15",
+    "PLACA 2023",
+])
+def test_projetos_sem_ano_sao_ignorados(texto):
+    assert sei_corpus.extrair_entidades(texto) == []
+
+
+def test_referencia():
+    assert sei_corpus.referencia("PL", "1234", 2023) == "PL 1234/2023"
+    assert sei_corpus.referencia("Lei", "8112", None) == "Lei 8112"
@@ -0,0 +1,45 @@
+import pytest
+
+import sei_delta
+from sei_registros import Registro
+
+ANTIGO = Registro("12345.000001/2024-11", "Ofício 10", "", "SEGES", "", "05/08/2024", "https://sei/doc?id_documento=101")
+NOVO = Registro("12345.000002/2024-22", "Nota Técnica", "", "ASPAR", "", "20/08/2024", "https://sei/doc?id_documento=102")
+SEM_DATA = Registro("12345.000003/2024-33", "Despacho", "", "", "", "", None)
+
+
+@pytest.fixture
+def estado(tmp_path):
+    with sei_delta.EstadoDelta(str(tmp_path / "delta.sqlite"), "consulta") as estado:
+        yield estado
+
+
+def test_primeira_execucao_usa_a_data_padrao(estado):
+    assert estado.marca() is None
+    assert estado.data_inicio("30/07/2024") == "30/07/2024"
+
+
+def test_marca_so_avanca_ao_concluir(estado):
+    estado.registrar([ANTIGO, NOVO, SEM_DATA])
+    assert estado.data_inicio("30/07/2024") == "30/07/2024"
+
+    estado.concluir()
+    assert estado.data_inicio("30/07/2024") == "20/08/2024"
+    with sei_delta.EstadoDelta(estado.caminho, "outra") as outra:
+        assert outra.marca() is None
+
+
+def test_marca_nao_recua(estado):
+    estado.registrar([NOVO])
+    estado.concluir()
+    with sei_delta.EstadoDelta(estado.caminho, "consulta") as seguinte:
+        seguinte.registrar([ANTIGO])
+        seguinte.concluir()
+        assert seguinte.data_inicio("30/07/2024") == "20/08/2024"
+
+
+def test_filtrar_paginas_segue_depois_de_pagina_conhecida(estado):
+    estado.registrar([ANTIGO, SEM_DATA])
+    paginas = [(1, [ANTIGO, SEM_DATA]), (2, [ANTIGO, NOVO])]
+
+    assert list(estado.filtrar_paginas(paginas)) == [(1, []), (2, [NOVO])]
@@ -0,0 +1,122 @@
+import pytest
+
+import sei_espera
+import sei_http
+
+URL = "https://sei.exemplo.gov.br/sei/controlador.php?acao=pesquisa"
+
+PAGINA = """
+<div id="conteudo"><table>
+  <tr><td class="pesquisaTituloEsquerda">
+    <a href="controlador.php?acao=procedimento_trabalhar&amp;id_documento={id}">12345.00000{id}/2024-11</a>
+    <a href="controlador.php?acao=documento_visualizar&amp;id_documento={id}">Ofício {id}</a>
+  </td></tr>
+</table>
+<div class="barraPaginacao">{proxima}</div></div>
+"""
+
+
+class Resposta:
+    def __init__(self, html):
+        self.content = html.encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+
+class SessaoFalsa:
+    """Responde com o HTML cadastrado para cada URL e guarda os pedidos."""
+
+    def __init__(self, paginas):
+        self.paginas = paginas
+        self.pedidas = []
+
+    def get(self, url, timeout=None):
+        self.pedidas.append(url)
+        return Resposta(self.paginas[url])
+
+
+def pagina(id, proxima=None):
+    return PAGINA.format(id=id, proxima=f'<a href="{proxima}">Próxima</a>' if proxima else "")
+
+
+def test_paginas_http_ate_a_ultima():
+    sessao = SessaoFalsa({
+        URL + "&inicio=10": pagina(2, URL + "&inicio=20"),
+        URL + "&inicio=20": pagina(3),
+    })
+
+    paginas = list(sei_http.iterar_paginas_http(sessao, URL, pagina(1, URL + "&inicio=10")))
+
+    assert [numero for numero, _ in paginas] == [1, 2, 3]
+    assert [registros[0].documento for _, registros in paginas] == ["Ofício 1", "Ofício 2", "Ofício 3"]
+    assert sessao.pedidas == [URL + "&inicio=10", URL + "&inicio=20"]
+
+
+def test_proxima_por_script_informa_a_pagina_para_o_navegador():
+    sessao = SessaoFalsa({URL + "&inicio=10": pagina(2, "javascript:infraPaginar(2)")})
+    paginas = sei_http.iterar_paginas_http(sessao, URL, pagina(1, URL + "&inicio=10"))
+
+    assert next(paginas)[0] == 1
+    with pytest.raises(sei_http.PaginacaoIndisponivel) as erro:
+        next(paginas)
+    assert (erro.value.url, erro.value.pagina) == (URL + "&inicio=10", 2)
+
+
+def test_sessao_expirada_renova_e_repete_o_pedido():
+    sessao = SessaoFalsa({URL: '<input id="txtUsuario">'})
+    renovacoes = []
+
+    def ao_expirar(sessao, geracao):
+        renovacoes.append(geracao)
+        sessao.paginas[URL] = pagina(1)
+
+    soup = sei_http.baixar_pagina(sessao, URL, ao_expirar=ao_expirar)
+
+    assert renovacoes == [0]
+    assert sessao.pedidas == [URL, URL]
+    assert "Ofício 1" in soup.get_text()
+
+
+def test_sessao_expirada_sem_renovacao():
+    with pytest.raises(sei_espera.SessaoExpirada):
+        sei_http.baixar_pagina(SessaoFalsa({URL: '<input id="txtUsuario">'}), URL)
+
+
+@pytest.mark.parametrize("atual, proxima, esperado", [
+    # Único parâmetro que vale o tamanho da página e mudou
+    (URL, URL + "&inicio=10", "inicio"),
+    (URL + "&inicio=0&linhas=10", URL + "&inicio=10&linhas=10", "inicio"),
+    # Ambíguo: dois parâmetros novos com o tamanho da página
+    (URL, URL + "&inicio=10&linhas=10", None),
+    # Nenhum: o deslocamento não vale o tamanho da página, ou não mudou
+    (URL, URL + "&pagina=2", None),
+    (URL + "&inicio=10", URL + "&inicio=10", None),
+    (URL, URL + "&inicio=abc", None),
+])
+def test_parametro_offset(atual, proxima, esperado):
+    assert sei_http._parametro_offset(atual, proxima, 10) == esperado
+
+
+def test_url_com_offset_troca_so_o_parametro():
+    url = URL + "&inicio=10&linhas=10&q=SEI+MPS"
+
+    assert sei_http.url_com_offset(url, "inicio", 30) == URL + "&inicio=30&linhas=10&q=SEI+MPS"
+
+
+def test_paralelo_pede_as_paginas_pelo_deslocamento():
+    primeira = pagina(1, URL + "&inicio=1").replace(
+        '<div id="conteudo">', '<div id="conteudo"><div class="barraPaginacao">Resultados 1 - 1 de 4</div>')
+    sessao = SessaoFalsa({
+        URL + "&inicio=1": pagina(2),
+        URL + "&inicio=2": pagina(3),
+        # A lista mudou durante a navegação: o resultado 3 aparece de novo
+        URL + "&inicio=3": pagina(3),
+    })
+
+    paginas = list(sei_http.iterar_paginas_paralelo(sessao, URL, primeira, trabalhadores=2))
+
+    assert [(numero, [r.documento for r in registros]) for numero, registros in paginas] == [
+        (1, ["Ofício 1"]), (2, ["Ofício 2"]), (3, ["Ofício 3"]), (4, []),
+    ]
+    assert sorted(sessao.pedidas) == [URL + "&inicio=1", URL + "&inicio=2", URL + "&inicio=3"]
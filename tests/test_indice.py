@@ -0,0 +1,42 @@
+import pytest
+
+import sei_indice
+from sei_registros import Registro
+
+
+@pytest.fixture
+def indice(tmp_path):
+    with sei_indice.Indice(str(tmp_path / "indice.sqlite3")) as indice:
+        indice.indexar_registros([
+            Registro("12345.000001/2024-11", "Ofício 10", "Reforma da Previdência Social", "SEGES", "fulano",
+                     "05/08/2024", "https://sei/doc?id_documento=101"),
+            Registro("12345.000002/2024-22", "Nota Técnica", "Análise da Lei 8.213/91", "ASPAR", "ciclano",
+                     "10/09/2024", "https://sei/doc?id_documento=102"),
+        ])
+        yield indice
+
+
+def documentos(resultados):
+    return [r["documento"] for r in resultados]
+
+
+def test_busca_ignora_acentos_e_caixa(indice):
+    assert documentos(indice.buscar(sei_indice.consulta_fts("previdencia"))) == ["Ofício 10"]
+    assert documentos(indice.buscar(sei_indice.consulta_fts("ANALISE"))) == ["Nota Técnica"]
+    assert documentos(indice.buscar(sei_indice.consulta_fts("oficio"))) == ["Ofício 10"]
+
+
+def test_consulta_com_numeros_e_prefixo(indice):
+    assert sei_indice.consulta_fts('lei 8.213/91 "x') == '"lei" "8.213/91" """x"'
+    assert documentos(indice.buscar(sei_indice.consulta_fts("8.213/91"))) == ["Nota Técnica"]
+    assert documentos(indice.buscar(sei_indice.consulta_fts("previd*"))) == ["Ofício 10"]
+
+
+def test_texto_do_documento_e_filtros(indice):
+    indice.indexar_texto("102", "hash", "Benefício de aposentadoria por invalidez")
+
+    assert documentos(indice.buscar(sei_indice.consulta_fts("beneficio"))) == ["Nota Técnica"]
+    assert indice.texto_indexado("102", "hash")
+    assert not indice.texto_indexado("102", "outro")
+    assert indice.buscar(sei_indice.consulta_fts("beneficio"), unidade="SEGES") == []
+    assert indice.buscar(sei_indice.consulta_fts("beneficio"), desde=sei_indice._data("01/10/2024")) == []
@@ -0,0 +1,84 @@
+import csv
+import json
+
+import pytest
+
+import sei_lote
+from sei_registros import Registro
+
+OFICIO = Registro("12345.000001/2024-11", "Ofício 10", "", "SEGES", "", "05/08/2024", "https://sei/doc?id_documento=101")
+NOTA = Registro("12345.000002/2024-22", "Nota Técnica", "", "ASPAR", "", "06/08/2024", "https://sei/doc?id_documento=102")
+DESPACHO = Registro("12345.000003/2024-33", "Despacho", "", "", "", "", None)
+
+
+def gravar_consultas(tmp_path, configuracao):
+    caminho = tmp_path / "consultas.json"
+    caminho.write_text(json.dumps(configuracao), encoding="utf-8")
+    return str(caminho)
+
+
+def test_carregar_consultas_aplica_o_padrao(tmp_path):
+    caminho = gravar_consultas(tmp_path, {
+        "padrao": {"restringir_orgao": False, "data_inicio": "30/07/2024"},
+        "consultas": [
+            {"nome": "mps", "termos": "MPS não \"SIC\"", "tramitacao": True},
+            {"nome": "proposicoes", "termos": "\"PLP\"", "campo": "especificacao", "data_inicio": "01/01/2024"},
+        ],
+    })
+
+    mps, proposicoes = sei_lote.carregar_consultas(caminho)
+
+    assert (mps.restringir_orgao, mps.tramitacao, mps.data_inicio) == (False, True, "30/07/2024")
+    assert (proposicoes.campo, proposicoes.data_inicio) == ("especificacao", "01/01/2024")
+
+
+@pytest.mark.parametrize("consultas", [
+    [],
+    [{"nome": "mps", "termos": "MPS"}, {"nome": "mps", "termos": "PLP"}],
+    [{"nome": "mps/2024", "termos": "MPS"}],
+    [{"nome": "mps", "termos": ""}],
+    [{"nome": "mps", "termos": "MPS", "campo": "titulo"}],
+    [{"nome": "mps", "termos": "MPS", "orgao": "MGI"}],
+])
+def test_carregar_consultas_recusa_arquivo_invalido(tmp_path, consultas):
+    with pytest.raises(ValueError):
+        sei_lote.carregar_consultas(gravar_consultas(tmp_path, {"consultas": consultas}))
+
+
+@pytest.fixture
+def ocorrencias(tmp_path):
+    with sei_lote.Ocorrencias(str(tmp_path / "ocorrencias.sqlite3")) as ocorrencias:
+        yield ocorrencias
+
+
+def test_resultado_pertence_a_primeira_consulta(ocorrencias):
+    assert ocorrencias.da_consulta("mps", [OFICIO, NOTA]) == [OFICIO, NOTA]
+    assert ocorrencias.da_consulta("proposicoes", [NOTA, DESPACHO]) == [DESPACHO]
+    # Numa retomada, a dona continua recebendo os seus resultados
+    assert ocorrencias.da_consulta("mps", [NOTA]) == [NOTA]
+    assert ocorrencias.da_consulta("proposicoes", [DESPACHO, OFICIO]) == [DESPACHO]
+
+    assert ocorrencias.resumo() == {
+        "mps": {"encontrados": 2, "proprios": 2},
+        "proposicoes": {"encontrados": 3, "proprios": 1},
+    }
+
+
+def test_exportar_csv_guarda_todas_as_consultas(tmp_path, ocorrencias):
+    ocorrencias.da_consulta("mps", [OFICIO])
+    ocorrencias.da_consulta("proposicoes", [OFICIO, DESPACHO])
+
+    caminho = tmp_path / "consultas_por_registro.csv"
+    assert ocorrencias.exportar_csv(str(caminho)) == 3
+    with open(caminho, encoding="utf-8-sig", newline="") as f:
+        linhas = list(csv.reader(f, delimiter=";"))
+    assert linhas[0] == sei_lote.COLUNAS_OCORRENCIAS
+    assert [linha[:2] for linha in linhas[1:]] == [["mps", "mps"], ["proposicoes", "mps"], ["proposicoes", "proposicoes"]]
+
+
+def test_filtrar_paginas_mantem_as_paginas_vazias(ocorrencias):
+    ocorrencias.da_consulta("mps", [OFICIO])
+
+    paginas = list(ocorrencias.filtrar_paginas("proposicoes", [(1, [OFICIO]), (2, iter([NOTA]))]))
+
+    assert paginas == [(1, []), (2, [NOTA])]
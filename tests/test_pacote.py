@@ -0,0 +1,51 @@
+import tarfile
+
+import pytest
+
+import sei_pacote
+
+
+@pytest.mark.parametrize("compressao", ["nenhuma", "gzip", "lzma", "auto"])
+def test_ler_membro_devolve_o_conteudo_original(tmp_path, compressao):
+    caminho = str(tmp_path / "execucao.tar")
+    documentos = {"101.pdf": b"%PDF-1.4 conteudo", "102.html": "<p>Previdência</p>".encode() * 100}
+    with sei_pacote.Pacote(caminho, compressao) as pacote:
+        for nome, dados in documentos.items():
+            pacote.adicionar(nome, dados, id_documento=nome.split(".")[0])
+
+    indice = sei_pacote.carregar_indice(caminho)
+    for nome, dados in documentos.items():
+        assert sei_pacote.ler_membro(caminho, nome, indice) == dados
+    assert indice["102.html"]["id_documento"] == "102"
+    if compressao == "auto":
+        assert indice["101.pdf"]["compressao"] == "nenhuma"
+        assert indice["102.html"]["membro"] == "102.html.gz"
+
+
+def test_pacote_continuado_depois_de_queda(tmp_path):
+    caminho = str(tmp_path / "execucao.tar")
+    with sei_pacote.Pacote(caminho, "gzip") as pacote:
+        pacote.adicionar("101.html", b"primeiro")
+    # Queda no meio do próximo membro: cabeçalho e dados pela metade, sem fim de arquivo
+    with open(caminho, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 2 * tarfile.BLOCKSIZE)
+        f.write(b"lixo de um membro incompleto" * 40)
+
+    with sei_pacote.Pacote(caminho, "gzip") as pacote:
+        pacote.adicionar("102.html", b"segundo")
+
+    assert sei_pacote.ler_membro(caminho, "101.html") == b"primeiro"
+    assert sei_pacote.ler_membro(caminho, "102.html") == b"segundo"
+    with tarfile.open(caminho) as tar:
+        assert tar.getnames() == ["101.html.gz", "102.html.gz"]
+
+
+def test_arquivo_guardado_e_removido(tmp_path):
+    solto = tmp_path / "103.pdf"
+    solto.write_bytes(b"pdf")
+    caminho = str(tmp_path / "execucao.tar")
+    with sei_pacote.Pacote(caminho) as pacote:
+        pacote.adicionar_arquivo(str(solto), id_documento="103", remover=True)
+
+    assert not solto.exists()
+    assert sei_pacote.ler_membro(caminho, "103.pdf") == b"pdf"
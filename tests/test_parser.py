@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+import sei_parser
+
+PASTA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+URL_BASE = "https://sei.exemplo.gov.br/sei/"
+
+
+@pytest.fixture
+def html():
+    with open(os.path.join(PASTA_FIXTURES, "pagina_resultados.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_registros_da_pagina(html):
+    registros = list(sei_parser.iterar_registros(html, URL_BASE))
+
+    assert [r.processo for r in registros] == [
+        "12345.000001/2024-11", "12345.000002/2024-22", "12345.000003/2024-33",
+    ]
+    primeiro = registros[0]
+    assert primeiro.documento == "Ofício 10"
+    assert primeiro.resumo == "Encaminha o Projeto de Lei nº 1.234, de 2023."
+    assert (primeiro.unidade, primeiro.usuario, primeiro.data_inclusao) == ("SEGES", "fulano", "05/08/2024")
+    assert primeiro.link == URL_BASE + "controlador.php?acao=procedimento_trabalhar&id_documento=101"
+    assert primeiro.id_documento == "101"
+
+
+def test_campo_ausente_afeta_so_o_proprio_registro(html):
+    _, segundo, terceiro = sei_parser.iterar_registros(html, URL_BASE)
+
+    assert (segundo.unidade, segundo.usuario, segundo.data_inclusao) == ("ASPAR", "", "06/08/2024")
+    assert segundo.resumo == ""
+    assert (terceiro.unidade, terceiro.data_inclusao) == ("", "")
+    assert terceiro.id_documento is None
+    assert terceiro.chave_texto() == "12345.000003/2024-33|Despacho"
+
+
+def test_parse_pagina_resultados_usa_as_colunas_do_csv(html):
+    linhas = sei_parser.parse_pagina_resultados(html)
+
+    assert list(linhas[0]) == sei_parser.COLUNAS
+    assert linhas[1]["Documento"] == "Nota Técnica 3"
+
+
+def test_proxima_pagina_e_total(html):
+    assert sei_parser.link_proxima_pagina(html, URL_BASE) == URL_BASE + "controlador.php?acao=pesquisa&inicio=10"
+    assert sei_parser.total_resultados(html) == 1234
+
+
+def test_ultima_pagina_sem_proxima_nem_total():
+    html = '<div id="conteudo"><table><tr><td>05/08/2024 - 06/08/2024 de 2024</td></tr></table></div>'
+
+    assert sei_parser.link_proxima_pagina(html) is None
+    assert sei_parser.total_resultados(html) is None
@@ -0,0 +1,21 @@
+import pytest
+
+import sei_rede
+
+
+def test_listagem_mantem_as_folhas_de_estilo():
+    # O texto da listagem vem de innerText, que muda sem o CSS da página
+    bloqueados = sei_rede.padroes_do_perfil(sei_rede.PERFIL_LISTAGEM)
+
+    assert not set(sei_rede.ESTILOS) & set(bloqueados)
+    assert set(sei_rede.IMAGENS) <= set(bloqueados)
+
+
+def test_extensoes_com_query_string():
+    assert sei_rede._extensoes("css") == ["*.css", "*.css?*"]
+
+
+def test_perfil_desconhecido():
+    assert sei_rede.padroes_do_perfil(None) == []
+    with pytest.raises(ValueError):
+        sei_rede.padroes_do_perfil("nenhum")
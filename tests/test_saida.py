@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+import sei_saida
+from sei_registros import COLUNAS, Registro
+
+REGISTROS = [
+    Registro("12345.000001/2024-11", "Ofício 10", 'Resumo com ; e "aspas"', "SEGES", "fulano", "05/08/2024",
+             "https://sei/doc?id_documento=101"),
+    Registro("12345.000002/2024-22", "Nota Técnica", "Duas\nlinhas", "ASPAR", "", "06/08/2024", None),
+    Registro("12345.000003/2024-33", "Despacho", "", "", "", "", "https://sei/doc?id_documento=103"),
+]
+
+
+def test_csv_igual_ao_to_csv(tmp_path):
+    caminho = tmp_path / "saida.csv"
+    with sei_saida.SaidaCSV(str(caminho), encoding="utf-8-sig") as saida:
+        saida.escrever_pagina(REGISTROS[:2])
+        saida.escrever_pagina(REGISTROS[2:])
+
+    esperado = tmp_path / "esperado.csv"
+    df = pd.DataFrame([r.como_tupla() for r in REGISTROS], columns=COLUNAS)
+    df.to_csv(esperado, sep=";", index=False, encoding="utf-8-sig")
+
+    assert caminho.read_bytes() == esperado.read_bytes()
+
+
+def test_csv_retomado_descarta_pagina_incompleta(tmp_path):
+    caminho = tmp_path / "saida.csv"
+    with sei_saida.SaidaCSV(str(caminho)) as saida:
+        saida.escrever_pagina(REGISTROS[:1])
+        posicao = saida.posicao
+        saida.escrever_pagina(REGISTROS[1:2])
+
+    with sei_saida.SaidaCSV(str(caminho), anexar=True, posicao=posicao) as saida:
+        saida.escrever_pagina(REGISTROS[2:])
+
+    df = pd.read_csv(caminho, sep=";", dtype=str, keep_default_na=False)
+    assert list(df["Documento"]) == ["Ofício 10", "Despacho"]
+
+
+def test_saida_incompleta_falha_ao_instanciar():
+    class SemGravar(sei_saida.Saida):
+        def _sincronizar(self):
+            pass
+
+        def fechar(self):
+            pass
+
+    with pytest.raises(TypeError):
+        SemGravar("x")
+
+
+def ler_dataset(pasta, **kwargs):
+    return pd.read_parquet(pasta, **kwargs).sort_values("Documento").reset_index(drop=True)
+
+
+def test_dataset_nao_repete_registros_entre_execucoes(tmp_path):
+    pasta = str(tmp_path / "dataset")
+    with sei_saida.SaidaDataset(pasta, "execucao1") as saida:
+        saida.escrever_pagina(REGISTROS)
+    atualizado = Registro("12345.000001/2024-11", "Ofício 10", "Resumo novo", "SEGES", "fulano", "05/08/2024",
+                          "https://sei/doc?id_documento=101")
+    novo = Registro("12345.000004/2024-44", "Memorando", "", "SEGES", "", "20/08/2024", None)
+    with sei_saida.SaidaDataset(pasta, "execucao2") as saida:
+        saida.escrever_pagina([atualizado, novo, atualizado])
+
+    df = ler_dataset(pasta)
+    assert list(df["Documento"]) == ["Despacho", "Memorando", "Nota Técnica", "Ofício 10"]
+    assert df.loc[df["Documento"] == "Ofício 10", "Resumo"].item() == "Resumo novo"
+    assert sorted(p.name for p in (tmp_path / "dataset" / "mes_inclusao=2024-08").iterdir()) == ["execucao2.parquet"]
+
+
+def test_dataset_sem_data_fica_fora_dos_filtros_por_mes(tmp_path):
+    pasta = str(tmp_path / "dataset")
+    with sei_saida.SaidaDataset(pasta, "execucao1") as saida:
+        saida.escrever_pagina(REGISTROS)
+
+    filtrado = ler_dataset(pasta, filters=[("mes_inclusao", ">=", "2024-01")])
+    assert list(filtrado["Documento"]) == ["Nota Técnica", "Ofício 10"]
+    todos = ler_dataset(pasta)
+    assert todos.loc[todos["Documento"] == "Despacho", "mes_inclusao"].isna().all()
+
+
+def test_abrir_saida_ignora_opcoes_de_outros_formatos(tmp_path):
+    with sei_saida.abrir_saida(str(tmp_path / "dataset"), encoding="utf-8-sig", anexar=False, posicao=None) as saida:
+        assert isinstance(saida, sei_saida.SaidaDataset)
+    with sei_saida.abrir_saida(str(tmp_path / "saida.parquet"), encoding="utf-8-sig") as saida:
+        assert isinstance(saida, sei_saida.SaidaParquet)